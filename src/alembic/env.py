@@ -2,23 +2,21 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 from sqlmodel import SQLModel
-from dotenv import load_dotenv
-import os
-
-# Load .env
-load_dotenv()
+from api.db.config import DATABASE_URL
+import api.events.models  # noqa: F401  registers the tables on SQLModel.metadata
+import api.auth.models  # noqa: F401
 
 # Alembic Config object
 config = context.config
 
-# Inject DATABASE_URL into Alembic
+# Inject DATABASE_URL into Alembic (% must be escaped for configparser)
 config.set_main_option(
     "sqlalchemy.url",
-    os.getenv("DATABASE_URL")
+    DATABASE_URL.replace("%", "%%")
 )
 
-# Configure logging
-if config.config_file_name is not None:
+# Configure logging, unless we are being run from the app (init_db) which has its own logging
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # Metadata for autogenerate
@@ -39,6 +37,17 @@ def run_migrations_offline():
 
 
 def run_migrations_online():
+    # init_db passes in a connection from the app's engine
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
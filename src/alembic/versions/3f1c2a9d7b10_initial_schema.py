@@ -0,0 +1,129 @@
+"""initial schema
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+Tables as they were created by SQLModel.metadata.create_all before migrations were
+introduced. Tables that already exist are left alone, so databases created by
+create_all can be adopted by running `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _missing(table_name: str) -> bool:
+    if op.get_context().as_sql:
+        # offline (--sql) mode has no database to inspect
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _missing('iridmodel'):
+        op.create_table(
+            'iridmodel',
+            sa.Column('ir_id', sa.String(length=18), nullable=False),
+            sa.PrimaryKeyConstraint('ir_id'),
+        )
+    if _missing('irmodel'):
+        op.create_table(
+            'irmodel',
+            sa.Column('ir_id', sa.String(length=18), nullable=False),
+            sa.Column('ir_name', sa.String(length=45), nullable=False),
+            sa.Column('ir_email', sa.String(), nullable=False),
+            sa.Column('ir_access_level', sa.Integer(), nullable=False),
+            sa.Column('ir_password', sa.String(length=256), nullable=False),
+            sa.Column('status', sa.Boolean(), nullable=False),
+            sa.Column('plan_count', sa.Integer(), nullable=True),
+            sa.Column('dr_count', sa.Integer(), nullable=True),
+            sa.Column('info_count', sa.Integer(), nullable=True),
+            sa.Column('started_date', sa.String(), nullable=True),
+            sa.Column('name_list', sa.Integer(), nullable=True),
+            sa.Column('weekly_info_target', sa.Integer(), nullable=True),
+            sa.Column('weekly_plan_target', sa.Integer(), nullable=True),
+            sa.Column('weekly_uv_target', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('ir_id'),
+        )
+    if _missing('teammodel'):
+        op.create_table(
+            'teammodel',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('weekly_info_done', sa.Integer(), nullable=True),
+            sa.Column('weekly_plan_done', sa.Integer(), nullable=True),
+            sa.Column('weekly_info_target', sa.Integer(), nullable=True),
+            sa.Column('weekly_plan_target', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_teammodel_name', 'teammodel', ['name'], unique=False)
+    if _missing('infodetailmodel'):
+        op.create_table(
+            'infodetailmodel',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('ir_id', sa.String(), nullable=False),
+            sa.Column('info_date', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('response', sa.Enum('A', 'B', 'C', name='inforesponse'), nullable=False),
+            sa.Column('comments', sa.String(), nullable=True),
+            sa.Column('info_name', sa.String(), nullable=False),
+            sa.ForeignKeyConstraint(['ir_id'], ['irmodel.ir_id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if _missing('plandetailmodel'):
+        op.create_table(
+            'plandetailmodel',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('ir_id', sa.String(), nullable=False),
+            sa.Column('plan_date', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('plan_name', sa.String(), nullable=True),
+            sa.Column('comments', sa.String(), nullable=True),
+            sa.ForeignKeyConstraint(['ir_id'], ['irmodel.ir_id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if _missing('teammemberlink'):
+        op.create_table(
+            'teammemberlink',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('ir_id', sa.String(), nullable=False),
+            sa.Column('role', sa.Enum('LDC', 'LS', 'GC', 'IR', name='teamrole'), nullable=False),
+            sa.ForeignKeyConstraint(['ir_id'], ['irmodel.ir_id']),
+            sa.ForeignKeyConstraint(['team_id'], ['teammodel.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if _missing('teamweekmodel'):
+        op.create_table(
+            'teamweekmodel',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('week_start', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('weekly_info_done', sa.Integer(), nullable=False),
+            sa.Column('weekly_plan_done', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(['team_id'], ['teammodel.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('teamweekmodel')
+    op.drop_table('teammemberlink')
+    op.drop_table('plandetailmodel')
+    op.drop_table('infodetailmodel')
+    op.drop_index('ix_teammodel_name', table_name='teammodel')
+    op.drop_table('teammodel')
+    op.drop_table('irmodel')
+    op.drop_table('iridmodel')
+    sa.Enum(name='teamrole').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='inforesponse').drop(op.get_bind(), checkfirst=True)
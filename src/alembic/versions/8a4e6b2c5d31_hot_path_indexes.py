@@ -0,0 +1,52 @@
+"""hot path indexes
+
+Revision ID: 8a4e6b2c5d31
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 10:30:00.000000
+
+Composite indexes for the dashboard, roster, history and week-rollover lookups.
+Duplicate team memberships and duplicate week snapshots are removed (keeping the
+oldest row) before the unique indexes are created.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6b2c5d31'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a9d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text(
+        "DELETE FROM teammemberlink WHERE id IN ("
+        " SELECT newer.id FROM teammemberlink newer"
+        " JOIN teammemberlink older"
+        " ON older.team_id = newer.team_id AND older.ir_id = newer.ir_id AND older.id < newer.id)"
+    ))
+    op.execute(sa.text(
+        "DELETE FROM teamweekmodel WHERE id IN ("
+        " SELECT newer.id FROM teamweekmodel newer"
+        " JOIN teamweekmodel older"
+        " ON older.team_id = newer.team_id AND older.week_start = newer.week_start AND older.id < newer.id)"
+    ))
+
+    op.create_index('ix_infodetailmodel_ir_id_info_date', 'infodetailmodel', ['ir_id', 'info_date'], unique=False)
+    op.create_index('ix_plandetailmodel_ir_id_plan_date', 'plandetailmodel', ['ir_id', 'plan_date'], unique=False)
+    op.create_index('ux_teammemberlink_team_id_ir_id', 'teammemberlink', ['team_id', 'ir_id'], unique=True)
+    op.create_index('ix_teammemberlink_ir_id_team_id', 'teammemberlink', ['ir_id', 'team_id'], unique=False)
+    op.create_index('ux_teamweekmodel_team_id_week_start', 'teamweekmodel', ['team_id', 'week_start'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_teamweekmodel_team_id_week_start', table_name='teamweekmodel')
+    op.drop_index('ix_teammemberlink_ir_id_team_id', table_name='teammemberlink')
+    op.drop_index('ux_teammemberlink_team_id_ir_id', table_name='teammemberlink')
+    op.drop_index('ix_plandetailmodel_ir_id_plan_date', table_name='plandetailmodel')
+    op.drop_index('ix_infodetailmodel_ir_id_info_date', table_name='infodetailmodel')
@@ -0,0 +1,72 @@
+"""daily activity
+
+Revision ID: b7d3e9f1a4c2
+Revises: e81b4d3f6a27
+Create Date: 2026-10-18 18:00:00.000000
+
+Per IR, IST day and kind (info/plan) activity counts with the info response
+breakdown, kept up to date by the write paths (see api/events/rollup.py).
+Filled from the existing detail rows.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e9f1a4c2'
+down_revision: Union[str, Sequence[str], None] = 'e81b4d3f6a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# IST calendar day of a timestamp column, per dialect
+_IST_DAY = {
+    'postgresql': "CAST(timezone('Asia/Kolkata', {}) AS DATE)",
+    'sqlite': "date({}, '+330 minutes')",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'irdailyactivitymodel',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ir_id', sa.String(), nullable=False),
+        sa.Column('day_ist', sa.Date(), nullable=False),
+        sa.Column('kind', sa.String(length=4), nullable=False),
+        sa.Column('done', sa.Integer(), nullable=False),
+        sa.Column('response_a', sa.Integer(), nullable=False),
+        sa.Column('response_b', sa.Integer(), nullable=False),
+        sa.Column('response_c', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ir_id'], ['irmodel.ir_id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ux_irdailyactivitymodel_ir_id_day_ist_kind',
+        'irdailyactivitymodel',
+        ['ir_id', 'day_ist', 'kind'],
+        unique=True,
+    )
+
+    day = _IST_DAY[op.get_bind().dialect.name]
+    info_day, plan_day = day.format('info_date'), day.format('plan_date')
+    op.execute(
+        "INSERT INTO irdailyactivitymodel (ir_id, day_ist, kind, done, response_a, response_b, response_c)"
+        f" SELECT ir_id, {info_day}, 'info', count(*),"
+        " sum(CASE WHEN response = 'A' THEN 1 ELSE 0 END),"
+        " sum(CASE WHEN response = 'B' THEN 1 ELSE 0 END),"
+        " sum(CASE WHEN response = 'C' THEN 1 ELSE 0 END)"
+        f" FROM infodetailmodel GROUP BY ir_id, {info_day}"
+    )
+    op.execute(
+        "INSERT INTO irdailyactivitymodel (ir_id, day_ist, kind, done, response_a, response_b, response_c)"
+        f" SELECT ir_id, {plan_day}, 'plan', count(*), 0, 0, 0"
+        f" FROM plandetailmodel GROUP BY ir_id, {plan_day}"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_irdailyactivitymodel_ir_id_day_ist_kind', table_name='irdailyactivitymodel')
+    op.drop_table('irdailyactivitymodel')
@@ -0,0 +1,36 @@
+"""revoked tokens
+
+Revision ID: c5e2f7a1d904
+Revises: 8a4e6b2c5d31
+Create Date: 2026-10-18 12:00:00.000000
+
+Denylist of signed session tokens revoked before their expiry.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2f7a1d904'
+down_revision: Union[str, Sequence[str], None] = '8a4e6b2c5d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'revokedtokenmodel',
+        sa.Column('jti', sa.String(length=32), nullable=False),
+        sa.Column('ir_id', sa.String(length=18), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('jti'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('revokedtokenmodel')
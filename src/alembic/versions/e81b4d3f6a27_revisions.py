@@ -0,0 +1,35 @@
+"""revisions
+
+Revision ID: e81b4d3f6a27
+Revises: c5e2f7a1d904
+Create Date: 2026-10-18 14:00:00.000000
+
+Revision counter and last change time on teams and IRs, used to answer
+conditional GETs (ETag / Last-Modified) without running the aggregations.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b4d3f6a27'
+down_revision: Union[str, Sequence[str], None] = 'c5e2f7a1d904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('irmodel', 'teammodel'):
+        op.add_column(table, sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('teammodel', 'irmodel'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
+            batch_op.drop_column('revision')
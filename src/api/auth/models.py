@@ -0,0 +1,10 @@
+from datetime import datetime, timezone
+from sqlmodel import SQLModel, Field
+
+
+# Session tokens revoked before they expire (logout, refresh rotation). Rows past expires_at can be purged.
+class RevokedTokenModel(SQLModel, table=True):
+    jti: str = Field(primary_key=True, max_length=32, title="Token ID")
+    ir_id: str = Field(max_length=18, title="IR ID")
+    expires_at: datetime = Field(title="Token expiry")
+    revoked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), title="Revoked at")
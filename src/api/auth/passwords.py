@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from passlib.hash import argon2
+from api.db.config import (
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    PASSWORD_MAX_CONCURRENCY,
+    PASSWORD_POOL_NICE,
+    PASSWORD_POOL_WORKERS,
+    PASSWORD_QUEUE_TIMEOUT,
+)
+
+# Argon2 is CPU and memory hard on purpose. Hashing runs in separate processes so a
+# login burst cannot hold the GIL, and a semaphore bounds how many calls can queue
+# for them so logins fail fast with 503 instead of piling up behind each other.
+
+hasher = argon2.using(
+    rounds=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
+
+_executor: Optional[Executor] = None
+_bulkhead: Optional[asyncio.Semaphore] = None
+
+
+def hash_password(password: str) -> str:
+    return hasher.hash(password)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    return [hasher.hash(password) for password in passwords]
+
+
+def is_password_hash(value: str) -> bool:
+    """Whether value already is a hash of the configured scheme (e.g. carried over from another instance)."""
+    return hasher.identify(value)
+
+
+def verify_password(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password against its stored hash.
+
+    Returns:
+        (bool, str | None): Whether it matches, and a new hash when it matches but was
+        made with different cost parameters than the configured ones.
+    """
+    if not hasher.verify(password, password_hash):
+        return False, None
+    if hasher.needs_update(password_hash):
+        return True, hasher.hash(password)
+    return True, None
+
+
+def _init_worker():
+    # Lower priority so request handling wins the CPU when both compete
+    if PASSWORD_POOL_NICE and hasattr(os, "nice"):
+        os.nice(PASSWORD_POOL_NICE)
+
+
+def start_password_pool():
+    """
+    Start the hashing processes and the bulkhead for the running event loop. Processes
+    are spawned, not forked, so they never inherit the app's threads or connections.
+    """
+    global _executor, _bulkhead
+    _bulkhead = asyncio.Semaphore(PASSWORD_MAX_CONCURRENCY)
+    if _executor is None and PASSWORD_POOL_WORKERS > 0:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+
+def shutdown_password_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    if _bulkhead is None:
+        start_password_pool()
+    try:
+        await asyncio.wait_for(_bulkhead.acquire(), timeout=PASSWORD_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many logins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        if _executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _bulkhead.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the password pool, raises 503 when the bulkhead is full."""
+    return await _run(hash_password, password)
+
+
+async def hash_passwords_async(passwords: List[str], chunk_size: int = 16) -> List[str]:
+    """
+    hash_passwords for bulk imports: chunks of chunk_size run on the password pool, at
+    most one chunk per pool process at a time, so logins still get bulkhead slots.
+    """
+    chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+    in_flight = asyncio.Semaphore(max(PASSWORD_POOL_WORKERS, 1))
+
+    async def run_chunk(chunk):
+        async with in_flight:
+            return await _run(hash_passwords, chunk)
+
+    hashed = await asyncio.gather(*map(run_chunk, chunks))
+    return [password_hash for chunk in hashed for password_hash in chunk]
+
+
+async def verify_password_async(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """verify_password on the password pool, raises 503 when the bulkhead is full."""
+    return await _run(verify_password, password, password_hash)
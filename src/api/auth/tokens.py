@@ -0,0 +1,166 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.db.config import (
+    AUTH_ACCESS_TOKEN_TTL,
+    AUTH_ALLOW_EPHEMERAL_SECRET,
+    AUTH_REFRESH_TOKEN_TTL,
+    AUTH_REVOCATION_CACHE_TTL,
+    AUTH_TOKEN_SECRET,
+)
+from api.db.session import async_engine
+from .models import RevokedTokenModel
+
+# Tokens are "<base64url(json claims)>.<base64url(hmac-sha256)>": verified with one HMAC
+# in memory, so authorization needs no database round trip. Revocations are checked
+# against a per-worker copy of the denylist reloaded every AUTH_REVOCATION_CACHE_TTL seconds.
+
+if AUTH_TOKEN_SECRET:
+    _secret = AUTH_TOKEN_SECRET.encode()
+elif AUTH_ALLOW_EPHEMERAL_SECRET:
+    print("AUTH_TOKEN_SECRET is not set, signing tokens with a random per-process secret")
+    _secret = secrets.token_bytes(32)
+else:
+    raise RuntimeError("AUTH_TOKEN_SECRET needs to be set (or AUTH_ALLOW_EPHEMERAL_SECRET=true for development)")
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+# Access levels allowed to set targets: Admin, LDC, LS
+TARGET_SETTER_LEVELS = (1, 2, 3)
+# Access levels allowed to bulk import IRs: Admin
+IMPORT_LEVELS = (1,)
+
+
+class TokenClaims(SQLModel):
+    sub: str  # ir_id
+    lvl: int  # ir_access_level
+    teams: Dict[int, str] = {}  # team_id -> role
+    typ: str = ACCESS
+    jti: str
+    iat: int
+    exp: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: str) -> str:
+    return _b64encode(hmac.new(_secret, body.encode(), hashlib.sha256).digest())
+
+
+def issue_token(ir_id: str, access_level: int, teams: Dict[int, str], typ: str = ACCESS) -> str:
+    """Sign a token for an IR. teams maps team_id -> role, as in TeamMemberLink."""
+    now = int(time.time())
+    claims = {
+        "sub": ir_id,
+        "lvl": access_level,
+        "teams": {str(team_id): role for team_id, role in teams.items()},
+        "typ": typ,
+        "jti": secrets.token_hex(16),
+        "iat": now,
+        "exp": now + (AUTH_ACCESS_TOKEN_TTL if typ == ACCESS else AUTH_REFRESH_TOKEN_TTL),
+    }
+    body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{body}.{_sign(body)}"
+
+
+def issue_token_pair(ir_id: str, access_level: int, teams: Dict[int, str]) -> dict:
+    """The token part of the /login and /token/refresh responses."""
+    return {
+        "access_token": issue_token(ir_id, access_level, teams, ACCESS),
+        "refresh_token": issue_token(ir_id, access_level, teams, REFRESH),
+        "token_type": "bearer",
+        "expires_in": AUTH_ACCESS_TOKEN_TTL,
+    }
+
+
+def decode_token(token: str, typ: str = ACCESS) -> TokenClaims:
+    """Check signature, type and expiry (not revocation). Raises 401 on any failure."""
+    try:
+        body, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(body)):
+            raise ValueError("bad signature")
+        claims = TokenClaims.model_validate(json.loads(_b64decode(body)))
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token", headers={"WWW-Authenticate": "Bearer"})
+    if claims.typ != typ or claims.exp <= time.time():
+        raise HTTPException(status_code=401, detail="Token expired", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+
+class RevocationCache:
+    """Per-worker copy of the unexpired revoked token ids, reloaded at most every ttl seconds."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._jtis: Set[str] = set()
+        self._loaded_at = float("-inf")
+
+    async def _reload(self):
+        async with AsyncSession(async_engine) as session:
+            query = select(RevokedTokenModel.jti).where(RevokedTokenModel.expires_at > datetime.now(timezone.utc))
+            self._jtis = set((await session.exec(query)).all())
+        self._loaded_at = time.monotonic()
+
+    async def is_revoked(self, jti: str) -> bool:
+        if time.monotonic() - self._loaded_at > self.ttl:
+            await self._reload()
+        return jti in self._jtis
+
+    def add(self, jti: str):
+        self._jtis.add(jti)
+
+    def clear(self):
+        self._jtis = set()
+        self._loaded_at = float("-inf")
+
+
+revocations = RevocationCache(AUTH_REVOCATION_CACHE_TTL)
+
+
+async def revoke_token(session: AsyncSession, claims: TokenClaims):
+    """Add a token to the denylist. Takes effect at once on this worker, within the cache TTL on others."""
+    if await session.get(RevokedTokenModel, claims.jti) is None:
+        session.add(RevokedTokenModel(
+            jti=claims.jti,
+            ir_id=claims.sub,
+            expires_at=datetime.fromtimestamp(claims.exp, timezone.utc),
+        ))
+    revocations.add(claims.jti)
+
+
+bearer = HTTPBearer(auto_error=False)
+
+
+async def get_current_ir(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)) -> TokenClaims:
+    """Dependency: the claims of a valid, unrevoked access token from the Authorization header."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    claims = decode_token(credentials.credentials, ACCESS)
+    if await revocations.is_revoked(claims.jti):
+        raise HTTPException(status_code=401, detail="Token revoked", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+
+def require_access_level(levels: List[int]):
+    """Dependency factory: like get_current_ir, and 403 unless the IR's access level is in levels."""
+    async def dependency(claims: TokenClaims = Depends(get_current_ir)) -> TokenClaims:
+        if claims.lvl not in levels:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        return claims
+    return dependency
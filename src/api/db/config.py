@@ -1,3 +1,76 @@
 from decouple import config as decouple_config
 
-DATABASE_URL = decouple_config("DATABASE_URL")
\ No newline at end of file
+DATABASE_URL = decouple_config("DATABASE_URL")
+
+# Pagination
+API_DEFAULT_PAGE_SIZE = decouple_config("API_DEFAULT_PAGE_SIZE", default=100, cast=int)
+API_MAX_PAGE_SIZE = decouple_config("API_MAX_PAGE_SIZE", default=500, cast=int)
+
+# Connection pool (per engine, per worker: gunicorn multiplies these by the worker count)
+DB_POOL_SIZE = decouple_config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = decouple_config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = decouple_config("DB_POOL_TIMEOUT", default=30, cast=int)  # seconds to wait for a free connection
+DB_POOL_RECYCLE = decouple_config("DB_POOL_RECYCLE", default=1800, cast=int)  # seconds, below the server's idle timeout
+DB_POOL_PRE_PING = decouple_config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_STATEMENT_TIMEOUT_MS = decouple_config("DB_STATEMENT_TIMEOUT_MS", default=0, cast=int)  # 0 disables the timeout
+DB_APPLICATION_NAME = decouple_config("DB_APPLICATION_NAME", default="du_backend")
+# Set when connecting through PgBouncer in transaction pooling mode
+DB_PGBOUNCER_TRANSACTION_MODE = decouple_config("DB_PGBOUNCER_TRANSACTION_MODE", default=False, cast=bool)
+
+# Week rollover: each worker runs an in-process scheduler at Friday 21:31 IST (idempotent across workers).
+# Disable when the rollover is run from cron instead: python -m api.events.rollover
+WEEK_ROLLOVER_SCHEDULER = decouple_config("WEEK_ROLLOVER_SCHEDULER", default=True, cast=bool)
+
+# Password hashing (argon2id). Changing these rehashes each IR's password on their next login.
+ARGON2_TIME_COST = decouple_config("ARGON2_TIME_COST", default=3, cast=int)
+ARGON2_MEMORY_COST = decouple_config("ARGON2_MEMORY_COST", default=65536, cast=int)  # KiB
+ARGON2_PARALLELISM = decouple_config("ARGON2_PARALLELISM", default=4, cast=int)
+# Processes per worker that hash/verify passwords; 0 hashes in a thread instead (development)
+PASSWORD_POOL_WORKERS = decouple_config("PASSWORD_POOL_WORKERS", default=2, cast=int)
+PASSWORD_POOL_NICE = decouple_config("PASSWORD_POOL_NICE", default=10, cast=int)
+# Bulkhead: hash/verify calls allowed in flight per worker, and how long a login waits for a slot before a 503
+PASSWORD_MAX_CONCURRENCY = decouple_config("PASSWORD_MAX_CONCURRENCY", default=8, cast=int)
+PASSWORD_QUEUE_TIMEOUT = decouple_config("PASSWORD_QUEUE_TIMEOUT", default=5.0, cast=float)
+
+# Session tokens (HMAC-SHA256). AUTH_TOKEN_SECRET is required and must be the same on every worker.
+# AUTH_ALLOW_EPHEMERAL_SECRET=true lets a development server start without it: each worker then
+# signs with a random secret, so tokens only work on the worker that issued them, until restart.
+AUTH_TOKEN_SECRET = decouple_config("AUTH_TOKEN_SECRET", default="")
+AUTH_ALLOW_EPHEMERAL_SECRET = decouple_config("AUTH_ALLOW_EPHEMERAL_SECRET", default=False, cast=bool)
+AUTH_ACCESS_TOKEN_TTL = decouple_config("AUTH_ACCESS_TOKEN_TTL", default=900, cast=int)  # seconds
+AUTH_REFRESH_TOKEN_TTL = decouple_config("AUTH_REFRESH_TOKEN_TTL", default=7 * 24 * 3600, cast=int)  # seconds
+AUTH_REVOCATION_CACHE_TTL = decouple_config("AUTH_REVOCATION_CACHE_TTL", default=30, cast=int)  # seconds between denylist reloads
+
+# Read cache for the polled team/dashboard endpoints, invalidated by writes
+CACHE_ENABLED = decouple_config("CACHE_ENABLED", default=True, cast=bool)
+CACHE_TTL = decouple_config("CACHE_TTL", default=30, cast=float)  # seconds; with the memory backend, bounds staleness from writes on other workers
+CACHE_MAX_ENTRIES = decouple_config("CACHE_MAX_ENTRIES", default=2048, cast=int)
+# "memory" (per worker) or "redis" (shared by all workers, invalidations broadcast over pub/sub)
+CACHE_BACKEND = decouple_config("CACHE_BACKEND", default="memory")
+CACHE_REDIS_URL = decouple_config("CACHE_REDIS_URL", default="redis://localhost:6379/0")  # fakeredis:// for an in-process stand-in
+CACHE_REDIS_TIMEOUT = decouple_config("CACHE_REDIS_TIMEOUT", default=0.25, cast=float)  # seconds; a slow redis counts as a miss
+CACHE_REDIS_CHANNEL = decouple_config("CACHE_REDIS_CHANNEL", default="du:cache:invalidate")
+CACHE_REDIS_PREFIX = decouple_config("CACHE_REDIS_PREFIX", default="du:cache:")
+CACHE_L1_TTL = decouple_config("CACHE_L1_TTL", default=5, cast=float)  # seconds a worker keeps its own copy with the redis backend
+
+# Weekly leaderboards, in Redis ZSETs when CACHE_BACKEND=redis (same CACHE_REDIS_URL), else per worker
+LEADERBOARD_TTL = decouple_config("LEADERBOARD_TTL", default=300, cast=float)  # seconds before a ranking is rebuilt from the database
+LEADERBOARD_REDIS_PREFIX = decouple_config("LEADERBOARD_REDIS_PREFIX", default="du:leaderboard:")
+
+# Live progress feed (/live, Server-Sent Events). Workers share deltas over Postgres LISTEN/NOTIFY,
+# one listening connection each; LISTEN needs a session, so point LIVE_DATABASE_URL past PgBouncer
+# in transaction mode. On SQLite the feed only reaches clients of the worker that ingested.
+LIVE_DATABASE_URL = decouple_config("LIVE_DATABASE_URL", default=DATABASE_URL)
+LIVE_CHANNEL = decouple_config("LIVE_CHANNEL", default="du_live")
+LIVE_HEARTBEAT = decouple_config("LIVE_HEARTBEAT", default=15, cast=float)  # seconds between keep-alive comments
+LIVE_QUEUE_SIZE = decouple_config("LIVE_QUEUE_SIZE", default=256, cast=int)  # events a client may lag behind before a resync
+LIVE_MAX_TOPICS = decouple_config("LIVE_MAX_TOPICS", default=200, cast=int)  # teams + IRs per subscription
+
+# Bulk IR import (/import_irs)
+IMPORT_BATCH_SIZE = decouple_config("IMPORT_BATCH_SIZE", default=1000, cast=int)  # records hashed and staged (COPY) at a time
+IMPORT_MAX_REPORTED_ERRORS = decouple_config("IMPORT_MAX_REPORTED_ERRORS", default=1000, cast=int)
+
+# Response compression: brotli when the client accepts it and the brotli package is installed, else gzip
+COMPRESSION_MINIMUM_SIZE = decouple_config("COMPRESSION_MINIMUM_SIZE", default=1024, cast=int)  # bytes; smaller bodies go out as-is
+COMPRESSION_GZIP_LEVEL = decouple_config("COMPRESSION_GZIP_LEVEL", default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = decouple_config("COMPRESSION_BROTLI_QUALITY", default=5, cast=int)
@@ -1,29 +1,162 @@
+import time
+from collections import Counter
+from pathlib import Path
 import sqlmodel
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel, Session
-from .config import DATABASE_URL
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.metrics import observe_pool_event, observe_statement
+from .config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_APPLICATION_NAME,
+    DB_PGBOUNCER_TRANSACTION_MODE,
+)
 
 if DATABASE_URL == "":
     raise NotImplementedError("DATABASE_URL needs to be set!!!")
 
-engine = sqlmodel.create_engine(DATABASE_URL)
+def async_database_url(url: str) -> str:
+    """Return the async-driver form of a database URL (psycopg 3 for Postgres, aiosqlite for SQLite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+def engine_options(url: str) -> dict:
+    """
+    Keyword arguments for create_engine/create_async_engine, built from the DB_* settings.
+
+    SQLite gets no pool tuning so the service can boot locally without Postgres.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+
+    connect_args = {"application_name": DB_APPLICATION_NAME}
+    if DB_PGBOUNCER_TRANSACTION_MODE:
+        # Server connections are shared between clients: no server-side prepared statements
+        # and no session-level settings (statement_timeout is applied per transaction instead)
+        if parsed.get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+    elif DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+# Cumulative pool events per engine ("sync"/"async"), reported by pool_stats()
+POOL_EVENTS = {"sync": Counter(), "async": Counter()}
+
+def build_engine(url: str, is_async: bool = False):
+    """Create the sync or async engine for url with the configured pool and timeout settings."""
+    options = engine_options(url)
+    new_engine = create_async_engine(url, **options) if is_async else sqlmodel.create_engine(url, **options)
+    sync_engine = new_engine.sync_engine if is_async else new_engine
+    engine_name = "async" if is_async else "sync"
+    counters = POOL_EVENTS[engine_name]
+
+    def count_pool_event(name: str):
+        counters.update([name])
+        observe_pool_event(engine_name, name)
+
+    for pool_event in ("connect", "checkout", "checkin", "invalidate"):
+        event.listen(sync_engine.pool, pool_event, lambda *args, name=pool_event: count_pool_event(name))
+
+    # Statement count and time, per engine and per request (api.metrics)
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_statement_timer(connection, cursor, statement, parameters, context, executemany):
+        context.statement_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def count_statement(connection, cursor, statement, parameters, context, executemany):
+        observe_statement(engine_name, time.perf_counter() - context.statement_started)
+
+    if DB_PGBOUNCER_TRANSACTION_MODE and DB_STATEMENT_TIMEOUT_MS > 0 and sync_engine.dialect.name == "postgresql":
+        @event.listens_for(sync_engine, "begin")
+        def set_statement_timeout(connection):
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+    return new_engine
+
+def _pool_stats(pool, counters: Counter) -> dict:
+    stats = {"pool": type(pool).__name__, **{name: counters[name] for name in ("connect", "checkout", "checkin", "invalidate")}}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),  # QueuePool counts up from -size until the pool is full
+        })
+    return stats
+
+def pool_stats() -> dict:
+    """Current checkout/overflow state and cumulative event counts of both connection pools."""
+    return {
+        "sync": _pool_stats(engine.pool, POOL_EVENTS["sync"]),
+        "async": _pool_stats(async_engine.sync_engine.pool, POOL_EVENTS["async"]),
+    }
+
+engine = build_engine(DATABASE_URL)
+# Used by the async route handlers, so slow queries don't pin a threadpool thread
+async_engine = build_engine(async_database_url(DATABASE_URL), is_async=True)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Arbitrary key for the Postgres advisory lock that serialises migrations across workers
+MIGRATION_LOCK_KEY = 7310521
+
+def run_migrations():
+    """Upgrade the database to the latest Alembic revision."""
+    alembic_cfg = AlembicConfig(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Every gunicorn worker runs this on startup, only one may migrate at a time
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        alembic_cfg.attributes["connection"] = connection
+        command.upgrade(alembic_cfg, "head")
 
 def init_db():
     try:
-        print("Creating tables")
-        SQLModel.metadata.create_all(engine)
+        print("Running database migrations")
+        run_migrations()
     except Exception as e:
-        print(f"Error creating tables: {e}")
+        print(f"Error running migrations: {e}")
 
 def reset_db():
     """Drops all tables and recreates them"""
     try:
         print("Resetting database...")
         SQLModel.metadata.drop_all(engine)   # Drop all existing tables
-        SQLModel.metadata.create_all(engine) # Recreate tables
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        run_migrations()                     # Recreate tables
         print("✅ Database reset successful!")
     except Exception as e:
         print(f"Error resetting database: {e}")
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,200 @@
+from typing import Dict, List, Tuple
+from sqlalchemy import Integer, String, case, cast, column, func, tuple_, update, values
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Values
+from sqlmodel import Session, select
+from .counters import dialect_insert, touch_irs, touch_teams
+from .models import AssignIrValidation, IrModel, IrTargetItem, TeamMemberLink, TeamModel, TeamTargetItem
+
+# Batch versions of add_ir_to_team and set_targets: every list is applied with a fixed
+# number of set-based statements (INSERT ... ON CONFLICT, UPDATE ... FROM (VALUES ...))
+# in the caller's transaction, whatever its length. Items that cannot be applied are
+# reported and skipped; the others still go through.
+
+# Items per request, at most
+BULK_MAX_ITEMS = 5000
+
+
+@compiles(Values, "sqlite")
+def _values_sqlite(element, compiler, **kw):
+    # SQLite has no "(VALUES ...) AS v (a, b)" column list; its VALUES columns are column1..N
+    if not kw.get("asfrom"):
+        return compiler.visit_values(element, **kw)
+    rows = compiler.visit_values(element, **{**kw, "asfrom": False})
+    columns = ", ".join(
+        f"column{position} AS {compiler.preparer.quote(value_column.name)}"
+        for position, value_column in enumerate(element.columns, 1)
+    )
+    return f"(SELECT {columns} FROM ({rows})) AS {compiler.preparer.quote(element.name)}"
+
+
+def _result(index: int, status: str, detail: str = None, **ids) -> dict:
+    result = {"index": index, **ids, "status": status}
+    if detail:
+        result["detail"] = detail
+    return result
+
+
+def _first_seen(keys: List) -> Dict[int, int]:
+    """index -> index of the earlier item with the same key, for repeated keys."""
+    seen: Dict = {}
+    repeats = {}
+    for index, key in enumerate(keys):
+        if key in seen:
+            repeats[index] = seen[key]
+        else:
+            seen[key] = index
+    return repeats
+
+
+def assign_members(session: Session, assignments: List[AssignIrValidation]) -> Tuple[List[dict], Dict[str, set]]:
+    """
+    Add IRs to teams with a role, or change the role of existing members.
+
+    Returns:
+        (results, changed): one result per assignment, in order, with status "added",
+        "updated" (role changed), "unchanged" or "error" (+ detail); and the ir_ids,
+        team_ids and old/new roles of the memberships that changed, for invalidation.
+    """
+    keys = [(item.team_id, item.ir_id) for item in assignments]
+    repeats = _first_seen(keys)
+    ir_ids = {item.ir_id for item in assignments}
+    team_ids = {item.team_id for item in assignments}
+    known_irs = set(session.exec(select(IrModel.ir_id).where(IrModel.ir_id.in_(ir_ids))).all()) if ir_ids else set()
+    known_teams = set(session.exec(select(TeamModel.id).where(TeamModel.id.in_(team_ids))).all()) if team_ids else set()
+    current = {
+        (team_id, ir_id): role
+        for team_id, ir_id, role in session.exec(
+            select(TeamMemberLink.team_id, TeamMemberLink.ir_id, TeamMemberLink.role)
+            .where(tuple_(TeamMemberLink.team_id, TeamMemberLink.ir_id).in_(set(keys)))
+        ).all()
+    } if keys else {}
+
+    results: List[dict] = []
+    rows: List[dict] = []
+    changed = {"ir_ids": set(), "team_ids": set(), "roles": set()}
+    for index, (item, key) in enumerate(zip(assignments, keys)):
+        ids = {"ir_id": item.ir_id, "team_id": item.team_id}
+        if index in repeats:
+            results.append(_result(index, "error", f"Duplicate of item {repeats[index]}", **ids))
+        elif item.ir_id not in known_irs:
+            results.append(_result(index, "error", "IR not found", **ids))
+        elif item.team_id not in known_teams:
+            results.append(_result(index, "error", "Team not found", **ids))
+        elif current.get(key) == item.role:
+            results.append(_result(index, "unchanged", **ids))
+        else:
+            results.append(_result(index, "updated" if key in current else "added", **ids))
+            rows.append({"team_id": item.team_id, "ir_id": item.ir_id, "role": item.role})
+            changed["ir_ids"].add(item.ir_id)
+            changed["team_ids"].add(item.team_id)
+            changed["roles"].update({item.role, current.get(key)} - {None})
+
+    if rows:
+        statement = dialect_insert(session, TeamMemberLink).values(rows)
+        session.exec(statement.on_conflict_do_update(
+            index_elements=["team_id", "ir_id"],
+            set_={"role": statement.excluded.role},
+        ))
+        touch_teams(session, list(changed["team_ids"]))
+        touch_irs(session, list(changed["ir_ids"]))
+    return results, changed
+
+
+def _target(value_column):
+    # A VALUES column of only NULLs has no type on Postgres
+    return cast(value_column, Integer)
+
+
+def set_ir_targets(session: Session, items: List[IrTargetItem]) -> Tuple[List[dict], List[str], List[int]]:
+    """
+    Update the weekly targets of many IRs with one UPDATE ... FROM (VALUES ...). Targets
+    left out (None) are kept; weekly_uv_target only applies to LDC/LS, as in set_targets.
+
+    Returns:
+        (results, updated ir_ids, their team ids): status "updated" or "error" (+ detail) per item.
+    """
+    repeats = _first_seen([item.ir_id for item in items])
+    rows = [
+        (item.ir_id, item.weekly_info_target, item.weekly_plan_target, item.weekly_uv_target)
+        for index, item in enumerate(items) if index not in repeats
+    ]
+    updated, team_ids = [], []
+    if rows:
+        targets = values(
+            column("ir_id", String), column("info", Integer), column("plan", Integer), column("uv", Integer),
+            name="targets",
+        ).data(rows)
+        updated = list(session.exec(
+            update(IrModel)
+            .where(IrModel.ir_id == targets.c.ir_id)
+            .values(
+                weekly_info_target=func.coalesce(_target(targets.c.info), IrModel.weekly_info_target),
+                weekly_plan_target=func.coalesce(_target(targets.c.plan), IrModel.weekly_plan_target),
+                weekly_uv_target=case(
+                    (IrModel.ir_access_level.in_([2, 3]), func.coalesce(_target(targets.c.uv), IrModel.weekly_uv_target)),
+                    else_=IrModel.weekly_uv_target,
+                ),
+            )
+            .returning(IrModel.ir_id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        # Their targets feed their teams' totals too
+        team_ids = member_teams(session, updated)
+        touch_irs(session, updated)
+        touch_teams(session, team_ids)
+
+    found = set(updated)
+    results = []
+    for index, item in enumerate(items):
+        if index in repeats:
+            results.append(_result(index, "error", f"Duplicate of item {repeats[index]}", ir_id=item.ir_id))
+        elif item.ir_id not in found:
+            results.append(_result(index, "error", "IR not found", ir_id=item.ir_id))
+        else:
+            results.append(_result(index, "updated", ir_id=item.ir_id))
+    return results, updated, team_ids
+
+
+def set_team_targets(session: Session, items: List[TeamTargetItem]) -> Tuple[List[dict], List[int]]:
+    """Team counterpart of set_ir_targets."""
+    repeats = _first_seen([item.team_id for item in items])
+    rows = [
+        (item.team_id, item.weekly_info_target, item.weekly_plan_target)
+        for index, item in enumerate(items) if index not in repeats
+    ]
+    updated = []
+    if rows:
+        targets = values(
+            column("team_id", Integer), column("info", Integer), column("plan", Integer),
+            name="targets",
+        ).data(rows)
+        updated = list(session.exec(
+            update(TeamModel)
+            .where(TeamModel.id == targets.c.team_id)
+            .values(
+                weekly_info_target=func.coalesce(_target(targets.c.info), TeamModel.weekly_info_target),
+                weekly_plan_target=func.coalesce(_target(targets.c.plan), TeamModel.weekly_plan_target),
+            )
+            .returning(TeamModel.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        touch_teams(session, updated)
+
+    found = set(updated)
+    results = []
+    for index, item in enumerate(items):
+        if index in repeats:
+            results.append(_result(index, "error", f"Duplicate of item {repeats[index]}", team_id=item.team_id))
+        elif item.team_id not in found:
+            results.append(_result(index, "error", "Team not found", team_id=item.team_id))
+        else:
+            results.append(_result(index, "updated", team_id=item.team_id))
+    return results, updated
+
+
+def member_teams(session: Session, ir_ids: List[str]) -> List[int]:
+    """Ids of the teams the IRs belong to."""
+    if not ir_ids:
+        return []
+    return list(session.exec(select(TeamMemberLink.team_id).where(TeamMemberLink.ir_id.in_(ir_ids)).distinct()).all())
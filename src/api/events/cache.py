@@ -0,0 +1,405 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+from api.db.config import (
+    CACHE_BACKEND,
+    CACHE_ENABLED,
+    CACHE_L1_TTL,
+    CACHE_MAX_ENTRIES,
+    CACHE_REDIS_CHANNEL,
+    CACHE_REDIS_PREFIX,
+    CACHE_REDIS_TIMEOUT,
+    CACHE_REDIS_URL,
+    CACHE_TTL,
+)
+
+# Read-through cache for the polled team/dashboard endpoints. Entries carry tags naming
+# the rows they were built from, and writes invalidate by tag:
+#   team:<id>       a team's row, its roster and its members' counters/targets
+#   ir:<ir_id>      an IR's row (targets, counters)
+#   ir-teams:<id>   which teams an IR belongs to
+#   teams           the set of teams (create/delete)
+#   ldcs            who is an LDC anywhere
+# Every entry also carries "*", so clear() is invalidate("*").
+
+MISSING = object()
+
+
+def team_tag(team_id: int) -> str:
+    return f"team:{team_id}"
+
+
+def ir_tag(ir_id: str) -> str:
+    return f"ir:{ir_id}"
+
+
+def ir_teams_tag(ir_id: str) -> str:
+    return f"ir-teams:{ir_id}"
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the read cache backends.
+
+    begin() is called before a value is loaded and its token passed to set(); set()
+    drops the value if any of its tags was invalidated in between, so a load that
+    overlaps a write never stores the pre-write result.
+
+    The async handlers go through begin_async()/get_async()/set_async(); a backend doing
+    network I/O overrides them to keep it off the event loop.
+    """
+
+    @abstractmethod
+    def begin(self):
+        ...
+
+    @abstractmethod
+    def get(self, key: Hashable):
+        """The cached value, or MISSING."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value, tags: Iterable[str] = (), token=None):
+        ...
+
+    @abstractmethod
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of the tags, on every worker sharing the backend."""
+
+    def clear(self):
+        self.invalidate("*")
+
+    async def begin_async(self):
+        return self.begin()
+
+    async def get_async(self, key: Hashable):
+        return self.get(key)
+
+    async def set_async(self, key: Hashable, value, tags: Iterable[str] = (), token=None):
+        self.set(key, value, tags, token)
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    def start(self):
+        """Start background work (subscriptions). Called from the app lifespan."""
+
+    def stop(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Thread-safe LRU cache with a per-entry TTL and tag-based invalidation, local to one process."""
+
+    def __init__(self, max_entries: int, ttl: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, object, Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[Hashable]] = {}
+        self._invalidated_at: Dict[str, int] = {}
+        self._epoch = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def begin(self) -> int:
+        return self._epoch
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def get(self, key):
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags: Iterable[str] = (), token: int = None):
+        if not self.enabled:
+            return
+        tags = tuple({"*", *tags})
+        with self._lock:
+            if token is not None and any(self._invalidated_at.get(tag, -1) > token for tag in tags):
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        dropped = 0
+        with self._lock:
+            self._epoch += 1
+            for tag in tags:
+                self._invalidated_at[tag] = self._epoch
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._drop(key)
+                    dropped += 1
+            # Epochs only matter for loads still in flight; forget old ones
+            if len(self._invalidated_at) > 4 * self.max_entries:
+                self._invalidated_at = {tag: epoch for tag, epoch in self._invalidated_at.items() if epoch == self._epoch}
+            self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by all workers through Redis, with a short-lived MemoryCacheBackend (L1)
+    in front of it so most reads stay in process.
+
+    Redis layout, under prefix:
+        v:<key>    JSON {"v": value, "t": tags}, expires after ttl
+        t:<tag>    set of the v: keys carrying the tag
+        inv:<tag>  epoch of the tag's last invalidation (from the epoch counter)
+    invalidate() deletes the tagged keys and publishes the tags on channel; every worker's
+    listener thread drops them from its L1. If the subscription drops, the L1 is cleared
+    on reconnect and l1_ttl bounds what a worker can miss.
+    """
+
+    def __init__(self, client, ttl: float, l1: MemoryCacheBackend, channel: str, prefix: str):
+        self.client = client
+        self.ttl = max(int(ttl), 1)
+        self.l1 = l1
+        self.channel = channel
+        self.prefix = prefix
+        self.origin = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._listener = None
+        self.shared_hits = self.shared_misses = self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}v:{json.dumps(key, separators=(',', ':'), default=str)}"
+
+    def begin(self):
+        try:
+            shared = int(self.client.get(f"{self.prefix}epoch") or 0)
+        except Exception:
+            self.errors += 1
+            shared = None
+        return self.l1.begin(), shared
+
+    def get(self, key):
+        value = self.l1.get(key)
+        if value is not MISSING:
+            return value
+        l1_token = self.l1.begin()
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception:
+            # Redis down: behave as a miss, the caller loads from Postgres
+            self.errors += 1
+            return MISSING
+        if raw is None:
+            self.shared_misses += 1
+            return MISSING
+        self.shared_hits += 1
+        entry = json.loads(raw)
+        self.l1.set(key, entry["v"], entry["t"], l1_token)
+        return entry["v"]
+
+    def set(self, key, value, tags: Iterable[str] = (), token=None):
+        l1_token, shared_token = token if token is not None else (None, None)
+        tags = sorted({"*", *tags})
+        self.l1.set(key, value, tags, l1_token)
+        if shared_token is None:
+            return
+        redis_key = self._key(key)
+        inv_keys = [f"{self.prefix}inv:{tag}" for tag in tags]
+        payload = json.dumps({"v": value, "t": tags}, separators=(",", ":"))
+
+        def store(pipe):
+            # Runs under WATCH on inv_keys: an invalidation racing this store aborts it
+            invalidated = pipe.mget(inv_keys)
+            if any(epoch is not None and int(epoch) > shared_token for epoch in invalidated):
+                return
+            pipe.multi()
+            pipe.set(redis_key, payload, ex=self.ttl)
+            for tag in tags:
+                pipe.sadd(f"{self.prefix}t:{tag}", redis_key)
+                pipe.expire(f"{self.prefix}t:{tag}", self.ttl)
+
+        try:
+            self.client.transaction(store, *inv_keys)
+        except Exception:
+            self.errors += 1
+
+    def invalidate(self, *tags: str) -> int:
+        dropped = self.l1.invalidate(*tags)
+        if not tags:
+            return dropped
+        try:
+            epoch = self.client.incr(f"{self.prefix}epoch")
+            pipe = self.client.pipeline()
+            for tag in tags:
+                # Must outlive any load that started before this invalidation
+                pipe.set(f"{self.prefix}inv:{tag}", epoch, ex=self.ttl * 2)
+                pipe.smembers(f"{self.prefix}t:{tag}")
+            results = pipe.execute()
+            keys = set().union(*results[1::2])
+            pipe = self.client.pipeline()
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(*(f"{self.prefix}t:{tag}" for tag in tags))
+            pipe.publish(self.channel, json.dumps({"origin": self.origin, "tags": list(tags)}))
+            pipe.execute()
+            dropped += len(keys)
+        except Exception:
+            self.errors += 1
+        return dropped
+
+    # The async handlers run Redis calls in a worker thread, L1 hits stay on the event loop;
+    # the write paths are sync handlers (threads already) and use begin/get/set/invalidate
+
+    async def begin_async(self):
+        return await asyncio.to_thread(self.begin)
+
+    async def get_async(self, key):
+        value = self.l1.get(key)
+        if value is not MISSING:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key, value, tags: Iterable[str] = (), token=None):
+        await asyncio.to_thread(self.set, key, value, tags, token)
+
+    def _listen(self):
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Invalidations published while we were not subscribed are lost
+                self.l1.clear()
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("origin") != self.origin:
+                        self.l1.invalidate(*data["tags"])
+            except Exception as exc:
+                self.errors += 1
+                print(f"Cache invalidation listener error: {exc}")
+                self._stop.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def start(self):
+        if self._listener is None:
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+            self._listener.start()
+
+    def stop(self):
+        if self._listener is not None:
+            self._stop.set()
+            self._listener.join(timeout=5)
+            self._listener = None
+
+    def stats(self) -> dict:
+        lookups = self.shared_hits + self.shared_misses
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "l1": self.l1.stats(),
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+            "shared_hit_ratio": round(self.shared_hits / lookups, 4) if lookups else None,
+            "errors": self.errors,
+            "listening": self._listener is not None and self._listener.is_alive(),
+        }
+
+
+def redis_client(url: str):
+    """A redis-py client for url; fakeredis:// gives an in-process stand-in (tests, local runs)."""
+    if url.startswith("fakeredis://"):
+        import fakeredis
+        return fakeredis.FakeRedis()
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)")
+    # A stuck redis must fail fast rather than stall requests (and hold their worker threads)
+    return redis.Redis.from_url(url, socket_timeout=CACHE_REDIS_TIMEOUT, socket_connect_timeout=CACHE_REDIS_TIMEOUT)
+
+
+def build_cache_backend(backend: str = CACHE_BACKEND) -> CacheBackend:
+    if backend == "memory" or not CACHE_ENABLED:
+        return MemoryCacheBackend(CACHE_MAX_ENTRIES, CACHE_TTL, enabled=CACHE_ENABLED)
+    if backend == "redis":
+        return RedisCacheBackend(
+            redis_client(CACHE_REDIS_URL),
+            ttl=CACHE_TTL,
+            l1=MemoryCacheBackend(CACHE_MAX_ENTRIES, CACHE_L1_TTL),
+            channel=CACHE_REDIS_CHANNEL,
+            prefix=CACHE_REDIS_PREFIX,
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND {backend!r}, expected 'memory' or 'redis'")
+
+
+read_cache = build_cache_backend()
+
+
+async def cached(key: Hashable, load: Callable[[], Awaitable[Tuple[object, Iterable[str]]]]):
+    """
+    Return the cached value for key, or await load() -> (value, tags), cache and return it.
+    Exceptions from load() are not cached.
+    """
+    value = await read_cache.get_async(key)
+    if value is not MISSING:
+        return value
+    token = await read_cache.begin_async()
+    value, tags = await load()
+    await read_cache.set_async(key, value, tags, token)
+    return value
+
+
+def invalidate(*tags: str):
+    read_cache.invalidate(*tags)
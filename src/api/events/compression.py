@@ -0,0 +1,129 @@
+import zlib
+from typing import Callable, Optional, Tuple
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .responses import accepts
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, clients that accept it get gzip
+    brotli = None
+
+# A plain ASGI middleware rather than a subclass of Starlette's gzip internals, which are
+# not a stable API. Bodies are compressed as they are sent, so streamed responses (exports)
+# stay streamed; event streams and already-compressed media are passed through untouched.
+
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "application/gzip", "application/zip", "image/*", "audio/*", "video/*")
+
+# (body, more_body) -> compressed bytes, flushed so the chunk can go out straight away
+Encoder = Callable[[bytes, bool], bytes]
+
+
+def gzip_encoder(level: int) -> Encoder:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(body: bytes, more_body: bool) -> bytes:
+        return compressor.compress(body) + (compressor.flush(zlib.Z_SYNC_FLUSH) if more_body else compressor.flush())
+    return encode
+
+
+def brotli_encoder(quality: int) -> Encoder:
+    compressor = brotli.Compressor(quality=quality)
+
+    def encode(body: bytes, more_body: bool) -> bytes:
+        return compressor.process(body) + (compressor.flush() if more_body else compressor.finish())
+    return encode
+
+
+def _excluded(content_type: str, excluded: Tuple[str, ...]) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in excluded or f"{media_type.partition('/')[0]}/*" in excluded
+
+
+class CompressionMiddleware:
+    """Compresses HTTP responses with brotli when the client accepts br and brotli is installed, else gzip."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        brotli_quality: int = 5,
+        thread_minimum_size: int = 128 * 1024,
+        exclude_content_types: Tuple[str, ...] = EXCLUDED_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.brotli_quality = brotli_quality
+        self.thread_minimum_size = thread_minimum_size
+        self.exclude_content_types = exclude_content_types
+
+    def _negotiate(self, accept_encoding: str) -> Tuple[Optional[str], Optional[Encoder]]:
+        if brotli is not None and accepts(accept_encoding, "br"):
+            return "br", brotli_encoder(self.brotli_quality)
+        if accepts(accept_encoding, "gzip"):
+            return "gzip", gzip_encoder(self.compresslevel)
+        return None, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding, encode = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None  # held back until the first body chunk decides the headers
+        passthrough = False
+        compressing = False
+
+        async def compress(body: bytes, more_body: bool) -> bytes:
+            if len(body) >= self.thread_minimum_size:
+                # Large bodies are compressed off the event loop
+                return await anyio.to_thread.run_sync(encode, body, more_body)
+            return encode(body, more_body)
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough, compressing
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or _excluded(headers.get("content-type", ""), self.exclude_content_types)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                # Trailers, or a pathsend in place of a body
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                initial, start = start, None
+                headers = MutableHeaders(raw=initial["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                compressing = encode is not None and (more_body or len(body) >= self.minimum_size)
+                if compressing:
+                    body = await compress(body, more_body)
+                    headers["Content-Encoding"] = encoding
+                    if more_body or initial.get("trailers"):
+                        del headers["Content-Length"]
+                    else:
+                        headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+                await send(initial)
+            elif compressing:
+                message = {**message, "body": await compress(body, more_body)}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,68 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import Request, Response
+
+# Conditional GETs for the polled read endpoints. Every write bumps the revision (and
+# updated_at) of the teams/IRs it touches (see counters.touch_teams/touch_irs), so a
+# resource's version is the handful of (id, revision, updated_at) rows behind it: one
+# indexed lookup instead of the aggregation. A matching If-None-Match gets a bodiless 304.
+#
+# Last-Modified is the newest updated_at among those rows. It cannot see rows that were
+# removed (e.g. a deleted team), so If-Modified-Since is only used without If-None-Match.
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes, Postgres aware ones
+    return value.astimezone(timezone.utc)
+
+
+def resource_version(rows, media_type: str = "") -> Tuple[str, Optional[datetime]]:
+    """
+    The weak ETag and the Last-Modified time of a resource, from its version rows.
+    media_type keeps the ETags of the JSON and MessagePack representations apart.
+    """
+    parts = [
+        tuple(_utc(value).timestamp() if isinstance(value, datetime) else value for value in row)
+        for row in rows
+    ]
+    etag = 'W/"%s"' % hashlib.sha1(repr((media_type, parts)).encode()).hexdigest()[:16]
+    stamps = [_utc(value) for row in rows for value in row if isinstance(value, datetime)]
+    return etag, max(stamps, default=None)
+
+
+def version_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """Validator headers for both 200 and 304 responses. no-cache: clients must revalidate on every poll."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def _opaque(tag: str) -> str:
+    # Weak comparison (RFC 9110 8.8.3.2): W/"x" matches "x"
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """True if the client's cached copy, per If-None-Match or else If-Modified-Since, is current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or _opaque(etag) in map(_opaque, tags)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole seconds
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
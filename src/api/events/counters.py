@@ -0,0 +1,154 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import func, literal, select, true, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
+from .models import IST, IrModel, TeamMemberLink, TeamModel, TeamWeekModel
+
+# All counter changes are single UPDATE ... SET col = col + :delta statements, so
+# concurrent writers never overwrite each other's increments.
+
+
+def _increments(columns: dict) -> dict:
+    return {
+        column.key: func.coalesce(column, 0) + delta
+        for column, delta in columns.items()
+        if delta
+    }
+
+
+def _touched(model) -> dict:
+    """SET values marking a row as changed for conditional GETs (see conditional.py)."""
+    return {"revision": func.coalesce(model.revision, 0) + 1, "updated_at": datetime.now(IST)}
+
+
+def bump_ir_counters(session: Session, ir_id: str, info_delta: int = 0, plan_delta: int = 0):
+    """Atomically add deltas to an IR's lifetime info_count/plan_count."""
+    values = _increments({IrModel.info_count: info_delta, IrModel.plan_count: plan_delta})
+    if values:
+        session.exec(
+            update(IrModel).where(IrModel.ir_id == ir_id).values(**values, **_touched(IrModel))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def bump_team_counters(session: Session, team_ids, info_delta: int = 0, plan_delta: int = 0) -> List[int]:
+    """
+    Atomically add deltas to the weekly_info_done/weekly_plan_done of many teams in one statement.
+    team_ids is a list of ids or a select of ids (e.g. an IR's memberships). Returns the updated team ids.
+    """
+    values = _increments({TeamModel.weekly_info_done: info_delta, TeamModel.weekly_plan_done: plan_delta})
+    if not values or team_ids is None:
+        return []
+    return list(session.exec(
+        update(TeamModel).where(TeamModel.id.in_(team_ids)).values(**values, **_touched(TeamModel))
+        .returning(TeamModel.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def touch_irs(session: Session, ir_ids):
+    """Bump the revision of IRs (a list of ids or a select of ids) whose targets or memberships changed."""
+    if isinstance(ir_ids, list) and not ir_ids:
+        return
+    session.exec(
+        update(IrModel).where(IrModel.ir_id.in_(ir_ids)).values(**_touched(IrModel))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def touch_teams(session: Session, team_ids):
+    """Bump the revision of teams (a list of ids or a select of ids) whose row, roster or members changed."""
+    if isinstance(team_ids, list) and not team_ids:
+        return
+    session.exec(
+        update(TeamModel).where(TeamModel.id.in_(team_ids)).values(**_touched(TeamModel))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def touch_ir_and_teams(session: Session, ir_id: str) -> List[int]:
+    """Bump the revision of an IR and of the teams it belongs to, e.g. after its info/plan rows changed. Returns the team ids."""
+    touch_irs(session, [ir_id])
+    return list(session.exec(
+        update(TeamModel)
+        .where(TeamModel.id.in_(select(TeamMemberLink.team_id).where(TeamMemberLink.ir_id == ir_id)))
+        .values(**_touched(TeamModel))
+        .returning(TeamModel.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def dialect_insert(session: Session, model):
+    """An INSERT construct for the session's dialect, so on_conflict_do_nothing/do_update are available."""
+    name = session.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(model)
+    if name == "sqlite":
+        return sqlite.insert(model)
+    raise RuntimeError(f"Upserts (ON CONFLICT) are implemented for postgresql and sqlite, not for the {name!r} dialect")
+
+
+def open_team_weeks(session: Session, team_ids: List[int], week_start: datetime):
+    """
+    Record empty snapshots under week_start for teams created after it, so the rollover of
+    week_start (which also runs as a catch-up on every startup) finds them archived and
+    leaves the counters they gather this week alone.
+    """
+    if not team_ids:
+        return
+    now = datetime.now(IST)
+    session.exec(
+        dialect_insert(session, TeamWeekModel)
+        .values([
+            {"team_id": team_id, "week_start": week_start, "weekly_info_done": 0, "weekly_plan_done": 0, "created_at": now}
+            for team_id in team_ids
+        ])
+        .on_conflict_do_nothing(index_elements=["team_id", "week_start"])
+    )
+
+
+def archive_team_weeks(session: Session, team_ids: Optional[List[int]], week_start: datetime) -> List[int]:
+    """
+    Snapshot the running weekly counters of the given teams under week_start and
+    take the snapshot off the running counters, without reading them into Python.
+
+    Teams that already have a snapshot for week_start are skipped (unique
+    (team_id, week_start) + ON CONFLICT DO NOTHING). The snapshot is subtracted
+    rather than the counters zeroed, so increments that land between the two
+    statements are kept for the new week. team_ids=None archives every team.
+    Returns the ids of the archived teams.
+    """
+    if team_ids is not None and not team_ids:
+        return []
+    snapshot = select(
+        TeamModel.id,
+        literal(week_start, TeamWeekModel.week_start.type),
+        func.coalesce(TeamModel.weekly_info_done, 0),
+        func.coalesce(TeamModel.weekly_plan_done, 0),
+        literal(datetime.now(IST), TeamWeekModel.created_at.type),
+    )
+    # SQLite cannot parse INSERT ... SELECT ... ON CONFLICT unless the SELECT has a WHERE clause
+    snapshot = snapshot.where(TeamModel.id.in_(team_ids) if team_ids is not None else true())
+    statement = (
+        dialect_insert(session, TeamWeekModel)
+        .from_select(["team_id", "week_start", "weekly_info_done", "weekly_plan_done", "created_at"], snapshot)
+        .on_conflict_do_nothing(index_elements=["team_id", "week_start"])
+        .returning(TeamWeekModel.team_id)
+    )
+    archived = list(session.exec(statement).scalars())
+    if archived:
+        archived_week = select(TeamWeekModel).where(
+            TeamWeekModel.team_id == TeamModel.id,
+            TeamWeekModel.week_start == week_start,
+        )
+        session.exec(
+            update(TeamModel).where(TeamModel.id.in_(archived)).values(
+                weekly_info_done=func.coalesce(TeamModel.weekly_info_done, 0)
+                - archived_week.with_only_columns(TeamWeekModel.weekly_info_done).scalar_subquery(),
+                weekly_plan_done=func.coalesce(TeamModel.weekly_plan_done, 0)
+                - archived_week.with_only_columns(TeamWeekModel.weekly_plan_done).scalar_subquery(),
+                **_touched(TeamModel),
+            ).execution_options(synchronize_session=False)
+        )
+    return archived
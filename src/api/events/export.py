@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Optional
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.db.session import async_engine
+from .models import InfoDetailModel, PlanDetailModel, TeamMemberLink, TeamRole
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_SIZE = 1000
+
+# kind -> (model, date column)
+EXPORT_KINDS = {
+    "info": (InfoDetailModel, InfoDetailModel.info_date),
+    "plan": (PlanDetailModel, PlanDetailModel.plan_date),
+}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_query(
+    kind: str,
+    ir_id: Optional[str] = None,
+    team_id: Optional[int] = None,
+    ldc_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Build the export query for info or plan detail rows, ordered by (date, id).
+
+    Args:
+        kind (str): "info" or "plan".
+        ir_id (str, optional): Only rows of this IR.
+        team_id (int, optional): Only rows of IRs that are members of this team.
+        ldc_id (str, optional): Only rows of IRs in teams where this IR is the LDC.
+        start (datetime, optional): Inclusive lower bound on the row date.
+        end (datetime, optional): Exclusive upper bound on the row date.
+    """
+    model, date_column = EXPORT_KINDS[kind]
+    query = select(model).order_by(date_column, model.id)
+    if ir_id:
+        query = query.where(model.ir_id == ir_id)
+    if team_id is not None:
+        query = query.where(
+            model.ir_id.in_(select(TeamMemberLink.ir_id).where(TeamMemberLink.team_id == team_id))
+        )
+    if ldc_id:
+        ldc_link = aliased(TeamMemberLink)
+        ldc_teams = select(ldc_link.team_id).where(ldc_link.ir_id == ldc_id, ldc_link.role == TeamRole.LDC)
+        query = query.where(
+            model.ir_id.in_(select(TeamMemberLink.ir_id).where(TeamMemberLink.team_id.in_(ldc_teams)))
+        )
+    if start is not None:
+        query = query.where(date_column >= start)
+    if end is not None:
+        query = query.where(date_column < end)
+    return query
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def _iter_rows(query) -> AsyncIterator[dict]:
+    # Own session: the request's session is closed before the response body is streamed.
+    # stream() + yield_per uses a server-side cursor, so only one batch is in memory at a time.
+    async with AsyncSession(async_engine) as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_FETCH_SIZE))
+        async for row in result.scalars():
+            yield {key: _plain(value) for key, value in row.model_dump().items()}
+
+
+async def stream_ndjson(query) -> AsyncIterator[str]:
+    """Yield the query's rows as newline-delimited JSON, one batch of lines per chunk."""
+    buffer = []
+    async for row in _iter_rows(query):
+        buffer.append(json.dumps(row))
+        if len(buffer) >= EXPORT_FETCH_SIZE:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+async def stream_csv(kind: str, query) -> AsyncIterator[str]:
+    """Yield the query's rows as CSV with a header line, one batch of lines per chunk."""
+    model, _ = EXPORT_KINDS[kind]
+    columns = [column.name for column in model.__table__.columns]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns)
+    writer.writeheader()
+    count = 0
+    async for row in _iter_rows(query):
+        writer.writerow(row)
+        count += 1
+        if count % EXPORT_FETCH_SIZE == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate(0)
+    if out.tell():
+        yield out.getvalue()
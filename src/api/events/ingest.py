@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from .cache import invalidate, ir_tag, team_tag
+from .counters import bump_ir_counters, bump_team_counters
+from .leaderboard import record_activity
+from .live import publish_progress
+from .models import IST, InfoDetailModel, IrModel, PlanDetailModel, TeamMemberLink
+from .rollup import add_activity, apply_activity
+
+
+def as_datetime(value) -> datetime:
+    """A payload date as an aware datetime: now if missing, IST if it has no offset."""
+    # Table models are not validated, so dates arrive as ISO strings (or not at all)
+    if value is None:
+        return datetime.now(IST)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = IST.localize(value)
+    return value
+
+
+def _insert_rows(session: Session, model, rows: List[dict]) -> List[int]:
+    """Insert all rows with one multi-row INSERT ... RETURNING id, ids in payload order."""
+    if not rows:
+        return []
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(session.exec(statement, params=rows).scalars())
+
+
+def _apply_deltas(session: Session, ir_id: str, info_delta: int = 0, plan_delta: int = 0) -> List[int]:
+    """
+    Add one delta per counter to the IR and to every team it belongs to, returning those teams.
+    Week rollover is not checked here, see rollover.run_week_rollover.
+    """
+    bump_ir_counters(session, ir_id, info_delta=info_delta, plan_delta=plan_delta)
+    return bump_team_counters(
+        session,
+        select(TeamMemberLink.team_id).where(TeamMemberLink.ir_id == ir_id),
+        info_delta=info_delta,
+        plan_delta=plan_delta,
+    )
+
+
+def ingest_info_details(session: Session, ir: IrModel, payload: List[InfoDetailModel]) -> List[int]:
+    """
+    Insert a batch of info details for an IR and update the IR and team counters and
+    the daily activity rollup and notify the live feed, in a single transaction, then the
+    weekly leaderboards.
+    Returns the new row ids in payload order.
+    """
+    rows = [
+        {
+            "ir_id": ir.ir_id,
+            "info_date": as_datetime(info.info_date),
+            "response": info.response,
+            "comments": info.comments,
+            "info_name": info.info_name,
+        }
+        for info in payload
+    ]
+    created_ids = _insert_rows(session, InfoDetailModel, rows)
+    if created_ids:
+        team_ids = _apply_deltas(session, ir.ir_id, info_delta=len(created_ids))
+        publish_progress(session, ir.ir_id, team_ids, info=len(created_ids))
+        activity = {}
+        for row in rows:
+            add_activity(activity, "info", row["ir_id"], row["info_date"], row["response"])
+        apply_activity(session, activity)
+    ir_id = ir.ir_id  # ir is expired by the commit
+    session.commit()
+    if created_ids:
+        invalidate(ir_tag(ir_id), *map(team_tag, team_ids))
+        record_activity(session, "info", ir_id, team_ids, [row["info_date"] for row in rows])
+    return created_ids
+
+
+def ingest_plan_details(session: Session, ir: IrModel, payload: List[PlanDetailModel]) -> List[int]:
+    """
+    Insert a batch of plan details for an IR and update the IR and team counters and
+    the daily activity rollup and notify the live feed, in a single transaction, then the
+    weekly leaderboards.
+    Returns the new row ids in payload order.
+    """
+    rows = [
+        {
+            "ir_id": ir.ir_id,
+            "plan_date": as_datetime(plan.plan_date),
+            "plan_name": plan.plan_name,
+            "comments": plan.comments,
+        }
+        for plan in payload
+    ]
+    created_ids = _insert_rows(session, PlanDetailModel, rows)
+    if created_ids:
+        team_ids = _apply_deltas(session, ir.ir_id, plan_delta=len(created_ids))
+        publish_progress(session, ir.ir_id, team_ids, plan=len(created_ids))
+        activity = {}
+        for row in rows:
+            add_activity(activity, "plan", row["ir_id"], row["plan_date"])
+        apply_activity(session, activity)
+    ir_id = ir.ir_id  # ir is expired by the commit
+    session.commit()
+    if created_ids:
+        invalidate(ir_tag(ir_id), *map(team_tag, team_ids))
+        record_activity(session, "plan", ir_id, team_ids, [row["plan_date"] for row in rows])
+    return created_ids
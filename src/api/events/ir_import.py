@@ -0,0 +1,252 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from pydantic import ValidationError, create_model
+from sqlalchemy import Boolean, Column, Integer, MetaData, Table, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.auth.passwords import hash_passwords_async, is_password_hash
+from api.db.config import IMPORT_BATCH_SIZE, IMPORT_MAX_REPORTED_ERRORS
+from .counters import dialect_insert
+from .models import IST, IrIdModel, IrModel
+
+# Bulk onboarding: an upload of IR IDs and/or full IR records (CSV with a header row, or
+# NDJSON), one record per line, imported in three steps so that no connection is held
+# while the upload streams in or while passwords are hashed:
+#   1. the body is read as it streams in and records are validated like register_new_ir
+#      and kept in memory (no database work)
+#   2. records of IRs that are already registered are dropped (short reads), then the
+#      passwords of the remaining ones are hashed on the password pool
+#   3. in one transaction, the rows are loaded IMPORT_BATCH_SIZE at a time into a
+#      temporary staging table (COPY on Postgres), and two set-based INSERT ... SELECT ...
+#      ON CONFLICT DO NOTHING statements merge them into iridmodel/irmodel
+# Nothing is written before step 3, so an upload that fails earlier (a 503 from the
+# password pool, a broken connection) imports nothing and can simply be sent again.
+#
+# A record with only ir_id adds the IR ID; any other field makes it a full IR record,
+# which adds the IR ID too and registers the IR. Passwords that already are hashes of
+# the configured scheme are stored as they are.
+
+IMPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# irmodel columns taken from the upload; revision/updated_at are set by the merge
+IMPORT_COLUMNS = [column.name for column in IrModel.__table__.columns if column.name not in ("revision", "updated_at")]
+
+# IrModel's fields and checks without the table machinery, which costs more per record
+# than the checks themselves
+IrImportRecord = create_model(
+    "IrImportRecord",
+    __base__=SQLModel,
+    **{name: (field.annotation, field) for name, field in IrModel.model_fields.items() if name in IMPORT_COLUMNS},
+)
+
+_staging = Table(
+    "irimport",
+    MetaData(),
+    Column("line", Integer, primary_key=True),
+    Column("registered", Boolean, nullable=False),
+    *(Column(column.name, column.type) for column in IrModel.__table__.columns if column.name in IMPORT_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+async def _lines(body: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """The lines of a streamed UTF-8 body (a BOM is dropped), without line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in body:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def _records(body: AsyncIterator[bytes], format: str) -> AsyncIterator[Tuple[int, object]]:
+    """(line number, record dict or the error for that line), blank lines skipped."""
+    header = None
+    number = 0
+    async for line in _lines(body):
+        number += 1
+        if not line.strip():
+            continue
+        if format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, f"Invalid JSON: {e}"
+                continue
+            yield number, record if isinstance(record, dict) else "Expected a JSON object"
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield number, f"Expected {len(header)} fields, got {len(values)}"
+            continue
+        # Empty CSV fields mean "not given", so defaults apply
+        yield number, {name: value for name, value in zip(header, values) if value != ""}
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+
+
+def _validate(record: dict) -> dict:
+    """The staging row for a record; raises ValidationError or ValueError."""
+    record = {name: value for name, value in record.items() if value is not None}
+    if "ir_id" not in record:
+        raise ValueError("ir_id is required")
+    if set(record) == {"ir_id"}:
+        return {"registered": False, **IrIdModel.model_validate(record).model_dump()}
+    unknown = set(record) - set(IMPORT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {"registered": True, **IrImportRecord.model_validate(record).model_dump()}
+
+
+async def _stage(connection: AsyncConnection, rows: List[dict]):
+    """Load validated rows (passwords hashed) into the staging table."""
+    if not rows:
+        return
+    columns = [column.name for column in _staging.columns]
+    if connection.dialect.name == "postgresql":
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(f"COPY {_staging.name} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    await copy.write_row([row.get(column) for column in columns])
+    else:
+        await connection.execute(_staging.insert(), [{column: row.get(column) for column in columns} for row in rows])
+
+
+async def _registered_ir_ids(connection: AsyncConnection, ir_ids: List[str]) -> Set[str]:
+    """The ones of ir_ids that have an irmodel row."""
+    found = set()
+    for start in range(0, len(ir_ids), IMPORT_BATCH_SIZE):
+        chunk = ir_ids[start:start + IMPORT_BATCH_SIZE]
+        found.update((await connection.execute(select(IrModel.ir_id).where(IrModel.ir_id.in_(chunk)))).scalars())
+    return found
+
+
+async def _hash_batch(rows: List[dict]):
+    plain = [row for row in rows if row["registered"] and not is_password_hash(row["ir_password"])]
+    hashed = await hash_passwords_async([row["ir_password"] for row in plain])
+    for row, password_hash in zip(plain, hashed):
+        row["ir_password"] = password_hash
+
+
+async def import_irs(session: AsyncSession, body: AsyncIterator[bytes], format: str) -> dict:
+    """
+    Import a streamed upload and commit.
+
+    Returns:
+        dict: received (records read), ir_ids_added, irs_registered, existing_ir_ids
+        (ID-only records whose ID was already there), and errors: [{line, ir_id, error}]
+        for the records that were not imported (at most IMPORT_MAX_REPORTED_ERRORS,
+        error_count has them all).
+    """
+    errors: List[dict] = []
+    error_count = received = 0
+    first_line: Dict[str, int] = {}
+    rows: List[dict] = []
+
+    def reject(line: int, ir_id: Optional[str], error: str):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "ir_id": ir_id, "error": error})
+
+    async for line, record in _records(body, format):
+        received += 1
+        if isinstance(record, str):
+            reject(line, None, record)
+            continue
+        ir_id = record.get("ir_id")
+        try:
+            row = _validate(record)
+        except ValidationError as e:
+            reject(line, ir_id, _validation_message(e))
+            continue
+        except ValueError as e:
+            reject(line, ir_id, str(e))
+            continue
+        if row["ir_id"] in first_line:
+            reject(line, row["ir_id"], f"Duplicate of line {first_line[row['ir_id']]}")
+            continue
+        first_line[row["ir_id"]] = line
+        rows.append({"line": line, **row})
+
+    # Re-uploads of the same file should not pay for hashing what is already there
+    to_register = [row["ir_id"] for row in rows if row["registered"]]
+    if to_register:
+        taken = await _registered_ir_ids(await session.connection(), to_register)
+        if taken:
+            for row in rows:
+                if row["registered"] and row["ir_id"] in taken:
+                    reject(row["line"], row["ir_id"], "IR already registered")
+            rows = [row for row in rows if not (row["registered"] and row["ir_id"] in taken)]
+    # Give the connection back to the pool while argon2 runs
+    await session.close()
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        await _hash_batch(rows[start:start + IMPORT_BATCH_SIZE])
+
+    connection = await session.connection()
+    if connection.dialect.name != "postgresql":
+        await connection.run_sync(lambda sync_connection: _staging.drop(sync_connection, checkfirst=True))
+    await connection.run_sync(lambda sync_connection: _staging.create(sync_connection))
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        await _stage(connection, rows[start:start + IMPORT_BATCH_SIZE])
+
+    staged = _staging.c
+    # SQLite cannot parse INSERT ... SELECT ... ON CONFLICT unless the SELECT has a WHERE clause
+    added = set((await connection.execute(
+        dialect_insert(session, IrIdModel)
+        .from_select(["ir_id"], select(staged.ir_id).where(true()))
+        .on_conflict_do_nothing(index_elements=["ir_id"])
+        .returning(IrIdModel.ir_id)
+    )).scalars())
+    registered = set((await connection.execute(
+        dialect_insert(session, IrModel)
+        .from_select(
+            [*IMPORT_COLUMNS, "revision", "updated_at"],
+            select(
+                *(staged[name] for name in IMPORT_COLUMNS),
+                literal(0),
+                literal(datetime.now(IST), IrModel.updated_at.type),
+            ).where(staged.registered),
+        )
+        .on_conflict_do_nothing(index_elements=["ir_id"])
+        .returning(IrModel.ir_id)
+    )).scalars())
+    if connection.dialect.name != "postgresql":
+        await connection.run_sync(lambda sync_connection: _staging.drop(sync_connection))
+    await session.commit()
+
+    existing_ir_ids = 0
+    for row in rows:
+        if not row["registered"]:
+            existing_ir_ids += row["ir_id"] not in added
+        elif row["ir_id"] not in registered:
+            # Registered by someone else since the check above
+            reject(row["line"], row["ir_id"], "IR already registered")
+
+    errors.sort(key=lambda error: error["line"])
+    return {
+        "received": received,
+        "ir_ids_added": len(added),
+        "irs_registered": len(registered),
+        "existing_ir_ids": existing_ir_ids,
+        "error_count": error_count,
+        "errors": errors,
+    }
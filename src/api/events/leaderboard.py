@@ -0,0 +1,375 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sortedcontainers import SortedList
+from sqlalchemy import and_, func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.db.config import CACHE_BACKEND, CACHE_REDIS_URL, LEADERBOARD_REDIS_PREFIX, LEADERBOARD_TTL
+from .cache import redis_client
+from .models import IrModel, TeamMemberLink, TeamModel, TeamRole, get_current_week_start
+from .timeseries import ACTIVITY_KINDS, WEEK
+
+# Weekly leaderboards: IRs and teams ranked by the info/plan rows dated in the current
+# week (from get_current_week_start, so they start over every Friday 21:31 IST), globally,
+# per LDC (the IRs/teams of the teams they lead) and per team (its members).
+#
+# Each ranking is a sorted structure (SortedList, or a Redis ZSET with CACHE_BACKEND=redis)
+# built from the database on first use and then kept current by the info/plan ingest, so
+# top-N and rank lookups are O(log n). Board names carry the week, so a new week starts
+# with new boards. Boards are rebuilt after LEADERBOARD_TTL seconds, which bounds drift
+# from edits/deletes and, with the memory backend, from ingests on other workers.
+# Membership changes drop every board but the global IR ones (see forget_memberships).
+
+ENTITIES = ("ir", "team")
+METRICS = tuple(ACTIVITY_KINDS)
+
+# Ranked entries per request, at most
+LEADERBOARD_MAX_LIMIT = 100
+
+
+def board_name(week_start: datetime, metric: str, entity: str, scope: str = "all") -> str:
+    """Name of a ranking; scope is "all", "team:<id>" or "ldc:<ir_id>"."""
+    return f"{week_start:%Y%m%d}:{metric}:{entity}:{scope}"
+
+
+class LeaderboardBackend(ABC):
+    """
+    Interface of the ranking stores. Members are strings, scores ints, ranks start at 1
+    and are shared by equal scores (1, 2, 2, 4); ties are listed by member.
+    """
+
+    # Whether calls do network I/O, and so are run off the event loop by the async readers
+    blocking = False
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """Whether the board was built and has not expired."""
+
+    @abstractmethod
+    def replace(self, name: str, scores: Dict[str, int]):
+        ...
+
+    @abstractmethod
+    def incr(self, names: Iterable[str], member: str, delta: int):
+        """Add delta to member's score on each of the boards that exist; the others are left to be built."""
+
+    @abstractmethod
+    def page(self, name: str, offset: int, limit: int) -> Tuple[int, List[Tuple[str, int, int]]]:
+        """(board size, [(member, score, rank)]) for the ranks offset+1 .. offset+limit."""
+
+    @abstractmethod
+    def rank(self, name: str, member: str) -> Tuple[int, int]:
+        """(rank, score) of member; members not on the board have score 0."""
+
+    @abstractmethod
+    def forget(self, match: Callable[[str], bool]):
+        """Drop the boards whose name matches."""
+
+
+class _Board:
+    __slots__ = ("scores", "ranking", "expires_at")
+
+    def __init__(self, scores: Dict[str, int], expires_at: float):
+        self.scores = dict(scores)
+        self.ranking = SortedList((-score, member) for member, score in self.scores.items())
+        self.expires_at = expires_at
+
+
+_EMPTY = _Board({}, 0.0)
+
+
+class MemoryLeaderboardBackend(LeaderboardBackend):
+    """Boards as SortedLists of (-score, member) plus a score dict, local to one process."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._boards: Dict[str, _Board] = {}
+
+    def _board(self, name: str) -> Optional[_Board]:
+        board = self._boards.get(name)
+        if board is not None and board.expires_at <= time.monotonic():
+            del self._boards[name]
+            board = None
+        return board
+
+    def exists(self, name):
+        with self._lock:
+            return self._board(name) is not None
+
+    def replace(self, name, scores):
+        board = _Board(scores, time.monotonic() + self.ttl)
+        with self._lock:
+            self._boards[name] = board
+
+    def incr(self, names, member, delta):
+        with self._lock:
+            for name in names:
+                board = self._board(name)
+                if board is None:
+                    continue
+                old = board.scores.get(member)
+                if old is not None:
+                    board.ranking.remove((-old, member))
+                board.scores[member] = (old or 0) + delta
+                board.ranking.add((-board.scores[member], member))
+
+    @staticmethod
+    def _rank_of(board: _Board, score: int) -> int:
+        # "" sorts before every member: the position is the number of higher scores
+        return board.ranking.bisect_left((-score, "")) + 1
+
+    def page(self, name, offset, limit):
+        with self._lock:
+            board = self._board(name) or _EMPTY
+            entries = [
+                (member, -negative, self._rank_of(board, -negative))
+                for negative, member in board.ranking.islice(offset, offset + limit)
+            ]
+            return len(board.ranking), entries
+
+    def rank(self, name, member):
+        with self._lock:
+            board = self._board(name) or _EMPTY
+            score = board.scores.get(member, 0)
+            return self._rank_of(board, score), score
+
+    def forget(self, match):
+        with self._lock:
+            for name in [name for name in self._boards if match(name)]:
+                del self._boards[name]
+
+
+# KEYS: (built marker, zset) pairs, ARGV: member, increment. Only boards whose marker
+# exists are touched, so an expired board is never recreated with a single member.
+_INCR_BUILT = """
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('ZINCRBY', KEYS[i + 1], ARGV[2], ARGV[1])
+    end
+end
+"""
+
+
+class RedisLeaderboardBackend(LeaderboardBackend):
+    """
+    Boards shared by all workers as Redis ZSETs, under prefix:
+        b:<name>        ZSET of member -> -score (ascending order lists ties by member, as in memory)
+        built:<name>    marker set when the board is built, expires after ttl
+        boards          set of the board names, for forget()
+    """
+
+    blocking = True
+
+    def __init__(self, client, ttl: float, prefix: str):
+        self.client = client
+        self.ttl = max(int(ttl), 1)
+        self.prefix = prefix
+        self._incr_built = client.register_script(_INCR_BUILT)
+
+    def _keys(self, name: str) -> Tuple[str, str]:
+        return f"{self.prefix}built:{name}", f"{self.prefix}b:{name}"
+
+    def exists(self, name):
+        return bool(self.client.exists(self._keys(name)[0]))
+
+    def replace(self, name, scores):
+        built, board = self._keys(name)
+        pipe = self.client.pipeline()
+        pipe.delete(board)
+        if scores:
+            pipe.zadd(board, {member: -score for member, score in scores.items()})
+        # The ZSET outlives its marker so increments racing the expiry are not lost mid-read
+        pipe.expire(board, self.ttl * 2)
+        pipe.set(built, 1, ex=self.ttl)
+        pipe.sadd(f"{self.prefix}boards", name)
+        pipe.execute()
+
+    def incr(self, names, member, delta):
+        keys = [key for name in names for key in self._keys(name)]
+        if keys:
+            self._incr_built(keys=keys, args=[member, -delta])
+
+    def page(self, name, offset, limit):
+        board = self._keys(name)[1]
+        pipe = self.client.pipeline()
+        pipe.zcard(board)
+        pipe.zrange(board, offset, offset + limit - 1, withscores=True)
+        size, rows = pipe.execute()
+        if not rows:
+            return size, []
+        pipe = self.client.pipeline()
+        for _, negative in rows:
+            pipe.zcount(board, "-inf", f"({negative}")
+        above = pipe.execute()
+        return size, [
+            (member.decode(), int(-negative), count + 1)
+            for (member, negative), count in zip(rows, above)
+        ]
+
+    def rank(self, name, member):
+        board = self._keys(name)[1]
+        negative = self.client.zscore(board, member) or 0
+        return self.client.zcount(board, "-inf", f"({negative}") + 1, int(-negative)
+
+    def forget(self, match):
+        names = [name.decode() for name in self.client.smembers(f"{self.prefix}boards")]
+        names = [name for name in names if match(name)]
+        if names:
+            pipe = self.client.pipeline()
+            pipe.delete(*(key for name in names for key in self._keys(name)))
+            pipe.srem(f"{self.prefix}boards", *names)
+            pipe.execute()
+
+
+def build_leaderboard_backend(backend: str = CACHE_BACKEND) -> LeaderboardBackend:
+    if backend == "redis":
+        return RedisLeaderboardBackend(redis_client(CACHE_REDIS_URL), LEADERBOARD_TTL, LEADERBOARD_REDIS_PREFIX)
+    return MemoryLeaderboardBackend(LEADERBOARD_TTL)
+
+
+leaderboards = build_leaderboard_backend()
+
+
+def _led_teams(ldc_id: str):
+    return select(TeamMemberLink.team_id).where(TeamMemberLink.ir_id == ldc_id, TeamMemberLink.role == TeamRole.LDC)
+
+
+def scores_query(week_start: datetime, metric: str, entity: str, team_id: Optional[int] = None, ldc_id: Optional[str] = None):
+    """(member, rows this week) for every IR or team in scope, zeros included."""
+    model, date_column = ACTIVITY_KINDS[metric]
+    in_week = and_(model.ir_id == TeamMemberLink.ir_id, date_column >= week_start, date_column < week_start + WEEK)
+    if entity == "team":
+        query = (
+            select(TeamModel.id, func.count(model.id))
+            .select_from(TeamModel)
+            .outerjoin(TeamMemberLink, TeamMemberLink.team_id == TeamModel.id)
+            .outerjoin(model, in_week)
+            .group_by(TeamModel.id)
+        )
+        if ldc_id is not None:
+            query = query.where(TeamModel.id.in_(_led_teams(ldc_id)))
+        return query
+
+    in_week = and_(model.ir_id == IrModel.ir_id, date_column >= week_start, date_column < week_start + WEEK)
+    query = select(IrModel.ir_id, func.count(model.id)).select_from(IrModel).outerjoin(model, in_week).group_by(IrModel.ir_id)
+    if team_id is not None:
+        query = query.where(IrModel.ir_id.in_(select(TeamMemberLink.ir_id).where(TeamMemberLink.team_id == team_id)))
+    elif ldc_id is not None:
+        query = query.where(IrModel.ir_id.in_(select(TeamMemberLink.ir_id).where(TeamMemberLink.team_id.in_(_led_teams(ldc_id)))))
+    return query
+
+
+async def _call(method, *args):
+    if leaderboards.blocking:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+async def _display_names(session: AsyncSession, entity: str, members: List[str]) -> Dict[str, str]:
+    if not members:
+        return {}
+    if entity == "team":
+        rows = await session.exec(select(TeamModel.id, TeamModel.name).where(TeamModel.id.in_([int(member) for member in members])))
+    else:
+        rows = await session.exec(select(IrModel.ir_id, IrModel.ir_name).where(IrModel.ir_id.in_(members)))
+    return {str(member): name for member, name in rows.all()}
+
+
+async def leaderboard(
+    session: AsyncSession,
+    metric: str,
+    entity: str,
+    team_id: Optional[int] = None,
+    ldc_id: Optional[str] = None,
+    limit: int = 10,
+    offset: int = 0,
+    me: Optional[str] = None,
+) -> dict:
+    """
+    A page of this week's ranking, building the board from the database if needed.
+
+    Returns:
+        dict: week_start, scope, total (ranked IRs/teams) and entries with rank,
+        ir_id/team_id, name and score; with me, that member's rank and score.
+    """
+    week_start = get_current_week_start()
+    scope = f"team:{team_id}" if team_id is not None else f"ldc:{ldc_id}" if ldc_id is not None else "all"
+    name = board_name(week_start, metric, entity, scope)
+    if not await _call(leaderboards.exists, name):
+        rows = (await session.exec(scores_query(week_start, metric, entity, team_id=team_id, ldc_id=ldc_id))).all()
+        await _call(leaderboards.replace, name, {str(member): count for member, count in rows})
+        # Boards of past weeks are never read again
+        current = f"{week_start:%Y%m%d}:"
+        await _call(leaderboards.forget, lambda board: not board.startswith(current))
+
+    total, entries = await _call(leaderboards.page, name, offset, limit)
+    key = "team_id" if entity == "team" else "ir_id"
+    names = await _display_names(session, entity, [member for member, _, _ in entries] + ([me] if me else []))
+    as_id = int if entity == "team" else str
+    result = {
+        "week_start": week_start.isoformat(),
+        "metric": metric,
+        "entity": entity,
+        "scope": scope,
+        "total": total,
+        "entries": [
+            {"rank": rank, key: as_id(member), "name": names.get(member), "score": score}
+            for member, score, rank in entries
+        ],
+    }
+    if me:
+        rank, score = await _call(leaderboards.rank, name, me)
+        result["me"] = {"rank": rank, key: as_id(me), "name": names.get(me), "score": score}
+    return result
+
+
+def record_activity(session: Session, metric: str, ir_id: str, team_ids: List[int], dates: Iterable[datetime]):
+    """
+    Add an IR's newly ingested rows dated this week to the boards that rank it or its
+    teams. Call after the commit; a failing store only costs drift until the next rebuild.
+    A board built between the commit and this call counts the rows twice, also until
+    its rebuild (LEADERBOARD_TTL seconds at most).
+    """
+    week_start = get_current_week_start()
+    delta = sum(week_start <= when < week_start + WEEK for when in dates)
+    if not delta:
+        return
+    ldcs: Dict[int, List[str]] = {}
+    if team_ids:
+        led = session.exec(
+            select(TeamMemberLink.team_id, TeamMemberLink.ir_id)
+            .where(TeamMemberLink.team_id.in_(team_ids), TeamMemberLink.role == TeamRole.LDC)
+        ).all()
+        for team_id, ldc_id in led:
+            ldcs.setdefault(team_id, []).append(ldc_id)
+    all_ldcs = {ldc_id for team_ldcs in ldcs.values() for ldc_id in team_ldcs}
+
+    try:
+        leaderboards.incr(
+            [board_name(week_start, metric, "ir", scope) for scope in
+             ["all", *(f"team:{team_id}" for team_id in team_ids), *(f"ldc:{ldc_id}" for ldc_id in all_ldcs)]],
+            ir_id,
+            delta,
+        )
+        for team_id in team_ids:
+            leaderboards.incr(
+                [board_name(week_start, metric, "team", scope) for scope in
+                 ["all", *(f"ldc:{ldc_id}" for ldc_id in ldcs.get(team_id, ()))]],
+                str(team_id),
+                delta,
+            )
+    except Exception as exc:
+        print(f"Leaderboard update failed for {ir_id}: {exc}")
+
+
+def forget_memberships():
+    """Drop the boards that depend on team membership (all but the global IR ones), after roster changes."""
+    try:
+        leaderboards.forget(lambda name: not name.endswith(":ir:all"))
+    except Exception as exc:
+        print(f"Leaderboard reset failed: {exc}")
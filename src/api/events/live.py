@@ -0,0 +1,281 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+import orjson
+from sqlalchemy import event, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+from api.db.config import LIVE_CHANNEL, LIVE_DATABASE_URL, LIVE_HEARTBEAT, LIVE_QUEUE_SIZE
+
+# Live progress for the team dashboards: clients hold one Server-Sent Events stream
+# (GET /api/live) subscribed to teams and IRs, and receive the counter deltas of every
+# info/plan ingest that touches them instead of polling the aggregates.
+#
+# Writers hand their events to publish() inside their transaction. With Postgres that is
+# a pg_notify(), delivered on commit to every worker's single LISTEN connection, which
+# fans it out to the streams it holds; idle streams cost a queue and a heartbeat. On
+# SQLite the events go to this worker's streams after the commit.
+#
+# Events, as "event: <type>" / "data: <json>":
+#     ready     {"team_ids": [...], "ir_ids": [...]}            once, on subscribe
+#     progress  {"ir_id", "team_ids", "info", "plan"}             counter deltas of an ingest
+#     rollover  {}                                                the week's counters were reset, refetch
+#     resync    {"reason": ...}                                   deltas may have been missed, refetch
+# rollover and resync go to every stream. team_ids of progress are limited to the teams
+# the stream subscribed to; a progress event too large for a notification (NOTIFY_MAX_BYTES)
+# is sent as a resync {"reason": "oversized"} instead.
+
+# Events sent to every stream rather than by topic
+BROADCAST = ("rollover", "resync")
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more (and the transaction with them)
+NOTIFY_MAX_BYTES = 8000 - 1
+
+
+def team_topic(team_id: int) -> str:
+    return f"team:{team_id}"
+
+
+def ir_topic(ir_id: str) -> str:
+    return f"ir:{ir_id}"
+
+
+def _event_topics(message: dict) -> List[str]:
+    topics = [team_topic(team_id) for team_id in message.get("team_ids", ())]
+    if "ir_id" in message:
+        topics.append(ir_topic(message["ir_id"]))
+    return topics
+
+
+def _frame(message: dict) -> str:
+    kind, data = message["type"], {name: value for name, value in message.items() if name != "type"}
+    return f"event: {kind}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+
+class Subscription:
+    def __init__(self, team_ids: Iterable[int], ir_ids: Iterable[str], queue_size: int):
+        self.team_ids = set(team_ids)
+        self.ir_ids = set(ir_ids)
+        self.topics = {*map(team_topic, self.team_ids), *map(ir_topic, self.ir_ids)}
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def put(self, message: dict) -> bool:
+        """Queue message; a client that fell queue_size events behind gets a resync instead. False if dropped."""
+        if "team_ids" in message:
+            message = {**message, "team_ids": [team_id for team_id in message["team_ids"] if team_id in self.team_ids]}
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "reason": "lagging"})
+            return False
+
+
+class LiveFeed(ABC):
+    """
+    The streams of this worker, indexed by topic, and how events reach them: MemoryLiveFeed
+    delivers in process, PostgresLiveFeed through LISTEN/NOTIFY. dispatch() and the
+    subscriptions live on the event loop; publish() is called from request threads.
+    """
+
+    def __init__(self, queue_size: int = LIVE_QUEUE_SIZE, heartbeat: float = LIVE_HEARTBEAT):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self.subscribers = self.delivered = self.dropped = self.errors = 0
+
+    def subscribe(self, team_ids: Iterable[int], ir_ids: Iterable[str]) -> Subscription:
+        subscription = Subscription(team_ids, ir_ids, self.queue_size)
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        self.subscribers += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+        self.subscribers -= 1
+
+    def dispatch(self, message: dict):
+        """Deliver an event to the streams subscribed to any of its topics (event loop only)."""
+        if message["type"] in BROADCAST:
+            targets = set().union(*self._topics.values())
+        else:
+            targets = set()
+            for topic in _event_topics(message):
+                targets |= self._topics.get(topic, set())
+        for subscription in targets:
+            if subscription.put(message):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    def resync_all(self, reason: str):
+        """Tell every stream to refetch, e.g. after events may have been lost."""
+        self.dispatch({"type": "resync", "reason": reason})
+
+    @abstractmethod
+    def publish(self, session: Session, message: dict):
+        """Send message to the subscribed streams of every worker once session commits."""
+
+    async def stream(self, team_ids: List[int], ir_ids: List[str]) -> AsyncIterator[str]:
+        """The text/event-stream body of one client; unsubscribes when the client goes away."""
+        subscription = self.subscribe(team_ids, ir_ids)
+        try:
+            # Reconnecting EventSources wait retry ms, then resubscribe and should refetch
+            yield "retry: 5000\n\n" + _frame({"type": "ready", "team_ids": sorted(subscription.team_ids), "ir_ids": sorted(subscription.ir_ids)})
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield _frame(message)
+        finally:
+            self.unsubscribe(subscription)
+
+    def start(self):
+        """Bind to the running event loop (called from the app lifespan)."""
+        self.loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        self.loop = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "subscribers": self.subscribers,
+            "topics": len(self._topics),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+_PENDING = "live_events"
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _deliver_pending(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        feed, messages = pending
+        feed.dispatch_threadsafe(messages)
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    # Only when the whole transaction is rolled back, a savepoint rollback keeps them
+    if not session.in_transaction():
+        session.info.pop(_PENDING, None)
+
+
+class MemoryLiveFeed(LiveFeed):
+    """Events reach the streams of this worker only, after the publishing transaction commits."""
+
+    def publish(self, session: Session, message: dict):
+        session.info.setdefault(_PENDING, (self, []))[1].append(message)
+
+    def dispatch_threadsafe(self, messages: List[dict]):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return  # Not serving (CLI runs)
+        for message in messages:
+            loop.call_soon_threadsafe(self.dispatch, message)
+
+
+class PostgresLiveFeed(LiveFeed):
+    """
+    Events go out with pg_notify() in the publishing transaction, so they are sent on commit
+    and never for a rollback, and come back to every worker (this one included) through
+    its LISTEN connection. Events sent while a worker is reconnecting are lost, so its
+    streams are told to resync once it listens again.
+    """
+
+    def __init__(self, url: str, channel: str, **kwargs):
+        super().__init__(**kwargs)
+        # libpq form of the SQLAlchemy URL (no +driver)
+        self.conninfo = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.listening = False
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, session: Session, message: dict):
+        payload = orjson.dumps(message)
+        if len(payload) > NOTIFY_MAX_BYTES:
+            payload = orjson.dumps({"type": "resync", "reason": "oversized"})
+        session.exec(select(func.pg_notify(self.channel, payload.decode())))
+
+    async def _listen(self):
+        import psycopg
+        from psycopg import sql
+
+        connected_before = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as connection:
+                    await connection.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    self.listening = True
+                    if connected_before:
+                        self.resync_all("reconnected")
+                    connected_before = True
+                    async for notify in connection.notifies():
+                        try:
+                            self.dispatch(orjson.loads(notify.payload))
+                        except Exception as exc:
+                            self.errors += 1
+                            print(f"Live feed dropped a notification: {exc}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.errors += 1
+                print(f"Live feed listener error: {exc}")
+            self.listening = False
+            await asyncio.sleep(1.0)
+
+    def start(self):
+        super().start()
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.listening = False
+        await super().stop()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "postgres", "listening": self.listening}
+
+
+def build_live_feed(url: str = LIVE_DATABASE_URL) -> LiveFeed:
+    if make_url(url).get_backend_name() == "postgresql":
+        return PostgresLiveFeed(url, LIVE_CHANNEL)
+    return MemoryLiveFeed()
+
+
+live_feed = build_live_feed()
+
+
+def publish_progress(session: Session, ir_id: str, team_ids: List[int], info: int = 0, plan: int = 0):
+    """Push an ingest's counter deltas to the live streams of the IR and its teams, on commit."""
+    live_feed.publish(session, {"type": "progress", "ir_id": ir_id, "team_ids": list(team_ids), "info": info, "plan": plan})
+
+
+def publish_rollover(session: Session, team_ids: List[int]):
+    """Tell every live stream that the weekly counters were reset (team_ids archived), on commit."""
+    if team_ids:
+        live_feed.publish(session, {"type": "rollover"})
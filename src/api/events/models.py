@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field,Relationship
+from sqlalchemy import Index
 from typing import List, Optional,Annotated
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, time
 import pytz
 from pydantic import field_validator,EmailStr,constr
 from enum import Enum
@@ -40,6 +41,19 @@ PasswordStr = Annotated[str, Field(min_length=8, max_length=256, title="IR Passw
 def current_ist_date_str() -> str:
     now_ist = datetime.now(IST)
     return now_ist.strftime("%d-%m-%Y")
+
+def ist_date_bounds(from_date: Optional[str] = None, to_date: Optional[str] = None):
+    """
+    Turn inclusive from/to dates (ISO strings, only the date part is used) into a
+    half-open [start, end) datetime range in IST. Missing bounds are returned as None.
+    Raises ValueError if a date cannot be parsed.
+    """
+    start = end = None
+    if from_date:
+        start = IST.localize(datetime.combine(datetime.fromisoformat(from_date).date(), time.min))
+    if to_date:
+        end = IST.localize(datetime.combine(datetime.fromisoformat(to_date).date() + timedelta(days=1), time.min))
+    return start, end
 #Helper Functions
 
 #Validation Schemas
@@ -56,6 +70,9 @@ class IrLoginValidation(SQLModel):
     ir_id:str
     ir_password:str 
 
+class RefreshTokenValidation(SQLModel):
+    refresh_token:str
+
 class CreateTeamValidation(SQLModel):
     name:str   
 
@@ -63,6 +80,21 @@ class AssignIrValidation(SQLModel):
     ir_id:str
     team_id:int
     role:TeamRole
+
+class IrTargetItem(SQLModel):
+    ir_id: str
+    weekly_info_target: Optional[int] = None
+    weekly_plan_target: Optional[int] = None
+    weekly_uv_target: Optional[int] = None  # Only for LDC/LS
+
+class TeamTargetItem(SQLModel):
+    team_id: int
+    weekly_info_target: Optional[int] = None
+    weekly_plan_target: Optional[int] = None
+
+class BulkTargetsValidation(SQLModel):
+    irs: List[IrTargetItem] = []
+    teams: List[TeamTargetItem] = []
 #Validation Schemas
 
 #SQL TABLES
@@ -82,9 +114,16 @@ class TeamModel(SQLModel, table=True):
     weekly_info_target: Optional[int] = Field(default=0, title="Team Weekly Info Target")
     weekly_plan_target: Optional[int] = Field(default=0, title="Team Weekly Plan Target")
     # UV target is only for LDC/LS, not for team as a whole
+    # Bumped on every change to the team, its roster or its members (ETags); never serialized
+    revision: int = Field(default=0, exclude=True, sa_column_kwargs={"server_default": "0"}, title="Revision")
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(IST), exclude=True, title="Last changed at")
 
 # Intermediate Table for IR-Team with Role
 class TeamMemberLink(SQLModel, table=True):
+    __table_args__ = (
+        Index("ux_teammemberlink_team_id_ir_id", "team_id", "ir_id", unique=True),  # roster lookups, one link per IR per team
+        Index("ix_teammemberlink_ir_id_team_id", "ir_id", "team_id"),  # teams of an IR
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     team_id: int = Field(foreign_key="teammodel.id")
     ir_id: str = Field(foreign_key="irmodel.ir_id")
@@ -111,6 +150,9 @@ class IrModel(SQLModel, table=True):
     weekly_plan_target: Optional[int] = Field(default=0, title="Weekly Plan Target")
     weekly_uv_target: Optional[int] = Field(default=None, title="Weekly UV Target")  # Only for LDC/LS
     # UV target is not for IRs, so do not add here
+    # Bumped on every change to the IR's targets, counters or memberships (ETags); never serialized
+    revision: int = Field(default=0, exclude=True, sa_column_kwargs={"server_default": "0"}, title="Revision")
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(IST), exclude=True, title="Last changed at")
 
     teams: List["TeamMemberLink"] = Relationship(back_populates="ir")
 
@@ -122,6 +164,9 @@ class IrModel(SQLModel, table=True):
         return v
     
 class InfoDetailModel(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_infodetailmodel_ir_id_info_date", "ir_id", "info_date"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     ir_id: str = Field(foreign_key="irmodel.ir_id")
     info_date: datetime = Field(default_factory=lambda: datetime.now(IST), title="Info Date")
@@ -132,6 +177,9 @@ class InfoDetailModel(SQLModel, table=True):
 
 # Plan detail records (parallel to InfoDetailModel)
 class PlanDetailModel(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_plandetailmodel_ir_id_plan_date", "ir_id", "plan_date"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     ir_id: str = Field(foreign_key="irmodel.ir_id")
     plan_date: datetime = Field(default_factory=lambda: datetime.now(IST), title="Plan Date")
@@ -141,6 +189,9 @@ class PlanDetailModel(SQLModel, table=True):
 
 # Model to store weekly snapshots for teams. Each record represents a week's totals
 class TeamWeekModel(SQLModel, table=True):
+    __table_args__ = (
+        Index("ux_teamweekmodel_team_id_week_start", "team_id", "week_start", unique=True),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     team_id: int = Field(foreign_key="teammodel.id")
     week_start: datetime = Field(title="Week Start Datetime (IST)")
@@ -149,6 +200,22 @@ class TeamWeekModel(SQLModel, table=True):
     created_at: datetime = Field(default_factory=lambda: datetime.now(IST), title="Record created at (IST)")
 
 
+# Activity per IR, IST calendar day and kind ("info"/"plan"), kept up to date by the ingest,
+# update and delete routes (see rollup.py) so windowed questions never scan the detail tables
+class IrDailyActivityModel(SQLModel, table=True):
+    __table_args__ = (
+        Index("ux_irdailyactivitymodel_ir_id_day_ist_kind", "ir_id", "day_ist", "kind", unique=True),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    ir_id: str = Field(foreign_key="irmodel.ir_id")
+    day_ist: date = Field(title="Day (IST)")
+    kind: str = Field(max_length=4, title="info or plan")
+    done: int = Field(default=0, title="Rows that day")
+    response_a: int = Field(default=0, title="Info responses A")
+    response_b: int = Field(default=0, title="Info responses B")
+    response_c: int = Field(default=0, title="Info responses C")
+
+
 def get_current_week_start(now: Optional[datetime] = None) -> datetime:
     """
     Compute the current week start datetime using Friday 21:31 IST as the week boundary.
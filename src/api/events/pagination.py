@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from api.db.config import API_DEFAULT_PAGE_SIZE, API_MAX_PAGE_SIZE
+
+
+def clamp_limit(limit: Optional[int], default: int = API_DEFAULT_PAGE_SIZE) -> int:
+    """Return the requested page size, falling back to the default and capped at API_MAX_PAGE_SIZE."""
+    if limit is None or limit < 1:
+        limit = default
+    return min(limit, API_MAX_PAGE_SIZE)
+
+
+def encode_cursor(*values) -> str:
+    """Encode the keyset values of the last row of a page into an opaque cursor string."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or has the wrong number of values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def split_page(rows: List, limit: int):
+    """
+    Split rows fetched with LIMIT limit + 1 into the page and a flag telling
+    whether another page follows.
+    """
+    return rows[:limit], len(rows) > limit
+
+
+def decode_date_id_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a (date, id) cursor used by the info/plan history endpoints."""
+    if not cursor:
+        return None
+    date_value, row_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(date_value), int(row_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,216 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from .models import IrModel, TeamMemberLink, TeamModel, TeamRole
+
+# Access levels whose UV target counts towards a team's UV total (LDC, LS)
+UV_ACCESS_LEVELS = (2, 3)
+
+# Every IrModel column except the password hash (and ETag bookkeeping), selected explicitly so list endpoints never load it
+IR_PUBLIC_COLUMNS = [
+    getattr(IrModel, column.name) for column in IrModel.__table__.columns
+    if column.name not in ("ir_password", "revision", "updated_at")
+]
+
+
+def ir_page_query(after: Optional[str], limit: int, columns=None):
+    """
+    Build a keyset-paginated query over IrModel ordered by ir_id.
+
+    Fetches limit + 1 rows so the caller can tell whether another page follows.
+
+    Args:
+        after (str, optional): Only return IRs whose ir_id sorts after this one.
+        limit (int): Page size.
+        columns (list, optional): Columns to project, defaults to IR_PUBLIC_COLUMNS.
+    """
+    query = select(*(columns or IR_PUBLIC_COLUMNS)).order_by(IrModel.ir_id).limit(limit + 1)
+    if after is not None:
+        query = query.where(IrModel.ir_id > after)
+    return query
+
+
+def history_page_query(
+    model,
+    date_column,
+    ir_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[tuple] = None,
+    limit: int = 50,
+):
+    """
+    Build a keyset-paginated query over an IR's info or plan rows, newest first.
+
+    Rows are ordered by (date, id) descending; fetches limit + 1 rows so the
+    caller can tell whether another page follows.
+
+    Args:
+        model: InfoDetailModel or PlanDetailModel.
+        date_column: The model's date column (info_date / plan_date).
+        ir_id (str): The IR whose rows are returned.
+        start (datetime, optional): Inclusive lower bound on the date.
+        end (datetime, optional): Exclusive upper bound on the date.
+        after (tuple, optional): (date, id) of the last row of the previous page.
+        limit (int): Page size.
+    """
+    query = (
+        select(model)
+        .where(model.ir_id == ir_id)
+        .order_by(date_column.desc(), model.id.desc())
+        .limit(limit + 1)
+    )
+    if start is not None:
+        query = query.where(date_column >= start)
+    if end is not None:
+        query = query.where(date_column < end)
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(or_(
+            date_column < after_date,
+            and_(date_column == after_date, model.id < after_id),
+        ))
+    return query
+
+
+def team_totals_query(team_ids: Optional[List[int]] = None, ldc_id: Optional[str] = None):
+    """
+    Build one grouped query returning every team's columns together with the
+    info, plan and UV totals of its members.
+
+    Teams without members are kept (outer joins) and report zero totals.
+
+    Args:
+        team_ids (List[int], optional): Only include these teams.
+        ldc_id (str, optional): Only include teams where this IR is the LDC.
+    """
+    info_total = func.coalesce(func.sum(func.coalesce(IrModel.info_count, 0)), 0)
+    plan_total = func.coalesce(func.sum(func.coalesce(IrModel.plan_count, 0)), 0)
+    uv_total = func.coalesce(func.sum(
+        case(
+            (IrModel.ir_access_level.in_(UV_ACCESS_LEVELS), func.coalesce(IrModel.weekly_uv_target, 0)),
+            else_=0,
+        )
+    ), 0)
+
+    query = (
+        select(
+            TeamModel,
+            info_total.label("weekly_info_achieved"),
+            plan_total.label("weekly_plan_achieved"),
+            uv_total.label("weekly_uv_achieved"),
+        )
+        .outerjoin(TeamMemberLink, TeamMemberLink.team_id == TeamModel.id)
+        .outerjoin(IrModel, IrModel.ir_id == TeamMemberLink.ir_id)
+        .group_by(TeamModel.id)
+        .order_by(TeamModel.id)
+    )
+    return _filter_teams(query, team_ids, ldc_id)
+
+
+def _filter_teams(query, team_ids: Optional[List[int]], ldc_id: Optional[str]):
+    if team_ids:
+        query = query.where(TeamModel.id.in_(team_ids))
+    if ldc_id:
+        ldc_link = aliased(TeamMemberLink)
+        query = query.where(
+            TeamModel.id.in_(
+                select(ldc_link.team_id).where(
+                    ldc_link.ir_id == ldc_id,
+                    ldc_link.role == TeamRole.LDC,
+                )
+            )
+        )
+    return query
+
+
+def team_versions_query(team_ids: Optional[List[int]] = None, ldc_id: Optional[str] = None):
+    """
+    Build the version lookup (id, revision, updated_at) of the teams team_totals_query
+    returns, with the same filters. Used for ETags, see conditional.resource_version.
+    """
+    query = select(TeamModel.id, TeamModel.revision, TeamModel.updated_at).order_by(TeamModel.id)
+    return _filter_teams(query, team_ids, ldc_id)
+
+
+def dashboard_versions_query(ir_id: str):
+    """
+    Build the version lookup behind /targets_dashboard/{ir_id}: the IR's revision and,
+    for LDC/LS (the only ones shown team progress), the revisions of its teams.
+    Returns no rows if the IR does not exist.
+    """
+    return (
+        select(IrModel.revision, IrModel.updated_at, TeamModel.id, TeamModel.revision, TeamModel.updated_at)
+        .select_from(IrModel)
+        .outerjoin(TeamMemberLink, and_(
+            TeamMemberLink.ir_id == IrModel.ir_id,
+            IrModel.ir_access_level.in_(UV_ACCESS_LEVELS),
+        ))
+        .outerjoin(TeamModel, TeamModel.id == TeamMemberLink.team_id)
+        .where(IrModel.ir_id == ir_id)
+        .order_by(TeamModel.id)
+    )
+
+
+def serialize_team_totals(rows) -> List[dict]:
+    """Shape rows from team_totals_query into the /teams response payload."""
+    result = []
+    for team, info_achieved, plan_achieved, uv_achieved in rows:
+        data = team.model_dump()
+        data.update({
+            "weekly_info_target": team.weekly_info_target,
+            "weekly_info_achieved": int(info_achieved or 0),
+            "weekly_plan_target": team.weekly_plan_target,
+            "weekly_plan_achieved": int(plan_achieved or 0),
+            "weekly_uv_achieved": int(uv_achieved or 0),
+        })
+        result.append(data)
+    return result
+
+
+# Map role name to role_num
+ROLE_NUM = {"LDC": 2, "LS": 3, "GC": 4, "IR": 5}
+
+
+def roster_query(team_ids: List[int]):
+    """Build one joined query returning (TeamMemberLink, IrModel) pairs for the given teams."""
+    return (
+        select(TeamMemberLink, IrModel)
+        .join(IrModel, IrModel.ir_id == TeamMemberLink.ir_id)
+        .where(TeamMemberLink.team_id.in_(team_ids))
+        .order_by(TeamMemberLink.team_id, TeamMemberLink.id)
+    )
+
+
+def serialize_roster_member(link: TeamMemberLink, ir: IrModel) -> dict:
+    """Shape one roster row the way /team_members/{team_id} returns it."""
+    is_leader = ir.ir_access_level in UV_ACCESS_LEVELS
+    data = link.model_dump()
+    data["role_num"] = ROLE_NUM.get(getattr(link.role, "value", link.role), None)
+    data.update({
+        "weekly_info_target": ir.weekly_info_target,
+        "weekly_plan_target": ir.weekly_plan_target,
+        "info_count": ir.info_count,
+        "plan_count": ir.plan_count,
+        "weekly_uv_target": ir.weekly_uv_target if is_leader else None,
+        "uv_count": ir.weekly_uv_target if is_leader else None
+    })
+    return data
+
+
+async def load_team_rosters(session, team_ids: List[int]) -> Dict[int, List[dict]]:
+    """
+    Load the rosters (links plus IR details) of many teams in a single query.
+
+    Returns:
+        Dict[int, List[dict]]: team_id -> serialized members. Every requested
+        team has an entry, empty if it has no members.
+    """
+    rosters = {team_id: [] for team_id in team_ids}
+    if not team_ids:
+        return rosters
+    for link, ir in (await session.exec(roster_query(team_ids))).all():
+        rosters.setdefault(link.team_id, []).append(serialize_roster_member(link, ir))
+    return rosters
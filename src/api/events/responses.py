@@ -0,0 +1,108 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Tuple, Type
+from uuid import UUID
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional, clients asking for it get JSON
+    msgpack = None
+
+# orjson writes dicts, lists, str/int/float, datetimes, dates, enums and UUIDs in C. Only
+# what it does not know reaches _default, once per object: table rows become a dict of
+# their loaded column values (no model_dump, no .isoformat() pass, no jsonable_encoder
+# walk), Core rows become their mappings.
+
+
+@lru_cache(maxsize=None)
+def _dumped_fields(model_class) -> Tuple[str, ...]:
+    # The fields model_dump() would write: Field(exclude=True) bookkeeping stays out
+    return tuple(name for name, field in model_class.model_fields.items() if not field.exclude)
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        if not value.model_config.get("table"):
+            return value.model_dump()
+        # Table models: read the instance dict directly, the instrumented attributes
+        # cost as much as model_dump(). Unloaded (expired/deferred) columns go through getattr.
+        data = value.__dict__
+        return {
+            name: data[name] if name in data else getattr(value, name)
+            for name in _dumped_fields(type(value))
+        }
+    if isinstance(value, Row):
+        return dict(value._mapping)
+    # Anything else (Decimal, set, ...) the way FastAPI would encode it
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The app's JSON response: content may hold SQLModel instances and query rows as-is.
+
+    Handlers that build a FastJSONResponse themselves skip FastAPI's jsonable_encoder
+    entirely; return values of other handlers are still encoded by FastAPI first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def accepts(header: str, token: str) -> bool:
+    """True if an Accept / Accept-Encoding header value lists token with a non-zero q."""
+    for item in header.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if name.lower() != token:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _msgpack_default(value: Any):
+    # Same shapes as the JSON body: datetimes/dates and UUIDs as ISO strings
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return _default(value)
+
+
+class MsgPackResponse(Response):
+    """MessagePack counterpart of FastJSONResponse, same content and same field names."""
+
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default)
+
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def negotiate(request: Request) -> Type[Response]:
+    """
+    The response class for a list endpoint: MsgPackResponse if the Accept header asks
+    for MessagePack (and msgpack is installed), FastJSONResponse otherwise.
+    Responses built from it must carry VARY_ACCEPT.
+    """
+    accept = request.headers.get("accept", "")
+    if msgpack is not None and any(accepts(accept, media_type) for media_type in MSGPACK_MEDIA_TYPES):
+        return MsgPackResponse
+    return FastJSONResponse
+
+
+VARY_ACCEPT = {"Vary": "Accept"}
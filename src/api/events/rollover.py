@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlmodel import Session
+from api.db.session import engine
+from .cache import invalidate, team_tag
+from .counters import archive_team_weeks
+from .live import publish_rollover
+from .models import IST, get_current_week_start
+
+# Pause after the boundary so get_current_week_start() is unambiguously the new week
+ROLLOVER_GRACE_SECONDS = 1
+
+
+def run_week_rollover(session: Session, week_start: Optional[datetime] = None) -> List[int]:
+    """
+    Snapshot and reset the weekly counters of every team for the week that ended at week_start.
+
+    Idempotent: teams already snapshotted for week_start are skipped, so it is safe
+    to run from several workers, from cron and again on startup after downtime.
+
+    Args:
+        week_start (datetime, optional): The boundary to archive, defaults to the current week start.
+
+    Returns:
+        List[int]: Ids of the teams archived by this call.
+    """
+    if week_start is None:
+        week_start = get_current_week_start()
+    archived = archive_team_weeks(session, None, week_start)
+    publish_rollover(session, archived)
+    session.commit()
+    return archived
+
+
+def rollover_now() -> List[int]:
+    with Session(engine) as session:
+        archived = run_week_rollover(session)
+    invalidate(*map(team_tag, archived))
+    return archived
+
+
+def seconds_until_next_rollover(now: Optional[datetime] = None) -> float:
+    now = now or datetime.now(IST)
+    next_boundary = get_current_week_start(now) + timedelta(days=7)
+    return (next_boundary - now).total_seconds() + ROLLOVER_GRACE_SECONDS
+
+
+async def rollover_scheduler():
+    """
+    Run the rollover once immediately (catches boundaries missed while down), then
+    sleep until each Friday 21:31 IST and run it again. Cancel the task to stop.
+    """
+    while True:
+        try:
+            archived = await asyncio.to_thread(rollover_now)
+            if archived:
+                print(f"Week rollover archived {len(archived)} teams")
+        except Exception as exc:
+            print(f"Week rollover failed: {exc}")
+        await asyncio.sleep(seconds_until_next_rollover())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive and reset the weekly team counters.")
+    parser.add_argument(
+        "--week-start",
+        type=datetime.fromisoformat,
+        help="ISO datetime of the boundary to archive (defaults to the current week start)",
+    )
+    args = parser.parse_args()
+    week_start = args.week_start
+    if week_start is not None and week_start.tzinfo is None:
+        week_start = IST.localize(week_start)
+    with Session(engine) as session:
+        archived = run_week_rollover(session, week_start)
+    # Reaches the workers' caches when they share the redis backend
+    invalidate(*map(team_tag, archived))
+    print(f"Archived {len(archived)} teams")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Date, case, delete, func, insert, literal, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.db.session import engine
+from .counters import dialect_insert
+from .export import EXPORT_KINDS
+from .models import IST, InfoResponse, IrDailyActivityModel
+
+# Daily activity rollup: one irdailyactivitymodel row per (ir_id, IST day, kind) with the
+# number of info/plan rows and, for info, the A/B/C response breakdown. The ingest, update
+# and delete paths add their changes as deltas in the same transaction as the detail rows
+# (INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col, so concurrent writers
+# never overwrite each other), and rebuild_daily_activity recomputes it from the detail
+# tables. Rows whose done count drops to 0 are deleted, so a window of N days is at most
+# 2 * N rows per IR, and only days with activity have one.
+
+COUNT_COLUMNS = ("done", "response_a", "response_b", "response_c")
+RESPONSE_COLUMNS = {InfoResponse.A: "response_a", InfoResponse.B: "response_b", InfoResponse.C: "response_c"}
+
+# Longest range /ir_activity answers, in days
+ACTIVITY_MAX_DAYS = 366
+
+# (ir_id, day_ist, kind) -> {count column: delta}
+ActivityDeltas = Dict[Tuple[str, date, str], Dict[str, int]]
+
+
+def ist_day(value: datetime) -> date:
+    """The IST calendar day of a timestamp."""
+    if value.tzinfo is None:  # SQLite hands back naive UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(IST).date()
+
+
+class ist_day_of(FunctionElement):
+    """SQL: the IST calendar day of a timestamp column."""
+    type = Date()
+    inherit_cache = True
+    name = "ist_day_of"
+
+
+@compiles(ist_day_of, "postgresql")
+def _ist_day_of_postgresql(element, compiler, **kw):
+    return f"CAST(timezone('Asia/Kolkata', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+
+@compiles(ist_day_of, "sqlite")
+def _ist_day_of_sqlite(element, compiler, **kw):
+    # Stored as UTC text; IST has no DST
+    return f"date({compiler.process(element.clauses, **kw)}, '+330 minutes')"
+
+
+def add_activity(
+    deltas: ActivityDeltas,
+    kind: str,
+    ir_id: str,
+    when: datetime,
+    response: Optional[InfoResponse] = None,
+    sign: int = 1,
+):
+    """Count one info/plan row (sign=-1: uncount it) into deltas."""
+    counts = deltas.setdefault((ir_id, ist_day(when), kind), dict.fromkeys(COUNT_COLUMNS, 0))
+    counts["done"] += sign
+    if response is not None:
+        counts[RESPONSE_COLUMNS[InfoResponse(response)]] += sign
+
+
+def apply_activity(session: Session, deltas: ActivityDeltas):
+    """
+    Add deltas to the rollup with one upsert, and delete the rows it leaves at done = 0.
+    Call inside the transaction that changed the rows.
+    """
+    rows = [
+        {"ir_id": ir_id, "day_ist": day, "kind": kind, **counts}
+        for (ir_id, day, kind), counts in deltas.items()
+        if any(counts.values())
+    ]
+    if not rows:
+        return
+    statement = dialect_insert(session, IrDailyActivityModel).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["ir_id", "day_ist", "kind"],
+        set_={name: getattr(IrDailyActivityModel, name) + statement.excluded[name] for name in COUNT_COLUMNS},
+    )
+    if all(row["done"] >= 0 for row in rows):
+        session.exec(statement)
+        return
+    # Only removals empty a day. The upserted rows stay locked until commit, so no other
+    # writer's delta lands between the upsert and the delete
+    statement = statement.returning(IrDailyActivityModel.id, IrDailyActivityModel.done)
+    empty = [row_id for row_id, done in session.exec(statement).all() if done <= 0]
+    if empty:
+        session.exec(delete(IrDailyActivityModel).where(IrDailyActivityModel.id.in_(empty)))
+
+
+def rebuild_daily_activity(session: Session, ir_ids: Optional[List[str]] = None):
+    """
+    Recompute the rollup (of the given IRs, or all) from the detail tables, in the
+    session's transaction.
+
+    On Postgres the table is locked against concurrent deltas first: writers that already
+    added theirs are waited for (their rows are then counted), later ones wait and add
+    theirs on top of the rebuilt rows.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.exec(text("LOCK TABLE irdailyactivitymodel IN EXCLUSIVE MODE"))
+    stale = delete(IrDailyActivityModel)
+    if ir_ids is not None:
+        stale = stale.where(IrDailyActivityModel.ir_id.in_(ir_ids))
+    session.exec(stale)
+
+    for kind, (model, date_column) in EXPORT_KINDS.items():
+        day = ist_day_of(date_column)
+        if kind == "info":
+            responses = [func.sum(case((model.response == response, 1), else_=0)) for response in RESPONSE_COLUMNS]
+        else:
+            responses = [literal(0)] * len(RESPONSE_COLUMNS)
+        rows = select(model.ir_id, day, literal(kind), func.count(), *responses).group_by(model.ir_id, day)
+        if ir_ids is not None:
+            rows = rows.where(model.ir_id.in_(ir_ids))
+        session.exec(insert(IrDailyActivityModel).from_select(["ir_id", "day_ist", "kind", *COUNT_COLUMNS], rows))
+
+
+def activity_query(ir_id: str, first_day: date, last_day: date):
+    """(day_ist, kind, done, response_a, response_b, response_c) of an IR for the days [first_day, last_day]."""
+    return (
+        select(
+            IrDailyActivityModel.day_ist,
+            IrDailyActivityModel.kind,
+            *(getattr(IrDailyActivityModel, name) for name in COUNT_COLUMNS),
+        )
+        .where(
+            IrDailyActivityModel.ir_id == ir_id,
+            IrDailyActivityModel.day_ist >= first_day,
+            IrDailyActivityModel.day_ist <= last_day,
+        )
+        .order_by(IrDailyActivityModel.day_ist, IrDailyActivityModel.kind)
+    )
+
+
+async def ir_activity(session: AsyncSession, ir_id: str, first_day: date, last_day: date, daily: bool = False) -> dict:
+    """
+    Info/plan activity of an IR over the IST days [first_day, last_day], summed from the rollup.
+
+    Returns:
+        dict: "info" ({"done", "A", "B", "C"}) and "plan" ({"done"}) totals, and with
+        daily=True a "days" list of the non-empty days.
+    """
+    rows = (await session.exec(activity_query(ir_id, first_day, last_day))).all()
+    totals = {kind: dict.fromkeys(COUNT_COLUMNS, 0) for kind in EXPORT_KINDS}
+    days = []
+    for day, kind, *counts in rows:
+        counts = dict(zip(COUNT_COLUMNS, counts))
+        for name, value in counts.items():
+            totals[kind][name] += value
+        if daily and counts["done"]:
+            days.append({"day": day.isoformat(), "kind": kind, **_public(kind, counts)})
+
+    result = {
+        "ir_id": ir_id,
+        "from_date": first_day.isoformat(),
+        "to_date": last_day.isoformat(),
+        **{kind: _public(kind, counts) for kind, counts in totals.items()},
+    }
+    if daily:
+        result["days"] = days
+    return result
+
+
+def _public(kind: str, counts: Dict[str, int]) -> dict:
+    if kind != "info":
+        return {"done": counts["done"]}
+    return {
+        "done": counts["done"],
+        **{response.value: counts[name] for response, name in RESPONSE_COLUMNS.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the daily activity rollup from the info/plan detail tables.")
+    parser.add_argument("--ir-id", action="append", dest="ir_ids", help="only this IR (repeatable), default all")
+    args = parser.parse_args()
+    with Session(engine) as session:
+        rebuild_daily_activity(session, args.ir_ids)
+        session.commit()
+    print("Daily activity rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,48 @@
 import os 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from .models import GetIrSchema,GetListIrSchema,IrIdValidation,IrModel,IrLoginValidation,TeamModel,TeamMemberLink,CreateTeamValidation,AssignIrValidation,InfoDetailModel,TeamWeekModel,PlanDetailModel,get_current_week_start,IST
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from .models import GetIrSchema,GetListIrSchema,IrIdValidation,IrModel,IrLoginValidation,TeamModel,TeamMemberLink,CreateTeamValidation,AssignIrValidation,BulkTargetsValidation,InfoDetailModel,TeamWeekModel,PlanDetailModel,get_current_week_start,IST,ist_date_bounds
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from pydantic import ValidationError
-from api.db.session import get_session
+from api.db.config import LIVE_MAX_TOPICS
+from api.db.session import get_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import Session, select
-from .models import IrIdModel
+from .models import IrIdModel, RefreshTokenValidation
+from .queries import team_totals_query, serialize_team_totals, load_team_rosters, ir_page_query, history_page_query, team_versions_query, dashboard_versions_query
+from .pagination import clamp_limit, encode_cursor, decode_cursor, decode_date_id_cursor, split_page
+from .ingest import as_datetime, ingest_info_details, ingest_plan_details
+from .rollup import ACTIVITY_MAX_DAYS, add_activity, apply_activity, ir_activity
+from .ir_import import IMPORT_MEDIA_TYPES, import_irs
+from .bulk import BULK_MAX_ITEMS, assign_members, set_ir_targets, set_team_targets
+from .live import live_feed
+from .leaderboard import ENTITIES, LEADERBOARD_MAX_LIMIT, METRICS, forget_memberships, leaderboard
+from .cache import cached, invalidate, ir_tag, ir_teams_tag, read_cache, team_tag
+from .responses import VARY_ACCEPT, FastJSONResponse, negotiate
+from .conditional import not_modified, not_modified_response, resource_version, version_headers
+from .counters import open_team_weeks, touch_ir_and_teams, touch_irs, touch_teams
+from .timeseries import TEAM_HISTORY_MAX_WEEKS, history_weeks, team_history, week_start_of
+from .export import EXPORT_KINDS, EXPORT_MEDIA_TYPES, export_query, stream_csv, stream_ndjson
 from passlib.hash import bcrypt
-from passlib.hash import argon2  # ✅ Strong, modern password hashing
+from api.auth.passwords import hash_password_async, verify_password_async  # ✅ Argon2, on a process pool
+from api.auth.tokens import (
+    REFRESH,
+    IMPORT_LEVELS,
+    TARGET_SETTER_LEVELS,
+    TokenClaims,
+    decode_token,
+    get_current_ir,
+    issue_token_pair,
+    require_access_level,
+    revocations,
+    revoke_token,
+)
 from enum import Enum
 from api.db.session import reset_db
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
+from fastapi import Query
 from fastapi import Body
 from sqlmodel import SQLModel
 
@@ -39,23 +69,37 @@ class TargetUpdatePayload(SQLModel):
 
 #GET Requests
 """
-Fetches all IR (IrIdModel) records from the database.
+Fetches one page of IR (IrIdModel) records from the database, ordered by IR ID.
 
 Args:
+    limit (int, optional): Page size, capped at API_MAX_PAGE_SIZE.
+    cursor (str, optional): The X-Next-Cursor value returned with the previous page.
     session (Session): SQLAlchemy session dependency.
 
 Returns:
-    List[IrIdModel]: A list of all IR records.
+    JSONResponse: A list of IR ID records. The X-Next-Cursor header carries the cursor
+                  of the next page and is absent on the last page.
 
 Raises:
-    HTTPException: If an error occurs during database query, returns a 500 status code with error details.
+    HTTPException: 400 for a malformed cursor, 500 if an error occurs during database query.
 """
 @router.get("/get_all_ir")
-def get_all_ir(session:Session=Depends(get_session)):
+async def get_all_ir(
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
     try:
-        query = select(IrIdModel) #.order_by(IrIdModel.ir_id.desc()) #.limit(10)
-        results = session.exec(query).all()
-        return results
+        limit = clamp_limit(limit)
+        after = decode_cursor(cursor, 1)[0] if cursor else None
+        query = select(IrIdModel.ir_id).order_by(IrIdModel.ir_id).limit(limit + 1)
+        if after is not None:
+            query = query.where(IrIdModel.ir_id > after)
+        ir_ids, has_more = split_page((await session.exec(query)).all(), limit)
+        headers = {"X-Next-Cursor": encode_cursor(ir_ids[-1])} if has_more else None
+        return FastJSONResponse(content=[{"ir_id": ir_id} for ir_id in ir_ids], headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail={"Error": str(e)})
 
@@ -73,41 +117,57 @@ Raises:
     HTTPException: If no IR is found with the specified ID, returns a 404 error.
 """
 @router.get("/ir/{fetch_ir_id}")
-def get_single_ir(fetch_ir_id:str ,session:Session=Depends(get_session)):
+async def get_single_ir(fetch_ir_id:str ,session: AsyncSession = Depends(get_async_session)):
     query = select(IrModel).where(IrModel.ir_id == fetch_ir_id)
-    result = session.exec(query).first()
+    result = (await session.exec(query)).first()
     if not result:
         raise HTTPException(status_code=404, detail="IR ID Not Found!")
     return result
 
 """
-Fetches all registered IR (Incident Report) records from the database.
+Fetches one page of registered IR (Incident Report) records from the database, ordered by IR ID.
+Only public columns are selected, password hashes never leave the database.
 Args:
+    limit (int, optional): Page size, capped at API_MAX_PAGE_SIZE.
+    cursor (str, optional): The X-Next-Cursor value returned with the previous page.
     session (Session): SQLModel session dependency for database access.
 Returns:
-    JSONResponse: A JSON response containing a list of IR records and their count.
-                  On error, returns a JSON response with error details and status code 500.
+    JSONResponse: A JSON response containing the page of IR records and their count. The
+                  X-Next-Cursor header carries the cursor of the next page and is absent
+                  on the last page.
+                  On error, returns a JSON response with error details and status code 400/500.
 """
 @router.get("/irs")
-def get_all_registered_ir(session: Session = Depends(get_session)):
+async def get_all_registered_ir(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
     try:
-        query = select(IrModel)
-        results = session.exec(query).all()
-        
-        # Convert ORM objects to dictionaries
-        data = [r.dict() for r in results]
-        
-        return JSONResponse(content={"data": data, "count": len(data)})
+        limit = clamp_limit(limit)
+        after = decode_cursor(cursor, 1)[0] if cursor else None
+        rows, has_more = split_page((await session.exec(ir_page_query(after, limit))).all(), limit)
+        headers = dict(VARY_ACCEPT)
+        if has_more:
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1].ir_id)
+
+        # JSON, or MessagePack for clients that send Accept: application/msgpack
+        return negotiate(request)(content={"data": rows, "count": len(rows)}, headers=headers)
+    except HTTPException as e:
+        return FastJSONResponse(status_code=e.status_code, content={"error": e.detail})
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"error": str(e)}
         )
     
 """
-Fetches all teams from the database.
+Fetches all teams from the database along with their members' info, plan and UV totals.
 
 Args:
+    team_ids (List[int], optional): Only return these teams (repeat the query param).
+    ldc_id (str, optional): Only return teams where this IR is the LDC.
     session (Session, optional): SQLModel session dependency for database access.
 
 Returns:
@@ -126,48 +186,35 @@ Raises:
 #         raise HTTPException(status_code=500, detail=f"Unexpected Error Occured {str(e)}")
 
 @router.get("/teams")
-def get_all_teams(session: Session = Depends(get_session)):
+async def get_all_teams(
+    request: Request,
+    team_ids: Optional[List[int]] = Query(None),
+    ldc_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    async def load():
+        # One grouped join over teams, links and IRs instead of a query per team/member
+        rows = (await session.exec(team_totals_query(team_ids=team_ids, ldc_id=ldc_id))).all()
+        result = serialize_team_totals(rows)
+        tags = ["teams", *(team_tag(team["id"]) for team in result)]
+        if ldc_id:
+            tags.append(ir_teams_tag(ldc_id))
+        return result, tags
+
     try:
-        # Get all teams
-        teams = session.exec(select(TeamModel)).all()
-        result = []
-        
-        for team in teams:
-            team_data = team.model_dump()
-            
-            # Get all team members
-            members = session.exec(
-                select(TeamMemberLink).where(TeamMemberLink.team_id == team.id)
-            ).all()
-            
-            # Initialize counters
-            total_info_count = 0
-            total_plan_count = 0
-            total_uv_count = 0
-            
-            # Sum up all members' counts
-            for member in members:
-                ir = session.exec(
-                    select(IrModel).where(IrModel.ir_id == member.ir_id)
-                ).first()
-                if ir:
-                    total_info_count += ir.info_count or 0
-                    total_plan_count += ir.plan_count or 0
-                    if ir.ir_access_level in [2, 3]:  # LDC or LS
-                        total_uv_count += ir.weekly_uv_target or 0  # Using UV target as achieved for now
-            
-            # Add targets and achievements to team data
-            team_data.update({
-                "weekly_info_target": team.weekly_info_target,
-                "weekly_info_achieved": total_info_count,
-                "weekly_plan_target": team.weekly_plan_target,
-                "weekly_plan_achieved": total_plan_count,
-                "weekly_uv_achieved": total_uv_count
-            })
-            
-            result.append(team_data)
-            
-        return JSONResponse(status_code=200, content=result)
+        response_class = negotiate(request)
+        # Only the teams' revisions are read to answer an unchanged poll
+        etag, last_modified = resource_version(
+            (await session.exec(team_versions_query(team_ids=team_ids, ldc_id=ldc_id))).all(),
+            response_class.media_type,
+        )
+        headers = {**version_headers(etag, last_modified), **VARY_ACCEPT}
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(headers)
+        # Keyed by ETag, so a cached body is never older than the ETag it is sent with
+        key = ("teams", tuple(sorted(set(team_ids))) if team_ids else None, ldc_id, etag)
+        result = await cached(key, load)
+        return response_class(status_code=200, content=result, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected Error Occurred {str(e)}")
 
@@ -188,23 +235,27 @@ Raises:
     HTTPException: If an unexpected error occurs during processing.
 """
 @router.get("/ldcs")
-def get_ldcs(session: Session = Depends(get_session)):
-    try:
+async def get_ldcs(session: AsyncSession = Depends(get_async_session)):
+    async def load():
         # Get all TeamMemberLink entries where role is LDC
-        ldcs_links = session.exec(
+        ldcs_links = (await session.exec(
             select(TeamMemberLink).where(TeamMemberLink.role == TeamRole.LDC)
-        ).all()
+        )).all()
 
         unique_ir_ids = set(link.ir_id for link in ldcs_links)
 
         # Fetch IrModel objects for each unique LDC
-        ldcs = session.exec(
+        ldcs = (await session.exec(
             select(IrModel).where(IrModel.ir_id.in_(unique_ir_ids))
-        ).all()
+        )).all()
 
         # Step 4: Serialize result
         result = [{"ir_id": ldc.ir_id, "ir_name": ldc.ir_name, "id":ldc.ir_id} for ldc in ldcs]
-        return JSONResponse(status_code=200,content=result)
+        return result, ["ldcs"]
+
+    try:
+        result = await cached(("ldcs",), load)
+        return FastJSONResponse(status_code=200,content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected Error Occured {str(e)}")
 
@@ -224,16 +275,20 @@ Raises:
     HTTPException: If an unexpected error occurs during database query or processing.
 """
 @router.get("/teams_by_ldc/{ldc_id}")
-def get_teams_by_ldc(ldc_id: str, session: Session = Depends(get_session)):
-    try:
-        teams = session.exec(
+async def get_teams_by_ldc(ldc_id: str, session: AsyncSession = Depends(get_async_session)):
+    async def load():
+        teams = (await session.exec(
             select(TeamModel).join(TeamMemberLink).where(
                 TeamMemberLink.ir_id == ldc_id,
                 TeamMemberLink.role == TeamRole.LDC
             )
-        ).all()
+        )).all()
         result = [team.model_dump()for team in teams]
-        return JSONResponse(status_code=200, content=result)
+        return result, [ir_teams_tag(ldc_id), *(team_tag(team.id) for team in teams)]
+
+    try:
+        result = await cached(("teams_by_ldc", ldc_id), load)
+        return FastJSONResponse(status_code=200, content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected Error Occured {str(e)}")
 
@@ -274,109 +329,179 @@ Raises:
 #         raise HTTPException(status_code=500, detail=f"{e}")
 
 @router.get("/team_members/{team_id}")
-def get_team_members(team_id: int, session: Session = Depends(get_session)):
+async def get_team_members(team_id: int, request: Request, session: AsyncSession = Depends(get_async_session)):
     try:
-        members = session.exec(
-            select(TeamMemberLink).where(TeamMemberLink.team_id == team_id)
-        ).all()
-        
-        # Map role name to role_num
-        role_map = {"LDC": 2, "LS": 3, "GC": 4, "IR": 5}
-        result = []
-        
-        for member in members:
-            # Get member details including targets from IrModel
-            ir_details = session.exec(
-                select(IrModel).where(IrModel.ir_id == member.ir_id)
-            ).first()
-            
-            if not ir_details:
-                continue
-                
-            data = member.model_dump()
-            data["role_num"] = role_map.get(data["role"], None)
-            
-            # Add targets and progress
-            data.update({
-                "weekly_info_target": ir_details.weekly_info_target,
-                "weekly_plan_target": ir_details.weekly_plan_target,
-                "info_count": ir_details.info_count,
-                "plan_count": ir_details.plan_count,
-                "weekly_uv_target": ir_details.weekly_uv_target if ir_details.ir_access_level in [2, 3] else None,
-                "uv_count": ir_details.weekly_uv_target if ir_details.ir_access_level in [2, 3] else None
-            })
-            
-            result.append(data)
-            
-        return JSONResponse(
+        response_class = negotiate(request)
+        # Roster and member changes bump the team's revision
+        etag, last_modified = resource_version(
+            (await session.exec(team_versions_query(team_ids=[team_id]))).all(),
+            response_class.media_type,
+        )
+        headers = {**version_headers(etag, last_modified), **VARY_ACCEPT}
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(headers)
+        # Links and IR details (targets and progress) come back from one joined query
+        result = (await load_team_rosters(session, [team_id]))[team_id]
+        return response_class(
             status_code=200,
-            content=result
+            content=result,
+            headers=headers
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{e}")
 
 #Get info details for an IR
+# Rows per page for the infinite-scroll history screens
+HISTORY_PAGE_SIZE = 50
+
+async def _history_page(request, session, model, date_column, ir_id, from_date, to_date, limit, cursor):
+    """Run one page of an info/plan history query and build the JSON response."""
+    try:
+        start, end = ist_date_bounds(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+    limit = clamp_limit(limit, default=HISTORY_PAGE_SIZE)
+    after = decode_date_id_cursor(cursor)
+    query = history_page_query(model, date_column, ir_id, start=start, end=end, after=after, limit=limit)
+    rows, has_more = split_page((await session.exec(query)).all(), limit)
+    headers = dict(VARY_ACCEPT)
+    if has_more:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(getattr(last, date_column.key), last.id)
+    # Rows go to the response as-is, dates are written in ISO format (JSON or MessagePack)
+    return negotiate(request)(status_code=200, content=rows, headers=headers)
+
 """
-Fetches information details for a given IR ID.
+Fetches one page of information details for a given IR ID, newest first.
 
 Args:
     ir_id (str): The IR ID for which to retrieve information details.
+    from_date (str, optional): Inclusive start date, interpreted in IST.
+    to_date (str, optional): Inclusive end date, interpreted in IST.
+    limit (int, optional): Page size, defaults to 50.
+    cursor (str, optional): The X-Next-Cursor value returned with the previous page.
     session (Session, optional): Database session dependency.
 
 Returns:
-    JSONResponse: A JSON response containing a list of info details with 'info_date' fields converted to ISO format strings.
+    JSONResponse: A list of info details with 'info_date' fields converted to ISO format strings.
+                  The X-Next-Cursor header is set when another page follows.
 
 Raises:
-    HTTPException: If an unexpected error occurs during retrieval.
+    HTTPException: 400 for a malformed date or cursor, 500 if an unexpected error occurs during retrieval.
 """
 @router.get("/info_details/{ir_id}")
-def get_info_details(
+async def get_info_details(
+    request: Request,
     ir_id: str,
     from_date: str = None,
     to_date: str = None,
-    session: Session = Depends(get_session)
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # If no date filters, return all info details for the IR
-        if not from_date and not to_date:
-            query = select(InfoDetailModel).where(InfoDetailModel.ir_id == ir_id)
-        else:
-            # Parse dates if provided
-            if from_date:
-                from_dt = datetime.fromisoformat(from_date).date()
-            else:
-                from_dt = datetime.min.date()
-            if to_date:
-                to_dt = datetime.fromisoformat(to_date).date()
-            else:
-                to_dt = datetime.max.date()
-            query = select(InfoDetailModel).where(
-                InfoDetailModel.ir_id == ir_id,
-                InfoDetailModel.info_date >= from_dt,
-                InfoDetailModel.info_date <= to_dt
-            )
-        info_details = session.exec(query).all()
-        result = []
-        for info in info_details:
-            data = info.model_dump()
-            if isinstance(data.get("info_date"), datetime):
-                data["info_date"] = data["info_date"].isoformat()
-            result.append(data)
-        return JSONResponse(status_code=200, content=result)
+        return await _history_page(request, session, InfoDetailModel, InfoDetailModel.info_date, ir_id, from_date, to_date, limit, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected Error Occured {str(e)}")
+
+"""
+Fetches one page of plan details for a given IR ID, newest first.
+
+Args:
+    ir_id (str): The IR ID for which to retrieve plan details.
+    from_date (str, optional): Inclusive start date, interpreted in IST.
+    to_date (str, optional): Inclusive end date, interpreted in IST.
+    limit (int, optional): Page size, defaults to 50.
+    cursor (str, optional): The X-Next-Cursor value returned with the previous page.
+    session (Session, optional): Database session dependency.
+
+Returns:
+    JSONResponse: A list of plan details with 'plan_date' fields converted to ISO format strings.
+                  The X-Next-Cursor header is set when another page follows.
+
+Raises:
+    HTTPException: 400 for a malformed date or cursor, 500 if an unexpected error occurs during retrieval.
+"""
+@router.get("/plan_details/{ir_id}")
+async def get_plan_details(
+    request: Request,
+    ir_id: str,
+    from_date: str = None,
+    to_date: str = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        return await _history_page(request, session, PlanDetailModel, PlanDetailModel.plan_date, ir_id, from_date, to_date, limit, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected Error Occured {str(e)}")
 #Get info details for an IR
 
+#Export info/plan history
+"""
+Streams info or plan detail rows as NDJSON or CSV.
+
+Rows are read from a server-side cursor and written out batch by batch, so memory use
+does not depend on the size of the export.
+
+Args:
+    kind (str): "info" or "plan".
+    format (str, optional): "ndjson" (default) or "csv".
+    ir_id (str, optional): Only rows of this IR.
+    team_id (int, optional): Only rows of members of this team.
+    ldc_id (str, optional): Only rows of members of teams led by this LDC.
+    from_date (str, optional): Inclusive start date (IST).
+    to_date (str, optional): Inclusive end date (IST).
+
+Returns:
+    StreamingResponse: The exported rows ordered by date.
+
+Raises:
+    HTTPException: 400 for an unknown kind/format or an unparsable date.
+"""
+@router.get("/export/{kind}")
+async def export_details(
+    kind: str,
+    format: str = "ndjson",
+    ir_id: Optional[str] = None,
+    team_id: Optional[int] = None,
+    ldc_id: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+):
+    if kind not in EXPORT_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown export kind '{kind}'")
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown export format '{format}'")
+    try:
+        start, end = ist_date_bounds(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+
+    query = export_query(kind, ir_id=ir_id, team_id=team_id, ldc_id=ldc_id, start=start, end=end)
+    body = stream_csv(kind, query) if format == "csv" else stream_ndjson(query)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}_details.{format}"'}
+    )
+#Export info/plan history
+
 #Dashboard Targets
 @router.get("/targets_dashboard/{ir_id}")
-def get_targets_dashboard(ir_id: str, session: Session = Depends(get_session)):
+async def get_targets_dashboard(ir_id: str, request: Request, session: AsyncSession = Depends(get_async_session)):
     """
     Returns personal and team progress/targets for the IR.
     If IR is LS or LDC, returns both personal and teams progress/targets.
     Otherwise, returns only personal progress/targets and teams as NA.
     """
-    try:
-        ir = session.exec(select(IrModel).where(IrModel.ir_id == ir_id)).first()
+    async def load():
+        ir = (await session.exec(select(IrModel).where(IrModel.ir_id == ir_id))).first()
         if not ir:
             raise HTTPException(status_code=404, detail="IR not found")
 
@@ -389,53 +514,46 @@ def get_targets_dashboard(ir_id: str, session: Session = Depends(get_session)):
             "plan_count": ir.plan_count,
             "uv_count": ir.weekly_uv_target if ir.ir_access_level in [2, 3] else None  # You may want to replace with actual progress
         }
+        tags = [ir_tag(ir_id), ir_teams_tag(ir_id)]
 
         # If LS or LDC, show teams progress/targets
         if ir.ir_access_level in [2, 3]:
-            team_links = session.exec(
-                select(TeamMemberLink).where(TeamMemberLink.ir_id == ir_id)
-            ).all()
+            teams = (await session.exec(
+                select(TeamModel).join(TeamMemberLink).where(
+                    TeamMemberLink.ir_id == ir_id
+                ).distinct()
+            )).all()
+            # All rosters are loaded in one batch, regardless of how many teams the IR leads
+            rosters = await load_team_rosters(session, [team.id for team in teams])
             teams_progress = []
-            for link in team_links:
-                team = session.get(TeamModel, link.team_id)
-                if not team:
-                    continue
-                team_members = session.exec(
-                    select(TeamMemberLink).where(TeamMemberLink.team_id == team.id)
-                ).all()
-                member_ids = [m.ir_id for m in team_members]
-                members = session.exec(
-                    select(IrModel).where(IrModel.ir_id.in_(member_ids))
-                ).all()
-                team_info_progress = sum(m.info_count or 0 for m in members)
-                team_plan_progress = sum(m.plan_count or 0 for m in members)
-                team_uv_progress = sum(m.weekly_uv_target or 0 for m in members if m.ir_access_level in [2, 3])
+            for team in teams:
+                members = rosters[team.id]
                 teams_progress.append({
                     "team_id": team.id,
                     "team_name": team.name,
                     "weekly_info_target": team.weekly_info_target,
                     "weekly_plan_target": team.weekly_plan_target,
                     "weekly_uv_target": team.weekly_uv_target if hasattr(team, "weekly_uv_target") else None,
-                    "info_progress": team_info_progress,
-                    "plan_progress": team_plan_progress,
-                    "uv_progress": team_uv_progress
+                    "info_progress": sum(m["info_count"] or 0 for m in members),
+                    "plan_progress": sum(m["plan_count"] or 0 for m in members),
+                    "uv_progress": sum(m["weekly_uv_target"] or 0 for m in members)
                 })
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "personal": personal,
-                    "teams": teams_progress
-                }
-            )
+                tags.append(team_tag(team.id))
+            return {"personal": personal, "teams": teams_progress}, tags
         else:
             # Not LS/LDC, teams is NA
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "personal": personal,
-                    "teams": "NA"
-                }
-            )
+            return {"personal": personal, "teams": "NA"}, tags
+
+    try:
+        versions = (await session.exec(dashboard_versions_query(ir_id))).all()
+        etag, last_modified = resource_version(versions)
+        headers = version_headers(etag, last_modified)
+        if versions and not_modified(request, etag, last_modified):
+            return not_modified_response(headers)
+        content = await cached(("targets_dashboard", ir_id, etag), load)
+        return FastJSONResponse(status_code=200, content=content, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
 #Dashboard Targets
@@ -443,7 +561,7 @@ def get_targets_dashboard(ir_id: str, session: Session = Depends(get_session)):
 
 #Get Team by IR ID
 @router.get("/teams_by_ir/{ir_id}")
-def get_teams_by_ir(ir_id: str, session: Session = Depends(get_session)):
+async def get_teams_by_ir(ir_id: str, session: AsyncSession = Depends(get_async_session)):
     """
     Fetches all teams associated with a given IR ID.
 
@@ -457,20 +575,202 @@ def get_teams_by_ir(ir_id: str, session: Session = Depends(get_session)):
     Raises:
         HTTPException: If an unexpected error occurs during database query or processing.
     """
-    try:
-        teams = session.exec(
+    async def load():
+        teams = (await session.exec(
             select(TeamModel).join(TeamMemberLink).where(
                 TeamMemberLink.ir_id == ir_id
             )
-        ).all()
+        )).all()
         result = [team.model_dump() for team in teams]
-        return JSONResponse(status_code=200, content=result)
+        return result, [ir_teams_tag(ir_id), *(team_tag(team.id) for team in teams)]
+
+    try:
+        result = await cached(("teams_by_ir", ir_id), load)
+        return FastJSONResponse(status_code=200, content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected Error Occured {str(e)}")
 
+"""
+Weekly info/plan done against target for one or many teams, for trend charts.
+
+Args:
+    team_ids (List[int]): The teams (repeat the query param).
+    from_date (str, optional): Inclusive start date (IST), defaults to 12 weeks before to_date.
+    to_date (str, optional): Inclusive end date (IST), defaults to today.
+    session (Session, optional): Database session dependency.
+
+Returns:
+    JSONResponse: Per team, its current weekly targets and every week (Friday 21:31 IST
+                  boundaries) of the range with the info/plan done by its current members
+                  and the counters archived by the week rollover.
+
+Raises:
+    HTTPException: 400 for an unparsable date or a range that is empty or over TEAM_HISTORY_MAX_WEEKS weeks.
+"""
+@router.get("/team_history")
+async def get_team_history(
+    request: Request,
+    team_ids: List[int] = Query(...),
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        start, end = ist_date_bounds(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+    end = end or datetime.now(IST)
+    start = start or end - timedelta(weeks=12)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    first, last = history_weeks(start, end)
+    if last - first > TEAM_HISTORY_MAX_WEEKS:
+        raise HTTPException(status_code=400, detail=f"At most {TEAM_HISTORY_MAX_WEEKS} weeks per request")
+
+    async def load():
+        result = await team_history(session, team_ids, first, last)
+        return result, [team_tag(team["team_id"]) for team in result]
+
+    try:
+        team_key = tuple(sorted(set(team_ids)))
+        result = await cached(("team_history", team_key, week_start_of(first).isoformat(), last - first), load)
+        return negotiate(request)(status_code=200, content=result, headers=VARY_ACCEPT)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected Error Occurred {str(e)}")
+
+"""
+Info/plan activity of one IR over a range of IST days, from the daily activity rollup.
+
+Args:
+    ir_id (str): The IR.
+    from_date (str, optional): Inclusive start date (IST), defaults to 29 days before to_date.
+    to_date (str, optional): Inclusive end date (IST), defaults to today.
+    daily (bool, optional): Also return the per-day counts.
+    session (Session, optional): Database session dependency.
+
+Returns:
+    JSONResponse: info (done and A/B/C responses) and plan (done) totals for the range,
+                  plus a "days" list of the non-empty days with daily=true.
+
+Raises:
+    HTTPException: 400 for an unparsable date or a range that is empty or over ACTIVITY_MAX_DAYS days.
+"""
+@router.get("/ir_activity/{ir_id}")
+async def get_ir_activity(
+    request: Request,
+    ir_id: str,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    daily: bool = False,
+    session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        start, end = ist_date_bounds(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+    last_day = (end - timedelta(days=1)).date() if end else datetime.now(IST).date()
+    first_day = start.date() if start else last_day - timedelta(days=29)
+    if first_day > last_day:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    if (last_day - first_day).days + 1 > ACTIVITY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {ACTIVITY_MAX_DAYS} days per request")
+
+    try:
+        result = await ir_activity(session, ir_id, first_day, last_day, daily=daily)
+        return negotiate(request)(status_code=200, content=result, headers=VARY_ACCEPT)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected Error Occurred {str(e)}")
+
+"""
+This week's ranking of IRs or teams by infos or plans, from the leaderboard structures.
+
+Args:
+    metric (str): "info" or "plan".
+    entity (str, optional): "ir" (default) or "team".
+    ldc_id (str, optional): Only the IRs/teams of the teams this LDC leads.
+    team_id (int, optional): Only the members of this team (IR rankings only).
+    limit (int, optional): Entries per page, at most LEADERBOARD_MAX_LIMIT.
+    offset (int, optional): Entries to skip.
+    me (str, optional): An ir_id (or team_id) whose rank and score are added as "me".
+    session (Session, optional): Database session dependency.
+
+Returns:
+    JSONResponse: week_start, scope, total and the entries with rank (shared by equal
+                  scores), id, name and score.
+
+Scores can be off until the board is rebuilt (LEADERBOARD_TTL seconds at most): edits
+and deletes are not applied to built boards, and the rows of an ingest that committed
+while a board was being built from the database are counted twice.
+
+Raises:
+    HTTPException: 400 for an unknown metric/entity, a team scope on team rankings or a
+                   non-numeric me on team rankings.
+"""
+@router.get("/leaderboard/{metric}")
+async def get_leaderboard(
+    request: Request,
+    metric: str,
+    entity: str = "ir",
+    ldc_id: Optional[str] = None,
+    team_id: Optional[int] = None,
+    limit: int = 10,
+    offset: int = 0,
+    me: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}'")
+    if entity not in ENTITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown entity '{entity}'")
+    if team_id is not None and (entity == "team" or ldc_id is not None):
+        raise HTTPException(status_code=400, detail="team_id only scopes IR rankings and excludes ldc_id")
+    if me is not None and entity == "team":
+        try:
+            me = str(int(me))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="me must be a team id on team rankings")
+    try:
+        result = await leaderboard(
+            session, metric, entity, team_id=team_id, ldc_id=ldc_id,
+            limit=min(max(limit, 1), LEADERBOARD_MAX_LIMIT), offset=max(offset, 0), me=me,
+        )
+        return negotiate(request)(status_code=200, content=result, headers=VARY_ACCEPT)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected Error Occurred {str(e)}")
+
+"""
+Live progress of teams and IRs as Server-Sent Events, instead of polling
+/targets_dashboard and /team_info_total. Load the current totals from those first, then
+add the deltas; refetch on a "resync" or "rollover" event.
+
+Args:
+    team_ids (List[int], optional): Teams to follow (repeat the parameter).
+    ir_ids (List[str], optional): IRs to follow (repeat the parameter).
+
+Returns:
+    StreamingResponse: text/event-stream of ready, progress, rollover and resync events
+                       (see api/events/live.py), with a keep-alive comment every LIVE_HEARTBEAT seconds.
+
+Raises:
+    HTTPException: 400 without teams/IRs or with more than LIVE_MAX_TOPICS of them.
+"""
+@router.get("/live")
+async def live_progress(team_ids: List[int] = Query([]), ir_ids: List[str] = Query([])):
+    topics = len(set(team_ids)) + len(set(ir_ids))
+    if not topics:
+        raise HTTPException(status_code=400, detail="Give team_ids and/or ir_ids to follow")
+    if topics > LIVE_MAX_TOPICS:
+        raise HTTPException(status_code=400, detail=f"At most {LIVE_MAX_TOPICS} teams and IRs per stream")
+    return StreamingResponse(
+        live_feed.stream(team_ids, ir_ids),
+        media_type="text/event-stream",
+        # No caching, and no buffering by nginx-style proxies
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/team_info_total/{team_id}")
-def team_info_total(team_id: int, session: Session = Depends(get_session)):
-    team = session.get(TeamModel, team_id)
+async def team_info_total(team_id: int, session: AsyncSession = Depends(get_async_session)):
+    team = await session.get(TeamModel, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
@@ -478,12 +778,12 @@ def team_info_total(team_id: int, session: Session = Depends(get_session)):
     running = team.weekly_info_done or 0
 
     # recomputed from members
-    links = session.exec(select(TeamMemberLink).where(TeamMemberLink.team_id == team_id)).all()
+    links = (await session.exec(select(TeamMemberLink).where(TeamMemberLink.team_id == team_id))).all()
     ids = [l.ir_id for l in links]
-    members = session.exec(select(IrModel).where(IrModel.ir_id.in_(ids))).all() if ids else []
+    members = (await session.exec(select(IrModel).where(IrModel.ir_id.in_(ids)))).all() if ids else []
     recomputed = sum(m.info_count or 0 for m in members)
 
-    return JSONResponse(status_code=200, content={
+    return FastJSONResponse(status_code=200, content={
         "team_id": team_id,
         "running_weekly_info_done": running,
         "recomputed_members_info_total": recomputed
@@ -590,47 +890,96 @@ Returns:
 
 
 @router.post("/register_new_ir")
-def register_new_ir(payload: IrModel, session: Session = Depends(get_session)):
+async def register_new_ir(payload: IrModel, session: AsyncSession = Depends(get_async_session)):
     """
     1. Check if the IR ID exists in the IRIdModel
     2. If yes, then register the IR with all the details
     3. If no, raise error "IR ID not Found!"
     """
     query = select(IrIdModel).where(IrIdModel.ir_id == payload.ir_id)
-    result = session.exec(query).first()
+    result = (await session.exec(query)).first()
+    # Give the connection back to the pool while argon2 runs
+    await session.close()
 
     if not result:
         raise HTTPException(status_code=404, detail="IR ID Not Found!")
     
     data = payload.model_dump()
     try:
-        # ✅ Use Argon2 for strong, modern password hashing (no 72-byte limit)
-        data["ir_password"] = argon2.hash(data["ir_password"])
+        # ✅ Use Argon2 for strong, modern password hashing (no 72-byte limit), off the event loop
+        data["ir_password"] = await hash_password_async(data["ir_password"])
 
         obj = IrModel.model_validate(data)
         session.add(obj)
-        session.commit()
-        session.refresh(obj)
+        await session.commit()
 
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=201,
             content={"message": "IR registered successfully", "ir_id": obj.ir_id}
         )
 
+    except HTTPException:
+        raise
     except IntegrityError as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=422,
             detail={"error": "Database integrity error", "details": str(e)}
         )
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=500,
             detail={"error": "Unexpected error", "details": str(e)}
         )
 
 
+"""
+Bulk onboarding: adds IR IDs and registers full IR records from one upload.
+
+The request body is the upload itself (not multipart), one record per line: NDJSON
+objects or CSV with a header row. A record with only ir_id adds the IR ID; records with
+IrModel fields (ir_name, ir_email, ir_password, ...) also register the IR. It is read as
+it streams in and validated like register_new_ir; records of IRs already registered are
+skipped before their passwords are hashed, and the rest is merged in one transaction.
+
+Args:
+    format (str, optional): "ndjson" (default) or "csv".
+    request (Request): The upload.
+    session (Session, optional): Database session dependency.
+    acting_ir (TokenClaims): The admin making the request, from its token.
+
+Returns:
+    JSONResponse: Counts of records received, IR IDs added and IRs registered, and
+                  per-line errors for the records that were skipped.
+
+Raises:
+    HTTPException: 400 for an unknown format, 403 for non-admins, 503 when the password pool is
+                   saturated. Nothing is written before the final merge, so after a 503 nothing
+                   was imported and the same upload can be sent again.
+"""
+@router.post("/import_irs")
+async def bulk_import_irs(
+    request: Request,
+    format: str = "ndjson",
+    session: AsyncSession = Depends(get_async_session),
+    acting_ir: TokenClaims = Depends(require_access_level(IMPORT_LEVELS)),
+):
+    if format not in IMPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown import format '{format}'")
+    try:
+        result = await import_irs(session, request.stream(), format)
+        return FastJSONResponse(status_code=200, content=result)
+    except HTTPException:
+        raise
+    except UnicodeDecodeError as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Upload is not UTF-8: {e}")
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Unexpected Error Occurred {str(e)}")
+
+
 """
 Handles IR login requests.
 Args:
@@ -644,24 +993,83 @@ Returns:
     JSONResponse: A response with status code 201 and IR data on successful login.
 """
 @router.post("/login")
-def ir_login(payload:IrLoginValidation,session:Session=Depends(get_session)):
+async def ir_login(payload:IrLoginValidation,session:AsyncSession=Depends(get_async_session)):
     try:
         query = select(IrModel).where(IrModel.ir_id == payload.ir_id)
-        result = session.exec(query).first()
+        result = (await session.exec(query)).first()
+        # Give the connection back to the pool while argon2 runs
+        await session.close()
         if not result:
             raise HTTPException(status_code=404, detail="IR ID Not Found!")
         
         # if not bcrypt.verify(payload.ir_password, result.ir_password):
         #     raise HTTPException(status_code=401, detail="Invalid credentials")
-        if not argon2.verify(payload.ir_password, result.ir_password):
+        verified, new_hash = await verify_password_async(payload.ir_password, result.ir_password)
+        if not verified:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
         ir_data = result.model_dump(exclude={"ir_password"})
-        return JSONResponse(status_code=201,content={"message":"Login Successful", "ir":ir_data})
+        if new_hash:
+            # Hashed with older argon2 parameters: store it again with the current ones
+            await session.exec(
+                update(IrModel).where(IrModel.ir_id == result.ir_id).values(ir_password=new_hash)
+            )
+            await session.commit()
+        tokens = issue_token_pair(result.ir_id, result.ir_access_level, await _team_roles(session, result.ir_id))
+        return FastJSONResponse(status_code=201,content={"message":"Login Successful", "ir":ir_data, **tokens})
+    except HTTPException:
+        raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500,detail=str(e))
 
+async def _team_roles(session: AsyncSession, ir_id: str) -> dict:
+    rows = (await session.exec(
+        select(TeamMemberLink.team_id, TeamMemberLink.role).where(TeamMemberLink.ir_id == ir_id)
+    )).all()
+    return {team_id: getattr(role, "value", role) for team_id, role in rows}
+
+
+"""
+Exchanges a refresh token for a new access/refresh token pair.
+
+The IR's access level and team memberships are read again, so role changes show up
+in the new access token. The old refresh token is revoked (rotation).
+
+Raises:
+    HTTPException: 401 if the refresh token is invalid, expired or revoked, or the IR no longer exists.
+"""
+@router.post("/token/refresh")
+async def refresh_token(payload: RefreshTokenValidation, session: AsyncSession = Depends(get_async_session)):
+    claims = decode_token(payload.refresh_token, REFRESH)
+    if await revocations.is_revoked(claims.jti):
+        raise HTTPException(status_code=401, detail="Token revoked", headers={"WWW-Authenticate": "Bearer"})
+    ir = await session.get(IrModel, claims.sub)
+    if not ir or not ir.status:
+        raise HTTPException(status_code=401, detail="IR not found", headers={"WWW-Authenticate": "Bearer"})
+    tokens = issue_token_pair(ir.ir_id, ir.ir_access_level, await _team_roles(session, ir.ir_id))
+    await revoke_token(session, claims)
+    await session.commit()
+    return FastJSONResponse(status_code=200, content=tokens)
+
+
+"""
+Revokes the access token of the request and, if given, the refresh token issued with it.
+"""
+@router.post("/logout")
+async def logout(
+    payload: Optional[RefreshTokenValidation] = None,
+    claims: TokenClaims = Depends(get_current_ir),
+    session: AsyncSession = Depends(get_async_session),
+):
+    await revoke_token(session, claims)
+    if payload is not None:
+        refresh_claims = decode_token(payload.refresh_token, REFRESH)
+        if refresh_claims.sub == claims.sub:
+            await revoke_token(session, refresh_claims)
+    await session.commit()
+    return FastJSONResponse(status_code=200, content={"message": "Logged out"})
+
 """
 Creates a new team in the database.
 
@@ -680,9 +1088,14 @@ def create_team(payload:CreateTeamValidation, session: Session = Depends(get_ses
     try:
         team = TeamModel(name=payload.name)
         session.add(team)
+        session.flush()
+        # Nothing of this week is from before the team existed: the rollover must not archive it
+        open_team_weeks(session, [team.id], get_current_week_start())
         session.commit()
+        invalidate("teams")
+        forget_memberships()
         session.refresh(team)
-        return JSONResponse(status_code=201, content={"message": "Team created", "team_id": team.id,"team_name": team.name})
+        return FastJSONResponse(status_code=201, content={"message": "Team created", "team_id": team.id,"team_name": team.name})
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=str(e))        
@@ -731,8 +1144,16 @@ def add_ir_to_team(payload: AssignIrValidation, session: Session = Depends(get_s
             role=mapped_role.value  # Store as string in DB
         )
         session.add(link)
+        touch_teams(session, [payload.team_id])
+        touch_irs(session, [payload.ir_id])
         session.commit()
-        return JSONResponse(
+        invalidate(
+            team_tag(payload.team_id),
+            ir_teams_tag(payload.ir_id),
+            *(["ldcs"] if mapped_role == TeamRole.LDC else []),
+        )
+        forget_memberships()
+        return FastJSONResponse(
             status_code=201,
             content={"message": f"{mapped_role.value} assigned to team {payload.team_id}"}
         )
@@ -742,6 +1163,50 @@ def add_ir_to_team(payload: AssignIrValidation, session: Session = Depends(get_s
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
 
+"""
+Assigns many IRs to teams (or changes their role) in one transaction.
+
+Args:
+    payload (List[AssignIrValidation]): ir_id, team_id and role per assignment.
+    session (Session): The database session dependency.
+
+Returns:
+    JSONResponse: One result per assignment, in order ("added", "updated", "unchanged"
+                  or "error" with a detail), and the count of each status.
+
+Raises:
+    HTTPException: 400 for more than BULK_MAX_ITEMS assignments, 403 for IRs below LS.
+"""
+@router.post("/bulk_assign_irs")
+def bulk_assign_irs(
+    payload: List[AssignIrValidation],
+    session: Session = Depends(get_session),
+    acting_ir: TokenClaims = Depends(require_access_level(TARGET_SETTER_LEVELS)),
+):
+    if len(payload) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} assignments per request")
+    try:
+        results, changed = assign_members(session, payload)
+        session.commit()
+        if changed["team_ids"]:
+            invalidate(
+                *map(team_tag, changed["team_ids"]),
+                *map(ir_teams_tag, changed["ir_ids"]),
+                *(["ldcs"] if TeamRole.LDC in changed["roles"] else []),
+            )
+            forget_memberships()
+        return FastJSONResponse(status_code=200, content=_bulk_content(results))
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
+
+
+def _bulk_content(results: List[dict]) -> dict:
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"counts": counts, "results": results}
+
 #Add Info Detail for an IR
 """
 Adds a new info detail entry associated with a given IR (Incident Report) ID.
@@ -760,65 +1225,16 @@ def add_info_detail(ir_id: str, payload: List[InfoDetailModel], session: Session
         ir = session.get(IrModel, ir_id)
         if not ir:
             raise HTTPException(status_code=404, detail="IR not found")
-        
-        created_ids = []
-        for info in payload:
-            info_detail = InfoDetailModel(
-                ir_id=ir_id,
-                info_date=info.info_date,
-                response=info.response,
-                comments=info.comments,
-                info_name=info.info_name
-            )
-            session.add(info_detail)
-            # Persist the info detail
-            session.commit()
-            session.refresh(info_detail)
-            created_ids.append(info_detail.id)
 
-            # 1) Update IR's info_count
-            ir.info_count = (ir.info_count or 0) + 1
-            session.add(ir)
+        # One multi-row insert, one counter delta per IR/team, one commit
+        created_ids = ingest_info_details(session, ir, payload)
 
-            # 2) Update each team the IR belongs to: archive/reset week if needed then increment
-            links = session.exec(select(TeamMemberLink).where(TeamMemberLink.ir_id == ir_id)).all()
-            current_week_start = get_current_week_start()
-            for link in links:
-                team = session.get(TeamModel, link.team_id)
-                if not team:
-                    continue
-
-                # If no TeamWeek exists for this team and current_week_start, archive previous totals
-                existing_week = session.exec(
-                    select(TeamWeekModel).where(
-                        TeamWeekModel.team_id == team.id,
-                        TeamWeekModel.week_start == current_week_start
-                    )
-                ).first()
-                if not existing_week:
-                    # Archive current weekly totals into TeamWeek
-                    tw = TeamWeekModel(
-                        team_id=team.id,
-                        week_start=current_week_start,
-                        weekly_info_done=team.weekly_info_done or 0,
-                        weekly_plan_done=team.weekly_plan_done or 0
-                    )
-                    session.add(tw)
-                    # Reset team's running weekly counters for the new week
-                    team.weekly_info_done = 0
-                    team.weekly_plan_done = 0
-
-                # Increment the team's weekly_info_done for this new info
-                team.weekly_info_done = (team.weekly_info_done or 0) + 1
-                session.add(team)
-
-            # Persist all updates for this info entry
-            session.commit()
-        
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=201,
             content={"message": "Info details added", "info_ids": created_ids}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
@@ -832,58 +1248,15 @@ def add_plan_detail(ir_id: str, payload: List[PlanDetailModel], session: Session
         if not ir:
             raise HTTPException(status_code=404, detail="IR not found")
 
-        created_ids = []
-        for plan in payload:
-            plan_entry = PlanDetailModel(
-                ir_id=ir_id,
-                plan_date=plan.plan_date,
-                plan_name=plan.plan_name,
-                comments=plan.comments
-            )
-            session.add(plan_entry)
-            session.commit()
-            session.refresh(plan_entry)
-            created_ids.append(plan_entry.id)
+        # One multi-row insert, one counter delta per IR/team, one commit
+        created_ids = ingest_plan_details(session, ir, payload)
 
-            # 1) Update IR's plan_count
-            ir.plan_count = (ir.plan_count or 0) + 1
-            session.add(ir)
-
-            # 2) Update each team the IR belongs to: archive/reset week if needed then increment plan counters
-            links = session.exec(select(TeamMemberLink).where(TeamMemberLink.ir_id == ir_id)).all()
-            current_week_start = get_current_week_start()
-            for link in links:
-                team = session.get(TeamModel, link.team_id)
-                if not team:
-                    continue
-
-                existing_week = session.exec(
-                    select(TeamWeekModel).where(
-                        TeamWeekModel.team_id == team.id,
-                        TeamWeekModel.week_start == current_week_start
-                    )
-                ).first()
-                if not existing_week:
-                    tw = TeamWeekModel(
-                        team_id=team.id,
-                        week_start=current_week_start,
-                        weekly_info_done=team.weekly_info_done or 0,
-                        weekly_plan_done=team.weekly_plan_done or 0
-                    )
-                    session.add(tw)
-                    team.weekly_info_done = 0
-                    team.weekly_plan_done = 0
-
-                # Increment team's weekly_plan_done
-                team.weekly_plan_done = (team.weekly_plan_done or 0) + 1
-                session.add(team)
-
-            session.commit()
-
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=201,
             content={"message": "Plan details added", "plan_ids": created_ids}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
@@ -891,20 +1264,16 @@ def add_plan_detail(ir_id: str, payload: List[PlanDetailModel], session: Session
 
 @router.post("/set_targets")
 def set_targets(
-    payload: TargetUpdatePayload = Body(...),
+    payload: TargetUpdatePayload = Body(..., embed=True),
     session: Session = Depends(get_session),
-    acting_ir_id: str = Body(..., embed=True)  # The IR making the request
+    acting_ir: TokenClaims = Depends(require_access_level(TARGET_SETTER_LEVELS)),  # The IR making the request, from its token
 ):
     """
     Allows LS, LDC, and above to set/update targets for IRs and Teams.
     """
     try:
-        # Check acting IR's access level
-        acting_ir = session.exec(select(IrModel).where(IrModel.ir_id == acting_ir_id)).first()
-        if not acting_ir or acting_ir.ir_access_level not in [1, 2, 3]:
-            raise HTTPException(status_code=403, detail="Not authorized to set targets")
-
         updated = {}
+        changed_tags = []
 
         # Update individual IR targets
         if payload.ir_id:
@@ -920,6 +1289,13 @@ def set_targets(
                 ir.weekly_uv_target = payload.weekly_uv_target
             session.add(ir)
             updated["ir_id"] = ir.ir_id
+            # The IR's targets feed its teams' totals too
+            ir_team_ids = session.exec(
+                select(TeamMemberLink.team_id).where(TeamMemberLink.ir_id == ir.ir_id)
+            ).all()
+            touch_irs(session, [ir.ir_id])
+            touch_teams(session, list(ir_team_ids))
+            changed_tags += [ir_tag(ir.ir_id), *map(team_tag, ir_team_ids)]
 
         # Update team targets
         if payload.team_id:
@@ -931,13 +1307,18 @@ def set_targets(
             if payload.team_weekly_plan_target is not None:
                 team.weekly_plan_target = payload.team_weekly_plan_target
             session.add(team)
+            touch_teams(session, [team.id])
             updated["team_id"] = team.id
+            changed_tags.append(team_tag(team.id))
 
         session.commit()
-        return JSONResponse(
+        invalidate(*changed_tags)
+        return FastJSONResponse(
             status_code=200,
             content={"message": "Targets updated", "updated": updated}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
@@ -985,16 +1366,24 @@ def update_info_detail(info_id: int, payload: InfoDetailModel, session: Session
         if not info_detail:
             raise HTTPException(status_code=404, detail="Info detail not found")
         
-        info_detail.info_date = payload.info_date
+        # Move the row in the daily rollup from its old day/response to the new ones
+        activity = {}
+        add_activity(activity, "info", info_detail.ir_id, info_detail.info_date, info_detail.response, sign=-1)
+        info_detail.info_date = as_datetime(payload.info_date)
         info_detail.response = payload.response
         info_detail.comments = payload.comments
         info_detail.info_name = payload.info_name
+        add_activity(activity, "info", info_detail.ir_id, info_detail.info_date, info_detail.response)
         
         session.add(info_detail)
+        apply_activity(session, activity)
+        ir_id = info_detail.ir_id
+        team_ids = touch_ir_and_teams(session, ir_id)
         session.commit()
+        invalidate(ir_tag(ir_id), *map(team_tag, team_ids))
         session.refresh(info_detail)
         
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={"message": "Info detail updated", "info_id": info_detail.id}
         )
@@ -1006,20 +1395,16 @@ def update_info_detail(info_id: int, payload: InfoDetailModel, session: Session
 #PUT Requests
 @router.put("/set_targets")
 def set_targets(
-    payload: TargetUpdatePayload = Body(...),
+    payload: TargetUpdatePayload = Body(..., embed=True),
     session: Session = Depends(get_session),
-    acting_ir_id: str = Body(..., embed=True)  # The IR making the request
+    acting_ir: TokenClaims = Depends(require_access_level(TARGET_SETTER_LEVELS)),  # The IR making the request, from its token
 ):
     """
     Allows LS, LDC, and above to set/update targets for IRs and Teams.
     """
     try:
-        # Check acting IR's access level
-        acting_ir = session.exec(select(IrModel).where(IrModel.ir_id == acting_ir_id)).first()
-        if not acting_ir or acting_ir.ir_access_level not in [1, 2, 3]:
-            raise HTTPException(status_code=403, detail="Not authorized to set targets")
-
         updated = {}
+        changed_tags = []
 
         # Update individual IR targets
         if payload.ir_id:
@@ -1035,6 +1420,13 @@ def set_targets(
                 ir.weekly_uv_target = payload.weekly_uv_target
             session.add(ir)
             updated["ir_id"] = ir.ir_id
+            # The IR's targets feed its teams' totals too
+            ir_team_ids = session.exec(
+                select(TeamMemberLink.team_id).where(TeamMemberLink.ir_id == ir.ir_id)
+            ).all()
+            touch_irs(session, [ir.ir_id])
+            touch_teams(session, list(ir_team_ids))
+            changed_tags += [ir_tag(ir.ir_id), *map(team_tag, ir_team_ids)]
 
         # Update team targets
         if payload.team_id:
@@ -1046,13 +1438,53 @@ def set_targets(
             if payload.team_weekly_plan_target is not None:
                 team.weekly_plan_target = payload.team_weekly_plan_target
             session.add(team)
+            touch_teams(session, [team.id])
             updated["team_id"] = team.id
+            changed_tags.append(team_tag(team.id))
 
         session.commit()
-        return JSONResponse(
+        invalidate(*changed_tags)
+        return FastJSONResponse(
             status_code=200,
             content={"message": "Targets updated", "updated": updated}
         )
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
+
+"""
+Sets the weekly targets of many IRs and teams in one transaction, with one UPDATE per
+kind. Like set_targets, targets left out are kept and weekly_uv_target only applies to LDC/LS.
+
+Args:
+    payload (BulkTargetsValidation): {"irs": [...], "teams": [...]}.
+    session (Session): The database session dependency.
+
+Returns:
+    JSONResponse: Per-item results for IRs and teams ("updated", or "error" with a detail).
+
+Raises:
+    HTTPException: 400 for more than BULK_MAX_ITEMS items, 403 for IRs below LS.
+"""
+@router.post("/bulk_set_targets")
+def bulk_set_targets(
+    payload: BulkTargetsValidation,
+    session: Session = Depends(get_session),
+    acting_ir: TokenClaims = Depends(require_access_level(TARGET_SETTER_LEVELS)),
+):
+    if len(payload.irs) + len(payload.teams) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    try:
+        ir_results, ir_ids, ir_team_ids = set_ir_targets(session, payload.irs)
+        team_results, team_ids = set_team_targets(session, payload.teams)
+        session.commit()
+        invalidate(*map(ir_tag, ir_ids), *map(team_tag, set(ir_team_ids) | set(team_ids)))
+        return FastJSONResponse(
+            status_code=200,
+            content={"irs": _bulk_content(ir_results), "teams": _bulk_content(team_results)},
+        )
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Unexpected Error: {str(e)}")
@@ -1083,10 +1515,12 @@ def update_team_name(team_id: int, payload: CreateTeamValidation, session: Sessi
         old_name = team.name
         team.name = payload.name
         session.add(team)
+        touch_teams(session, [team_id])
         session.commit()
+        invalidate(team_tag(team_id))
         session.refresh(team)
 
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={
                 "message": "Team name updated",
@@ -1117,6 +1551,7 @@ Raises:
 def reset_database():
     try:
         reset_db()
+        read_cache.clear()
         return {"status": "success", "message": "Database has been reset successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1145,9 +1580,19 @@ def delete_team(team_id: int, session: Session = Depends(get_session)):
         for link in links:
             session.delete(link)
         
+        changed_tags = [
+            "teams",
+            team_tag(team_id),
+            *(ir_teams_tag(link.ir_id) for link in links),
+            *(["ldcs"] if any(link.role == TeamRole.LDC for link in links) else []),
+        ]
         session.delete(team)
+        # The members' dashboards lose the team
+        touch_irs(session, [link.ir_id for link in links])
         session.commit()
-        return JSONResponse(
+        invalidate(*changed_tags)
+        forget_memberships()
+        return FastJSONResponse(
             status_code=200,
             content={"message": f"Team with ID {team_id} and its members have been deleted"}
         )
@@ -1183,9 +1628,14 @@ def remove_ir_from_team(team_id: int, ir_id: str, session: Session = Depends(get
         ).first()
         if not link:
             raise HTTPException(status_code=404, detail="IR not found in team")
+        was_ldc = link.role == TeamRole.LDC
         session.delete(link)
+        touch_teams(session, [team_id])
+        touch_irs(session, [ir_id])
         session.commit()
-        return JSONResponse(
+        invalidate(team_tag(team_id), ir_teams_tag(ir_id), *(["ldcs"] if was_ldc else []))
+        forget_memberships()
+        return FastJSONResponse(
             status_code=200,
             content={"message": f"IR '{ir_id}' removed from team {team_id}"}
         )
@@ -1214,10 +1664,16 @@ def delete_info_detail(info_id: int, session: Session = Depends(get_session)):
         if not info_detail:
             raise HTTPException(status_code=404, detail="Info detail not found")
         
+        activity = {}
+        add_activity(activity, "info", info_detail.ir_id, info_detail.info_date, info_detail.response, sign=-1)
         session.delete(info_detail)
+        apply_activity(session, activity)
+        ir_id = info_detail.ir_id
+        team_ids = touch_ir_and_teams(session, ir_id)
         session.commit()
+        invalidate(ir_tag(ir_id), *map(team_tag, team_ids))
         
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={"message": f"Info detail with ID {info_id} has been deleted"}
         )
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import Integer, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .models import IST, InfoDetailModel, PlanDetailModel, TeamMemberLink, TeamModel, TeamWeekModel
+
+# Weekly activity per team for trend charts. Weeks run from Friday 21:31 IST (see
+# get_current_week_start) and are numbered from WEEK_ORIGIN, one such boundary.
+#
+# The done counts come from one grouped range query per kind over the (ir_id, date)
+# indexes of the info/plan tables.
+
+WEEK = timedelta(days=7)
+WEEK_ORIGIN = IST.localize(datetime(2000, 1, 7, 21, 31))
+
+# Longest range /team_history answers, in weeks
+TEAM_HISTORY_MAX_WEEKS = 520
+
+# kind -> (model, date column)
+ACTIVITY_KINDS = {
+    "info": (InfoDetailModel, InfoDetailModel.info_date),
+    "plan": (PlanDetailModel, PlanDetailModel.plan_date),
+}
+
+
+class week_index(FunctionElement):
+    """SQL: the number of the week (counted from WEEK_ORIGIN) a timestamp column falls in."""
+    type = Integer()
+    inherit_cache = True
+    name = "week_index"
+
+
+_ORIGIN_EPOCH = WEEK_ORIGIN.timestamp()
+_WEEK_SECONDS = WEEK.total_seconds()
+
+
+@compiles(week_index, "postgresql")
+def _week_index_postgresql(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    return f"CAST(floor((extract(epoch FROM {value}) - {_ORIGIN_EPOCH}) / {_WEEK_SECONDS}) AS INTEGER)"
+
+
+@compiles(week_index, "sqlite")
+def _week_index_sqlite(element, compiler, **kw):
+    # Whole epoch seconds (exact, unlike julianday() floats; boundaries are whole seconds),
+    # and integer division is floor after the origin
+    value = compiler.process(element.clauses, **kw)
+    return f"((CAST(strftime('%s', {value}) AS INTEGER) - {int(_ORIGIN_EPOCH)}) / {int(_WEEK_SECONDS)})"
+
+
+def week_of(value: datetime) -> int:
+    if value.tzinfo is None:  # SQLite hands back naive UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - WEEK_ORIGIN) // WEEK
+
+
+def week_start_of(week: int) -> datetime:
+    return WEEK_ORIGIN + week * WEEK
+
+
+def history_weeks(start: datetime, end: datetime) -> Tuple[int, int]:
+    """The weeks [first, last) covering the half-open range [start, end)."""
+    return week_of(start), week_of(end - timedelta(microseconds=1)) + 1
+
+
+def activity_query(kind: str, team_ids: List[int], first: int, last: int):
+    """(team_id, week, done) from the raw rows of the teams' current members."""
+    model, date_column = ACTIVITY_KINDS[kind]
+    week = week_index(date_column)
+    return (
+        select(TeamMemberLink.team_id, week, func.count())
+        .select_from(model)
+        .join(TeamMemberLink, TeamMemberLink.ir_id == model.ir_id)
+        .where(
+            TeamMemberLink.team_id.in_(team_ids),
+            date_column >= week_start_of(first),
+            date_column < week_start_of(last),
+        )
+        .group_by(TeamMemberLink.team_id, week)
+    )
+
+
+async def team_history(session: AsyncSession, team_ids: List[int], first: int, last: int) -> List[dict]:
+    """
+    Weekly info/plan done against target for teams, for the weeks [first, last).
+
+    Returns:
+        List[dict]: One entry per existing team with its current weekly targets and a
+        "weeks" list with every week of the range (zeros included):
+          - info_done / plan_done: activity of the team's current members that week
+          - recorded_info_done / recorded_plan_done: the team's counters as archived by
+            the week rollover (teamweekmodel), None for weeks without a snapshot
+    """
+    teams = (await session.exec(select(TeamModel).where(TeamModel.id.in_(team_ids)).order_by(TeamModel.id))).all()
+    team_ids = [team.id for team in teams]
+    if not team_ids:
+        return []
+
+    done: Dict[tuple, int] = {}
+    for kind in ACTIVITY_KINDS:
+        rows = (await session.exec(activity_query(kind, team_ids, first, last))).all()
+        for team_id, week, count in rows:
+            done[kind, team_id, week] = int(count)
+
+    # A snapshot taken at the start of week N+1 holds the counters of week N
+    snapshots = (await session.exec(
+        select(TeamWeekModel.team_id, TeamWeekModel.week_start, TeamWeekModel.weekly_info_done, TeamWeekModel.weekly_plan_done)
+        .where(
+            TeamWeekModel.team_id.in_(team_ids),
+            TeamWeekModel.week_start > week_start_of(first),
+            TeamWeekModel.week_start <= week_start_of(last),
+        )
+    )).all()
+    recorded = {(team_id, week_of(week_start) - 1): (info, plan) for team_id, week_start, info, plan in snapshots}
+
+    result = []
+    for team in teams:
+        weeks = []
+        for week in range(first, last):
+            recorded_info, recorded_plan = recorded.get((team.id, week), (None, None))
+            weeks.append({
+                "week_start": week_start_of(week).isoformat(),
+                "info_done": done.get(("info", team.id, week), 0),
+                "plan_done": done.get(("plan", team.id, week), 0),
+                "recorded_info_done": recorded_info,
+                "recorded_plan_done": recorded_plan,
+            })
+        result.append({
+            "team_id": team.id,
+            "team_name": team.name,
+            "weekly_info_target": team.weekly_info_target,
+            "weekly_plan_target": team.weekly_plan_target,
+            "weeks": weeks,
+        })
+    return result
+
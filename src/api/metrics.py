@@ -0,0 +1,165 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from starlette.datastructures import Headers
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # FastAPI before lazy include_router: app.routes already hold the prefixed routes
+    def iter_route_contexts(routes):
+        return iter(routes)
+
+# Prometheus metrics, served at GET /metrics: per-route request counts, latencies and
+# in-flight requests (MetricsMiddleware), database statements and time, overall and per
+# request (fed by the engine events in api.db.session), and the connection pools.
+#
+# Routes are labelled with their path template as mounted on the app (/api/ir/{fetch_ir_id}),
+# unmatched paths as "unmatched", so label sets stay bounded. Event streams (/api/live) are
+# counted but left out of the latency and per-request histograms, they last as long as the client.
+#
+# Each gunicorn worker has its own metrics; with several workers set PROMETHEUS_MULTIPROC_DIR
+# to an empty directory (cleared on deploy) and /metrics reports all of them.
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ["method"], multiprocess_mode="livesum")
+
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed", ["engine"])
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+# N+1 query patterns show up as routes with a high statement count per request
+REQUEST_STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request", ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 500),
+)
+REQUEST_DB_SECONDS = Histogram("db_seconds_per_request", "Time spent in SQL statements per HTTP request", ["method", "route"])
+
+POOL_EVENTS = Counter("db_pool_events_total", "Connection pool events", ["engine", "event"])
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Connections of the pool by state (size is the configured pool size)", ["engine", "state"],
+    multiprocess_mode="livesum",
+)
+
+POOL_STATES = ("size", "checked_in", "checked_out", "overflow")
+
+
+class RequestDbStats:
+    """Statements run and seconds spent in them while serving one request."""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set per request by MetricsMiddleware; sync handlers run with a copy of the context, so
+# their statements land in the same object
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def observe_statement(engine: str, seconds: float):
+    """Count one executed statement of engine ("sync"/"async"), and charge it to the current request."""
+    DB_STATEMENTS.labels(engine).inc()
+    DB_STATEMENT_SECONDS.labels(engine).observe(seconds)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += seconds
+
+
+def observe_pool_event(engine: str, name: str):
+    POOL_EVENTS.labels(engine, name).inc()
+
+
+def observe_pools(stats: dict):
+    """Set the pool gauges from api.db.session.pool_stats()."""
+    for engine, pool in stats.items():
+        for state in POOL_STATES:
+            if state in pool:
+                POOL_CONNECTIONS.labels(engine, state).set(pool[state])
+
+
+def route_templates(routes: Iterable[BaseRoute]) -> Dict[int, str]:
+    """
+    Path template of every route as mounted on the app, include prefixes and all, keyed by
+    the id of the route object the router puts in scope["route"] (the included router's own
+    route, whose path lacks the prefix).
+    """
+    return {
+        id(getattr(context, "original_route", context)): context.path_format
+        for context in iter_route_contexts(routes)
+        if getattr(context, "path_format", None)
+    }
+
+
+class MetricsMiddleware:
+    """Records request count, latency, in-flight requests and database use per route."""
+
+    def __init__(self, app: ASGIApp, pool_stats: Optional[Callable[[], dict]] = None) -> None:
+        self.app = app
+        # Polled after each request: with several workers the gauges must be fresh in every one
+        self.pool_stats = pool_stats
+        self._templates: Dict[int, str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is None:
+            return "unmatched"
+        template = self._templates.get(id(route))
+        if template is None:
+            # First request (or routes added since): read the templates from the app's router
+            self._templates = route_templates(scope["app"].routes)
+            template = self._templates.setdefault(id(route), getattr(route, "path_format", None) or "unmatched")
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        response = {"status": 500, "stream": False}  # No response started: the exception becomes a 500
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["stream"] = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+            await send(message)
+
+        stats = RequestDbStats()
+        token = _request_db_stats.set(stats)
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            _request_db_stats.reset(token)
+            route = self._route(scope)
+            REQUESTS.labels(method, route, str(response["status"])).inc()
+            if not response["stream"]:
+                REQUEST_SECONDS.labels(method, route).observe(elapsed)
+                REQUEST_STATEMENTS.labels(method, route).observe(stats.statements)
+                REQUEST_DB_SECONDS.labels(method, route).observe(stats.seconds)
+            if self.pool_stats is not None:
+                observe_pools(self.pool_stats())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """(body, content type) of the Prometheus text exposition, of all workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
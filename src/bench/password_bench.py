@@ -0,0 +1,48 @@
+"""
+Password verification throughput with the configured argon2 parameters.
+
+    cd src && python -m bench.password_bench --workers 1 2 4 --seconds 5
+
+Prints logins/sec for each pool size and logins/sec per worker process, which is
+the number to size PASSWORD_POOL_WORKERS and PASSWORD_MAX_CONCURRENCY against.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from api.auth.passwords import hash_password, hasher, verify_password
+
+
+def bench(workers: int, seconds: float, password_hash: str) -> float:
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Warm up: spawn the processes and import passlib before timing
+        wait([pool.submit(verify_password, "benchmark", password_hash) for _ in range(workers)])
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        pending = {pool.submit(verify_password, "benchmark", password_hash) for _ in range(workers * 2)}
+        while pending:
+            finished, pending = wait(pending, return_when="FIRST_COMPLETED")
+            done += len(finished)
+            if time.perf_counter() < deadline:
+                pending |= {pool.submit(verify_password, "benchmark", password_hash) for _ in finished}
+        elapsed = time.perf_counter() - started
+    return done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"argon2id t={hasher.default_rounds} m={hasher.memory_cost}KiB p={hasher.parallelism}, {os.cpu_count()} cores")
+    password_hash = hash_password("benchmark")
+    for workers in args.workers:
+        rate = bench(workers, args.seconds, password_hash)
+        print(f"{workers:>3} workers: {rate:8.1f} logins/s  {rate / workers:6.1f} logins/s per worker")
+
+
+if __name__ == "__main__":
+    main()
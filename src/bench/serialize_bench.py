@@ -0,0 +1,89 @@
+"""
+Serialization time of an info details page, old path against FastJSONResponse.
+
+    cd src && python -m bench.serialize_bench --rows 10000 --repeat 20
+
+before:  model_dump() + .isoformat() per row, then JSONResponse (json.dumps)
+encoder: returning the rows from a handler, FastAPI's jsonable_encoder + JSONResponse
+after:   FastJSONResponse(rows) (orjson, rows passed as-is)
+
+Prints the best and median time per page and checks that all three bodies decode to
+the same data.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from api.events.models import InfoDetailModel, InfoResponse
+from api.events.responses import FastJSONResponse
+
+
+def make_rows(count: int):
+    # Fixed-offset tzinfo, as on rows read back from Postgres (pytz zones are much slower in orjson)
+    start = datetime.now(timezone(timedelta(hours=5, minutes=30)))
+    responses = list(InfoResponse)
+    return [
+        InfoDetailModel(
+            id=i,
+            ir_id=f"IR{i % 50:05d}",
+            info_date=start - timedelta(minutes=i),
+            response=responses[i % len(responses)],
+            comments=f"Follow up on call {i}, interested in the next session",
+            info_name=f"Prospect {i}",
+        )
+        for i in range(count)
+    ]
+
+
+def before(rows) -> bytes:
+    result = []
+    for row in rows:
+        data = row.model_dump()
+        if isinstance(data.get("info_date"), datetime):
+            data["info_date"] = data["info_date"].isoformat()
+        result.append(data)
+    return JSONResponse(content=result).body
+
+
+def encoder(rows) -> bytes:
+    return JSONResponse(content=jsonable_encoder(rows)).body
+
+
+def after(rows) -> bytes:
+    return FastJSONResponse(content=rows).body
+
+
+def timed(fn, rows, repeat: int):
+    fn(rows)  # warm up
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    bodies = {fn.__name__: fn(rows) for fn in (before, encoder, after)}
+    decoded = {name: json.loads(body) for name, body in bodies.items()}
+    assert decoded["before"] == decoded["encoder"] == decoded["after"], "serializers disagree"
+
+    print(f"{args.rows} InfoDetailModel rows, {len(bodies['after']) / 1024:.0f} KiB of JSON")
+    baseline = None
+    for fn in (before, encoder, after):
+        best, median = timed(fn, rows, args.repeat)
+        baseline = baseline or median
+        print(f"{fn.__name__:>8}: best {best * 1000:7.1f} ms  median {median * 1000:7.1f} ms  x{baseline / median:4.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Bytes on the wire and encode cost of the list endpoints, per format and content encoding.
+
+    cd src && python -m bench.wire_bench --irs 300 --details 500
+
+Seeds a scratch SQLite database (never DATABASE_URL), requests each endpoint as JSON and
+MessagePack with identity, gzip and br, and prints the body size sent and the time to
+serialize and compress that body with the configured levels. br rows need the brotli
+package and msgpack rows the msgpack package.
+"""
+import argparse
+import os
+import tempfile
+import time
+import zlib
+
+# Set before the api modules read their config
+_scratch = tempfile.mkdtemp(prefix="wire_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/bench.db"
+os.environ["WEEK_ROLLOVER_SCHEDULER"] = "false"
+os.environ["AUTH_TOKEN_SECRET"] = "bench"
+
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlmodel import Session
+from api.db.config import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL
+from api.db.session import engine
+from api.events.compression import brotli
+from api.events.models import InfoDetailModel, IrIdModel, IrModel, TeamMemberLink, TeamModel
+from api.events.responses import FastJSONResponse, MsgPackResponse, msgpack
+from main import app
+
+FORMATS = {"json": "application/json", "msgpack": "application/msgpack"}
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def seed(irs: int, details: int, team_size: int = 10):
+    ist = timezone(timedelta(hours=5, minutes=30))
+    ir_ids = [f"IR{i:05d}" for i in range(irs)]
+    with Session(engine) as session:
+        session.exec(insert(IrIdModel), params=[{"ir_id": ir_id} for ir_id in ir_ids])
+        session.exec(insert(IrModel), params=[{
+            "ir_id": ir_id, "ir_name": f"Member {ir_id}", "ir_email": f"{ir_id.lower()}@example.com",
+            "ir_password": "x" * 97, "ir_access_level": 5, "info_count": i % 40, "plan_count": i % 7,
+            "started_date": "01-04-2025", "weekly_info_target": 20, "weekly_plan_target": 5,
+        } for i, ir_id in enumerate(ir_ids)])
+        teams = range(1, irs // team_size + 1)
+        session.exec(insert(TeamModel), params=[{"id": team, "name": f"Team {team}"} for team in teams])
+        session.exec(insert(TeamMemberLink), params=[
+            {"team_id": 1 + i // team_size, "ir_id": ir_id, "role": "IR"}
+            for i, ir_id in enumerate(ir_ids) if 1 + i // team_size in teams
+        ])
+        start = datetime.now(ist)
+        session.exec(insert(InfoDetailModel), params=[{
+            "ir_id": ir_ids[0], "info_date": start - timedelta(minutes=i), "response": "ABC"[i % 3],
+            "comments": f"Follow up on call {i}, interested in the next session", "info_name": f"Prospect {i}",
+        } for i in range(details)])
+        session.commit()
+
+
+def encode_ms(content, fmt: str, encoding: str, repeat: int = 5) -> float:
+    response_class = FastJSONResponse if fmt == "json" else MsgPackResponse
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = response_class(content=content).body
+        if encoding == "gzip":
+            zlib.compress(body, COMPRESSION_GZIP_LEVEL, 16 + zlib.MAX_WBITS)
+        elif encoding == "br":
+            brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--irs", type=int, default=300)
+    parser.add_argument("--details", type=int, default=500)
+    args = parser.parse_args()
+
+    endpoints = [
+        f"/api/irs?limit={args.irs}",
+        "/api/teams",
+        f"/api/info_details/IR00000?limit={args.details}",
+        "/api/team_members/1",
+    ]
+    with TestClient(app) as client:
+        seed(args.irs, args.details)
+        print(f"{'endpoint':<42} {'format':<8} {'encoding':<9} {'bytes':>9} {'ratio':>6} {'encode ms':>10}")
+        for url in endpoints:
+            content = client.get(url).json()
+            identity = None
+            for fmt, media_type in FORMATS.items():
+                if fmt == "msgpack" and msgpack is None:
+                    continue
+                for encoding in ENCODINGS:
+                    if encoding == "br" and brotli is None:
+                        continue
+                    response = client.get(url, headers={"Accept": media_type, "Accept-Encoding": encoding})
+                    assert response.headers["content-type"].startswith(media_type), response.headers
+                    size = response.num_bytes_downloaded  # before decompression
+                    identity = identity or size
+                    print(f"{url.split('?')[0]:<42} {fmt:<8} {encoding:<9} {size:>9} {identity / size:>6.1f} {encode_ms(content, fmt, encoding):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
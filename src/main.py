@@ -1,23 +1,57 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from api.events import router as evnet_router
-from api.db.session import init_db
+from api.db.config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
+    WEEK_ROLLOVER_SCHEDULER,
+)
+from api.db.session import init_db, pool_stats
+from api.auth.passwords import shutdown_password_pool, start_password_pool
+from api.events.cache import read_cache
+from api.events.compression import CompressionMiddleware
+from api.events.live import live_feed
+from api.events.responses import FastJSONResponse
+from api.events.rollover import rollover_scheduler
+from api.metrics import MetricsMiddleware, observe_pools, render_metrics
 import os 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    start_password_pool()
+    read_cache.start()
+    live_feed.start()
+    rollover_task = asyncio.create_task(rollover_scheduler()) if WEEK_ROLLOVER_SCHEDULER else None
     yield
+    if rollover_task:
+        rollover_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await rollover_task
+    await live_feed.stop()
+    shutdown_password_pool()
+    read_cache.stop()
 
-app = FastAPI(title="DU Backend App", version="1.0.0",lifespan=lifespan)
+app = FastAPI(title="DU Backend App", version="1.0.0",lifespan=lifespan,default_response_class=FastJSONResponse)
 app.include_router(evnet_router,prefix="/api")
 app.add_middleware(CORSMiddleware,
                    allow_origins=["*"],
                    allow_credentials=True,
                    allow_methods=["*"],
                    allow_headers=["*"],
+                   expose_headers=["X-Next-Cursor"],
                    )
+# gzip, or brotli when accepted; skips small bodies and event streams
+app.add_middleware(CompressionMiddleware,
+                   minimum_size=COMPRESSION_MINIMUM_SIZE,
+                   compresslevel=COMPRESSION_GZIP_LEVEL,
+                   brotli_quality=COMPRESSION_BROTLI_QUALITY,
+                   )
+# Outermost, so latencies include compression
+app.add_middleware(MetricsMiddleware, pool_stats=pool_stats)
 
 @app.get("/")
 def hello():
@@ -25,4 +59,22 @@ def hello():
 
 @app.get("/healthz")
 def read_api_health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/healthz/pool")
+def read_pool_stats():
+    return pool_stats()
+
+@app.get("/healthz/cache")
+def read_cache_stats():
+    return read_cache.stats()
+
+@app.get("/healthz/live")
+def read_live_feed_stats():
+    return live_feed.stats()
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    observe_pools(pool_stats())
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
\ No newline at end of file
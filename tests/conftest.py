@@ -0,0 +1,104 @@
+import os
+import tempfile
+
+# Settings are read when api.db.config is imported, so they are fixed here, before any
+# app import. Tests run on a throwaway SQLite file unless TEST_DATABASE_URL points at a
+# scratch Postgres database (its tables are dropped and recreated for every test).
+_scratch = tempfile.mkdtemp(prefix="du-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{_scratch}/test.db"
+os.environ["AUTH_TOKEN_SECRET"] = "test-secret"
+os.environ["ARGON2_TIME_COST"] = "1"
+os.environ["ARGON2_MEMORY_COST"] = "1024"
+os.environ["ARGON2_PARALLELISM"] = "1"
+os.environ["PASSWORD_POOL_WORKERS"] = "0"  # hash in threads, no process pool
+os.environ["WEEK_ROLLOVER_SCHEDULER"] = "false"
+os.environ["CACHE_BACKEND"] = "memory"
+
+import pytest
+from fastapi.testclient import TestClient
+
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def engine():
+    from api.db.session import engine, reset_db
+    from api.events.cache import read_cache
+    from api.events.leaderboard import leaderboards
+
+    reset_db()
+    read_cache.clear()
+    leaderboards.forget(lambda name: True)
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def add_ir(client, ir_id: str, access_level: int = 5):
+    assert client.post("/api/add_ir_id", json={"ir_id": ir_id}).status_code == 200
+    response = client.post("/api/register_new_ir", json={
+        "ir_id": ir_id,
+        "ir_name": ir_id,
+        "ir_email": f"{ir_id.lower()}@example.com",
+        "ir_password": PASSWORD,
+        "ir_access_level": access_level,
+    })
+    assert response.status_code == 201, response.text
+
+
+def add_team(client, name: str) -> int:
+    response = client.post("/api/create_team", json={"name": name})
+    assert response.status_code == 201, response.text
+    return response.json()["team_id"]
+
+
+def add_member(client, ir_id: str, team_id: int, role: str = "IR"):
+    response = client.post("/api/add_ir_to_team", json={"ir_id": ir_id, "team_id": team_id, "role": role})
+    assert response.status_code == 201, response.text
+
+
+def set_ir(engine, ir_id: str, **values):
+    """Write IR columns (counters, targets) straight to the database."""
+    from sqlmodel import Session
+    from api.events.models import IrModel
+
+    with Session(engine) as session:
+        ir = session.get(IrModel, ir_id)
+        for name, value in values.items():
+            setattr(ir, name, value)
+        session.add(ir)
+        session.commit()
+
+
+def auth_headers(client, ir_id: str) -> dict:
+    response = client.post("/api/login", json={"ir_id": ir_id, "ir_password": PASSWORD})
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def walk(client, path: str, limit: int, items=lambda body: body, **params):
+    """Every page of a keyset endpoint, following X-Next-Cursor."""
+    pages = []
+    params = {**params, "limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(items(response.json()))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        params = {**params, "cursor": cursor}
+
+
+def info(ir_id: str, response: str = "A") -> dict:
+    return {"ir_id": ir_id, "response": response, "comments": "", "info_name": "prospect"}
+
+
+def plan(ir_id: str) -> dict:
+    return {"ir_id": ir_id, "plan_name": "plan", "comments": ""}
@@ -0,0 +1,40 @@
+from sqlalchemy import event
+from api.db.session import async_database_url, async_engine
+from conftest import add_ir, add_member, add_team, info
+
+
+def test_async_database_url_picks_the_async_drivers():
+    assert async_database_url("postgresql://du:s%40cret@db:5432/du") == "postgresql+psycopg://du:s%40cret@db:5432/du"
+    assert async_database_url("postgresql+psycopg2://du@db/du") == "postgresql+psycopg://du@db/du"
+    assert async_database_url("postgresql+psycopg://du@db/du?sslmode=require") == "postgresql+psycopg://du@db/du?sslmode=require"
+    assert async_database_url("sqlite:////tmp/du.db") == "sqlite+aiosqlite:////tmp/du.db"
+
+
+def test_read_endpoints_run_on_the_async_engine(client, engine):
+    add_ir(client, "IR1", access_level=2)
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id, role="LDC")
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")]).status_code == 201
+
+    statements = {"sync": 0, "async": 0}
+
+    def counter(name):
+        def count(*args):
+            statements[name] += 1
+        return count
+
+    listeners = [(engine, counter("sync")), (async_engine.sync_engine, counter("async"))]
+    for target, listener in listeners:
+        event.listen(target, "before_cursor_execute", listener)
+    try:
+        for path in ("/api/irs", "/api/ir/IR1", "/api/teams", f"/api/team_members/{team_id}",
+                     "/api/targets_dashboard/IR1", "/api/teams_by_ir/IR1", "/api/info_details/IR1", "/api/ldcs"):
+            response = client.get(path)
+            assert response.status_code == 200, path
+    finally:
+        for target, listener in listeners:
+            event.remove(target, "before_cursor_execute", listener)
+
+    assert statements["sync"] == 0
+    assert statements["async"] > 0
+    assert client.get("/api/ir/IR1").json()["ir_id"] == "IR1"
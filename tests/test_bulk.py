@@ -0,0 +1,70 @@
+from sqlmodel import Session, select
+from api.events.models import IrModel, TeamMemberLink, TeamModel
+from conftest import add_ir, add_member, add_team, auth_headers
+
+
+def statuses(body: dict) -> list:
+    return [(result["index"], result["status"]) for result in body["results"]]
+
+
+def test_bulk_assign_reports_each_item(client, engine):
+    add_ir(client, "LS1", access_level=3)
+    add_ir(client, "IR1")
+    add_ir(client, "IR2")
+    team_id = add_team(client, "A")
+    add_member(client, "IR2", team_id)
+
+    response = client.post("/api/bulk_assign_irs", json=[{"ir_id": "IR1", "team_id": team_id, "role": "IR"}], headers=auth_headers(client, "IR1"))
+    assert response.status_code == 403
+
+    response = client.post("/api/bulk_assign_irs", headers=auth_headers(client, "LS1"), json=[
+        {"ir_id": "IR1", "team_id": team_id, "role": "IR"},
+        {"ir_id": "IR2", "team_id": team_id, "role": "LDC"},
+        {"ir_id": "LS1", "team_id": team_id, "role": "LS"},
+        {"ir_id": "IR1", "team_id": team_id, "role": "GC"},
+        {"ir_id": "NOPE", "team_id": team_id, "role": "IR"},
+        {"ir_id": "IR1", "team_id": team_id + 1, "role": "IR"},
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert statuses(body) == [(0, "added"), (1, "updated"), (2, "added"), (3, "error"), (4, "error"), (5, "error")]
+    assert [result.get("detail") for result in body["results"][3:]] == ["Duplicate of item 0", "IR not found", "Team not found"]
+    assert body["counts"] == {"added": 2, "updated": 1, "error": 3}
+
+    with Session(engine) as session:
+        roles = dict(session.exec(select(TeamMemberLink.ir_id, TeamMemberLink.role).where(TeamMemberLink.team_id == team_id)).all())
+    assert roles == {"IR1": "IR", "IR2": "LDC", "LS1": "LS"}
+
+    response = client.post("/api/bulk_assign_irs", headers=auth_headers(client, "LS1"), json=[{"ir_id": "IR1", "team_id": team_id, "role": "IR"}])
+    assert statuses(response.json()) == [(0, "unchanged")]
+
+
+def test_bulk_targets_keep_what_is_left_out(client, engine):
+    add_ir(client, "LS1", access_level=3)
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    headers = auth_headers(client, "LS1")
+
+    response = client.post("/api/bulk_set_targets", headers=headers, json={
+        "irs": [
+            {"ir_id": "IR1", "weekly_info_target": 5, "weekly_plan_target": 2, "weekly_uv_target": 9},
+            {"ir_id": "LS1", "weekly_uv_target": 4},
+            {"ir_id": "NOPE", "weekly_info_target": 1},
+        ],
+        "teams": [{"team_id": team_id, "weekly_info_target": 50}, {"team_id": team_id, "weekly_plan_target": 1}],
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert statuses(body["irs"]) == [(0, "updated"), (1, "updated"), (2, "error")]
+    assert statuses(body["teams"]) == [(0, "updated"), (1, "error")]
+
+    response = client.post("/api/bulk_set_targets", headers=headers, json={"irs": [{"ir_id": "IR1", "weekly_plan_target": 3}]})
+    assert statuses(response.json()["irs"]) == [(0, "updated")]
+
+    with Session(engine) as session:
+        ir, ls = session.get(IrModel, "IR1"), session.get(IrModel, "LS1")
+        team = session.get(TeamModel, team_id)
+        # weekly_uv_target only applies to LDC/LS
+        assert (ir.weekly_info_target, ir.weekly_plan_target, ir.weekly_uv_target) == (5, 3, None)
+        assert (ls.weekly_info_target, ls.weekly_uv_target) == (0, 4)
+        assert (team.weekly_info_target, team.weekly_plan_target) == (50, 0)
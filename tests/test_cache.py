@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from api.events.cache import MISSING, CacheBackend, MemoryCacheBackend, RedisCacheBackend, redis_client
+from conftest import add_ir, add_member, add_team, auth_headers, info
+
+
+def test_cached_reads_follow_writes(client):
+    add_ir(client, "IR1")
+    add_ir(client, "LS1", access_level=3)
+    team_id = add_team(client, "A")
+
+    # Prime the cache, then change what each read was built from
+    assert client.get("/api/teams_by_ir/IR1").json() == []
+    assert client.get("/api/ldcs").json() == []
+    assert client.get("/api/targets_dashboard/IR1").json()["personal"]["weekly_info_target"] == 0
+    assert client.get("/api/teams").json()[0]["weekly_info_done"] == 0
+
+    add_member(client, "IR1", team_id, "LDC")
+    assert [team["id"] for team in client.get("/api/teams_by_ir/IR1").json()] == [team_id]
+    assert [ldc["ir_id"] for ldc in client.get("/api/ldcs").json()] == ["IR1"]
+
+    response = client.post(
+        "/api/bulk_set_targets", json={"irs": [{"ir_id": "IR1", "weekly_info_target": 7}]}, headers=auth_headers(client, "LS1"),
+    )
+    assert response.status_code == 200, response.text
+    assert client.get("/api/targets_dashboard/IR1").json()["personal"]["weekly_info_target"] == 7
+
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")] * 2).status_code == 201
+    assert client.get("/api/teams").json()[0]["weekly_info_done"] == 2
+
+    assert client.delete(f"/api/remove_ir_from_team/{team_id}/IR1").status_code == 200
+    assert client.get("/api/teams_by_ir/IR1").json() == []
+    assert client.get("/api/ldcs").json() == []
+
+
+def test_cached_history_follows_info_edits_and_deletes(client):
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id)
+    response = client.post("/api/add_info_detail/IR1", json=[info("IR1")] * 2)
+    first, second = response.json()["info_ids"]
+
+    def this_week():
+        return client.get("/api/team_history", params={"team_ids": team_id}).json()[0]["weeks"][-1]["info_done"]
+
+    assert this_week() == 2
+    earlier = (datetime.now(timezone.utc) - timedelta(weeks=3)).isoformat()
+    assert client.put(f"/api/update_info_detail/{first}", json={**info("IR1"), "info_date": earlier}).status_code == 200
+    assert this_week() == 1
+    assert client.delete(f"/api/delete_info_detail/{second}").status_code == 200
+    assert this_week() == 0
+
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_redis_backend_stays_off_the_event_loop():
+    class Recording:
+        def __init__(self, client):
+            self.client = client
+            self.threads = set()
+
+        def __getattr__(self, name):
+            self.threads.add(threading.get_ident())
+            return getattr(self.client, name)
+
+    client = Recording(redis_client("fakeredis://"))
+    backend = RedisCacheBackend(client, ttl=60, l1=MemoryCacheBackend(100, 60), channel="test", prefix="test:")
+
+    async def read():
+        token = await backend.begin_async()
+        assert await backend.get_async("key") is MISSING
+        await backend.set_async("key", {"n": 1}, ["team:1"], token)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(read())
+    assert client.threads and loop_thread not in client.threads
+    # Shared with a worker whose L1 is empty
+    other = RedisCacheBackend(client, ttl=60, l1=MemoryCacheBackend(100, 60), channel="test", prefix="test:")
+    assert asyncio.run(other.get_async("key")) == {"n": 1}
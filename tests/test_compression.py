@@ -0,0 +1,63 @@
+import json
+import zlib
+import brotli
+import msgpack
+import pytest
+from conftest import add_ir, info
+
+
+@pytest.fixture
+def irs(client):
+    # Enough rows for the /irs body to pass the 1 KiB threshold
+    for n in range(20):
+        add_ir(client, f"IR{n:02d}")
+
+
+def test_compression_follows_accept_encoding(client, irs):
+    plain = client.get("/api/irs", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+    assert len(plain.content) >= 1024
+
+    for encoding, decompress in (("br", brotli.decompress), ("gzip", lambda body: zlib.decompress(body, 16 + zlib.MAX_WBITS))):
+        with client.stream("GET", "/api/irs", headers={"Accept-Encoding": encoding}) as response:
+            raw = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == encoding
+        assert int(response.headers["content-length"]) == len(raw) < len(plain.content)
+        assert {"Accept", "Accept-Encoding"} <= {part.strip() for part in response.headers["vary"].split(",")}
+        assert decompress(raw) == plain.content
+
+    # br refused with q=0: gzip instead
+    response = client.get("/api/irs", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_small_bodies_are_sent_as_is(client):
+    response = client.get("/healthz", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_streamed_exports_are_compressed_chunk_by_chunk(client):
+    add_ir(client, "IR1")
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")] * 50).status_code == 201
+
+    with client.stream("GET", "/api/export/info", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    rows = [json.loads(line) for line in zlib.decompress(raw, 16 + zlib.MAX_WBITS).splitlines()]
+    assert len(rows) == 50
+
+
+def test_msgpack_round_trips_the_json_body(client, irs):
+    as_json = client.get("/api/irs")
+    as_msgpack = client.get("/api/irs", headers={"Accept": "application/msgpack"})
+    assert as_msgpack.headers["content-type"] == "application/msgpack"
+    assert as_json.headers["vary"].startswith("Accept") and as_msgpack.headers["vary"].startswith("Accept")
+    assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+
+    # q=0 means not acceptable: JSON again
+    response = client.get("/api/irs", headers={"Accept": "application/msgpack;q=0"})
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,50 @@
+from conftest import add_ir, add_member, add_team, info
+
+
+def revalidate(client, path: str, etag: str):
+    return client.get(path, headers={"If-None-Match": etag})
+
+
+def test_conditional_gets_answer_304_until_a_write(client):
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id)
+
+    for path in ("/api/teams", f"/api/team_members/{team_id}", "/api/targets_dashboard/IR1"):
+        response = client.get(path)
+        assert response.status_code == 200, path
+        etag = response.headers["ETag"]
+        not_modified = revalidate(client, path, etag)
+        assert not_modified.status_code == 304 and not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+    etag = client.get("/api/targets_dashboard/IR1").headers["ETag"]
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")]).status_code == 201
+    response = revalidate(client, "/api/targets_dashboard/IR1", etag)
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
+
+def test_info_edits_and_deletes_change_the_versions(client):
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id)
+    [info_id] = client.post("/api/add_info_detail/IR1", json=[info("IR1")]).json()["info_ids"]
+
+    paths = ("/api/teams", f"/api/team_members/{team_id}", "/api/targets_dashboard/IR1")
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+    assert client.put(f"/api/update_info_detail/{info_id}", json=info("IR1", "B")).status_code == 200
+    for path in paths:
+        assert revalidate(client, path, etags[path]).status_code == 200, path
+
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+    assert client.delete(f"/api/delete_info_detail/{info_id}").status_code == 200
+    for path in paths:
+        assert revalidate(client, path, etags[path]).status_code == 200, path
+
+
+def test_if_modified_since(client):
+    add_team(client, "A")
+    response = client.get("/api/teams")
+    last_modified = response.headers["Last-Modified"]
+    assert client.get("/api/teams", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/api/teams", headers={"If-Modified-Since": "Thu, 01 Jan 2015 00:00:00 GMT"}).status_code == 200
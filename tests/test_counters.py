@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import Session, func, select
+from api.events.models import InfoDetailModel, IrModel, PlanDetailModel, TeamModel
+from conftest import add_ir, add_member, add_team, info, plan
+
+THREADS = 8
+REQUESTS_PER_THREAD = 10
+
+
+def test_concurrent_ingest_keeps_team_counters_exact(client, engine):
+    team_id = add_team(client, "Hammered")
+    other_team_id = add_team(client, "Other")
+    ir_ids = [f"IR{n}" for n in range(4)]
+    for ir_id in ir_ids:
+        add_ir(client, ir_id)
+        add_member(client, ir_id, team_id)
+    add_member(client, ir_ids[0], other_team_id)
+
+    def hammer(worker: int):
+        ir_id = ir_ids[worker % len(ir_ids)]
+        for request in range(REQUESTS_PER_THREAD):
+            if request % 2:
+                response = client.post(f"/api/add_plan_detail/{ir_id}", json=[plan(ir_id)])
+            else:
+                response = client.post(f"/api/add_info_detail/{ir_id}", json=[info(ir_id), info(ir_id, "B")])
+            assert response.status_code == 201, response.text
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(hammer, range(THREADS)))
+
+    with Session(engine) as session:
+        infos = session.exec(select(func.count()).select_from(InfoDetailModel)).one()
+        plans = session.exec(select(func.count()).select_from(PlanDetailModel)).one()
+        team = session.get(TeamModel, team_id)
+        other_team = session.get(TeamModel, other_team_id)
+        ir_totals = session.exec(select(func.sum(IrModel.info_count), func.sum(IrModel.plan_count))).one()
+        ir0_infos = session.exec(
+            select(func.count()).select_from(InfoDetailModel).where(InfoDetailModel.ir_id == ir_ids[0])
+        ).one()
+
+    assert infos == THREADS * REQUESTS_PER_THREAD  # 2 infos on half the requests
+    assert plans == THREADS * REQUESTS_PER_THREAD // 2
+    assert (team.weekly_info_done, team.weekly_plan_done) == (infos, plans)
+    assert tuple(ir_totals) == (infos, plans)
+    assert other_team.weekly_info_done == ir0_infos
+
+    totals = client.get(f"/api/team_info_total/{team_id}").json()
+    assert totals["running_weekly_info_done"] == totals["recomputed_members_info_total"] == infos
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import datetime
+from sqlmodel import Session
+from api.events.models import IST, InfoDetailModel
+from conftest import add_ir, add_member, add_team, plan
+
+
+def add_info(engine, ir_id: str, name: str, when: str):
+    with Session(engine) as session:
+        session.add(InfoDetailModel(ir_id=ir_id, info_date=IST.localize(datetime.fromisoformat(when)), response="A", comments="", info_name=name))
+        session.commit()
+
+
+def export(client, kind: str, **params):
+    response = client.get(f"/api/export/{kind}", params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def ndjson_names(client, **params):
+    response = export(client, "info", **params)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line)["info_name"] for line in response.text.splitlines()]
+
+
+def test_export_streams_filtered_rows_in_date_order(client, engine, monkeypatch):
+    # Small batches, so the rows span several chunks
+    monkeypatch.setattr("api.events.export.EXPORT_FETCH_SIZE", 2)
+    for ir_id in ("LDC1", "IR1", "IR2", "IR3"):
+        add_ir(client, ir_id)
+    team_id = add_team(client, "A")
+    add_member(client, "LDC1", team_id, role="LDC")
+    add_member(client, "IR1", team_id)
+    add_member(client, "IR2", team_id)
+    add_info(engine, "IR1", "c", "2025-03-03T10:00:00")
+    add_info(engine, "IR2", "b", "2025-03-02T10:00:00")
+    add_info(engine, "IR1", "a", "2025-03-01T10:00:00")
+    add_info(engine, "IR3", "b2", "2025-03-02T12:00:00")
+    add_info(engine, "IR1", "d", "2025-03-04T23:30:00")
+
+    assert ndjson_names(client) == ["a", "b", "b2", "c", "d"]
+    assert ndjson_names(client, ir_id="IR1") == ["a", "c", "d"]
+    assert ndjson_names(client, team_id=team_id) == ["a", "b", "c", "d"]
+    assert ndjson_names(client, ldc_id="LDC1") == ["a", "b", "c", "d"]
+    assert ndjson_names(client, ldc_id="IR1") == []
+    # Inclusive IST dates: 23:30 IST on the 4th is still the 4th
+    assert ndjson_names(client, from_date="2025-03-02", to_date="2025-03-04") == ["b", "b2", "c", "d"]
+    assert ndjson_names(client, to_date="2025-03-03") == ["a", "b", "b2", "c"]
+
+    response = export(client, "info", format="csv", ir_id="IR1")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="info_details.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["ir_id"], row["info_name"], row["response"]) for row in rows] == [("IR1", "a", "A"), ("IR1", "c", "A"), ("IR1", "d", "A")]
+
+
+def test_export_plans(client):
+    add_ir(client, "IR1")
+    assert client.post("/api/add_plan_detail/IR1", json=[plan("IR1")] * 3).status_code == 201
+
+    lines = export(client, "plan").text.splitlines()
+    assert [json.loads(line)["plan_name"] for line in lines] == ["plan"] * 3
+    header = export(client, "plan", format="csv").text.splitlines()[0]
+    assert header.split(",") == ["id", "ir_id", "plan_date", "plan_name", "comments"]
+
+
+def test_export_rejects_unknown_kinds_formats_and_dates(client):
+    assert client.get("/api/export/targets").status_code == 400
+    assert client.get("/api/export/info", params={"format": "xml"}).status_code == 400
+    assert client.get("/api/export/info", params={"from_date": "yesterday"}).status_code == 400
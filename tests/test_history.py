@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from sqlmodel import Session
+from api.events.models import IST, InfoDetailModel, PlanDetailModel
+from conftest import add_ir, walk
+
+
+def add_rows(engine, rows):
+    with Session(engine) as session:
+        session.add_all(rows)
+        session.commit()
+
+
+def test_info_history_pages_follow_date_then_id(client, engine):
+    add_ir(client, "IR1")
+    now = datetime.now(IST)
+    # Two rows share each timestamp, so the id breaks the ties
+    add_rows(engine, [
+        InfoDetailModel(ir_id="IR1", info_date=now - timedelta(hours=hours), response="A", comments="", info_name="prospect")
+        for hours in (1, 1, 2, 2, 3)
+    ])
+
+    pages = walk(client, "/api/info_details/IR1", 2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    listed = [row["id"] for page in pages for row in page]
+    assert len(set(listed)) == 5
+    # Newest first, the higher id first within a timestamp
+    keys = [(row["info_date"], row["id"]) for page in pages for row in page]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_plan_history_is_paged_within_the_date_window(client, engine):
+    add_ir(client, "IR1")
+    add_ir(client, "IR2")
+    # One plan a day at noon IST, 1-10 March
+    add_rows(engine, [
+        PlanDetailModel(ir_id="IR1", plan_date=IST.localize(datetime(2025, 3, day, 12)), plan_name=f"day {day}", comments="")
+        for day in range(1, 11)
+    ] + [PlanDetailModel(ir_id="IR2", plan_date=IST.localize(datetime(2025, 3, 5, 12)), plan_name="other", comments="")])
+
+    pages = walk(client, "/api/plan_details/IR1", 3)
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert [row["plan_name"] for page in pages for row in page] == [f"day {day}" for day in range(10, 0, -1)]
+    assert {row["ir_id"] for page in pages for row in page} == {"IR1"}
+
+    # Inclusive IST dates, and the cursor keeps the window
+    pages = walk(client, "/api/plan_details/IR1", 2, from_date="2025-03-03", to_date="2025-03-07")
+    assert [row["plan_name"] for page in pages for row in page] == ["day 7", "day 6", "day 5", "day 4", "day 3"]
+
+
+def test_history_page_size_defaults_to_50(client, engine):
+    add_ir(client, "IR1")
+    now = datetime.now(IST)
+    add_rows(engine, [PlanDetailModel(ir_id="IR1", plan_date=now, plan_name="plan", comments="") for _ in range(51)])
+
+    response = client.get("/api/plan_details/IR1")
+    assert len(response.json()) == 50
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_bad_history_parameters_get_400(client):
+    add_ir(client, "IR1")
+    for path in ("/api/info_details/IR1", "/api/plan_details/IR1"):
+        assert client.get(path, params={"cursor": "not-a-cursor"}).status_code == 400, path
+        assert client.get(path, params={"from_date": "03/01/2025"}).status_code == 400, path
@@ -0,0 +1,60 @@
+import json
+from api.events import ir_import
+from conftest import PASSWORD, add_ir, auth_headers
+
+
+def record(ir_id: str, **fields) -> dict:
+    return {"ir_id": ir_id, "ir_name": ir_id, "ir_email": f"{ir_id.lower()}@example.com", "ir_password": PASSWORD, **fields}
+
+
+def upload(client, headers, body: str, format: str = "ndjson"):
+    response = client.post(f"/api/import_irs?format={format}", content=body.encode(), headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def ndjson(*records) -> str:
+    return "".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in records)
+
+
+def test_import_reports_each_line(client):
+    add_ir(client, "ADMIN", access_level=1)
+    headers = auth_headers(client, "ADMIN")
+    assert client.post("/api/add_ir_id", json={"ir_id": "OLD"}).status_code == 200
+
+    result = upload(client, headers, ndjson(
+        {"ir_id": "ID1"},
+        record("IR1"),
+        "{not json",
+        record("IR2", ir_access_level=9),
+        record("IR1"),
+        {"ir_id": "OLD"},
+        record("ADMIN"),
+    ))
+    assert (result["received"], result["ir_ids_added"], result["irs_registered"], result["existing_ir_ids"]) == (7, 2, 1, 1)
+    assert [(error["line"], error["ir_id"]) for error in result["errors"]] == [(3, None), (4, "IR2"), (5, "IR1"), (7, "ADMIN")]
+    assert result["errors"][-1]["error"] == "IR already registered"
+    # Stored as a hash, so the imported IR can log in
+    auth_headers(client, "IR1")
+
+    result = upload(client, headers, "ir_id,ir_name,ir_email,ir_password\nIR3,IR3,ir3@example.com,password123\nID2,,,\n", format="csv")
+    assert (result["ir_ids_added"], result["irs_registered"], result["error_count"]) == (2, 1, 0)
+
+
+def test_reuploads_do_not_hash_registered_irs(client, monkeypatch):
+    add_ir(client, "ADMIN", access_level=1)
+    headers = auth_headers(client, "ADMIN")
+    body = ndjson(record("IR1"), record("IR2"))
+    assert upload(client, headers, body)["irs_registered"] == 2
+
+    hashed = []
+    real_hash = ir_import.hash_passwords_async
+
+    async def recording_hash(passwords):
+        hashed.extend(passwords)
+        return await real_hash(passwords)
+
+    monkeypatch.setattr(ir_import, "hash_passwords_async", recording_hash)
+    result = upload(client, headers, body + ndjson(record("IR3")))
+    assert (result["irs_registered"], result["error_count"]) == (1, 2)
+    assert hashed == [PASSWORD]
@@ -0,0 +1,101 @@
+from sqlalchemy import event
+from sqlalchemy.sql import Insert
+from sqlmodel import Session, func, select
+from api.events.models import InfoDetailModel, IrModel, PlanDetailModel, TeamModel
+from conftest import add_ir, add_member, add_team, info, plan
+
+
+class StatementLog:
+    """Statements and commits seen by an engine while the block runs."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.executions = []  # what the app executes
+        self.statements = []  # what reaches the driver
+        self.commits = 0
+
+    def _execution(self, connection, clauseelement, *args):
+        self.executions.append(clauseelement)
+
+    def _statement(self, connection, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def _commit(self, connection):
+        self.commits += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_execute", self._execution)
+        event.listen(self.engine, "before_cursor_execute", self._statement)
+        event.listen(self.engine, "commit", self._commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_execute", self._execution)
+        event.remove(self.engine, "before_cursor_execute", self._statement)
+        event.remove(self.engine, "commit", self._commit)
+
+    def assert_one_insert(self, table: str):
+        assert sum(isinstance(element, Insert) and element.table.name == table for element in self.executions) == 1
+        if self.engine.dialect.name == "postgresql":
+            # One multi-row INSERT ... RETURNING. SQLite cannot return the ids of a
+            # multi-row insert in order, so SQLAlchemy sends it a row at a time.
+            assert sum(statement.lstrip().startswith(f"INSERT INTO {table} ") for statement in self.statements) == 1
+
+
+def test_info_batch_is_one_insert_and_one_commit(client, engine):
+    add_ir(client, "IR1")
+    team_ids = [add_team(client, "A"), add_team(client, "B")]
+    for team_id in team_ids:
+        add_member(client, "IR1", team_id)
+
+    payload = [{**info("IR1", response), "info_name": f"prospect {n}"} for n, response in enumerate("ABCAB")]
+    with StatementLog(engine) as log:
+        response = client.post("/api/add_info_detail/IR1", json=payload)
+    assert response.status_code == 201, response.text
+    log.assert_one_insert("infodetailmodel")
+    assert log.commits == 1
+
+    info_ids = response.json()["info_ids"]
+    with Session(engine) as session:
+        # Ids come back in payload order
+        names = [session.get(InfoDetailModel, info_id).info_name for info_id in info_ids]
+        assert names == [row["info_name"] for row in payload]
+        assert session.get(IrModel, "IR1").info_count == 5
+        assert [session.get(TeamModel, team_id).weekly_info_done for team_id in team_ids] == [5, 5]
+
+
+def test_plan_batch_is_one_insert_and_one_commit(client, engine):
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id)
+
+    payload = [{**plan("IR1"), "plan_name": f"plan {n}", "plan_date": "2025-03-07T10:00:00+05:30"} for n in range(4)]
+    with StatementLog(engine) as log:
+        response = client.post("/api/add_plan_detail/IR1", json=payload)
+    assert response.status_code == 201, response.text
+    log.assert_one_insert("plandetailmodel")
+    assert log.commits == 1
+
+    with Session(engine) as session:
+        plans = [session.get(PlanDetailModel, plan_id) for plan_id in response.json()["plan_ids"]]
+        assert [row.plan_name for row in plans] == [row["plan_name"] for row in payload]
+        assert session.get(IrModel, "IR1").plan_count == 4
+        assert session.get(TeamModel, team_id).weekly_plan_done == 4
+
+
+def test_failed_batch_leaves_nothing_behind(client, engine):
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id)
+
+    # The last row has no info_name (NOT NULL): the whole batch is rolled back
+    payload = [info("IR1"), info("IR1"), {**info("IR1"), "info_name": None}]
+    assert client.post("/api/add_info_detail/IR1", json=payload).status_code == 500
+
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(InfoDetailModel)).one() == 0
+        assert session.get(IrModel, "IR1").info_count == 0
+        assert session.get(TeamModel, team_id).weekly_info_done == 0
+
+    assert client.post("/api/add_info_detail/NOPE", json=[info("NOPE")]).status_code == 404
+    assert client.post("/api/add_plan_detail/NOPE", json=[plan("NOPE")]).status_code == 404
@@ -0,0 +1,37 @@
+import pytest
+from api.events.leaderboard import LeaderboardBackend
+from conftest import add_ir, add_member, add_team, info
+
+
+def test_rankings_follow_ingests(client):
+    for ir_id in ("IR1", "IR2"):
+        add_ir(client, ir_id)
+    team_id = add_team(client, "A")
+    add_member(client, "IR2", team_id)
+
+    # Built (all zeros) before the ingests, then kept current by them
+    assert client.get("/api/leaderboard/info").json()["total"] == 2
+    assert client.post("/api/add_info_detail/IR2", json=[info("IR2")] * 3).status_code == 201
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")]).status_code == 201
+
+    board = client.get("/api/leaderboard/info", params={"me": "IR1"}).json()
+    assert [(entry["rank"], entry["ir_id"], entry["score"]) for entry in board["entries"]] == [(1, "IR2", 3), (2, "IR1", 1)]
+    assert board["me"]["rank"] == 2
+
+    board = client.get("/api/leaderboard/info", params={"entity": "team", "me": f"0{team_id}"}).json()
+    assert board["entries"][0] == {"rank": 1, "team_id": team_id, "name": "A", "score": 3}
+    assert board["me"]["team_id"] == team_id
+
+
+def test_team_rankings_reject_non_numeric_me(client):
+    response = client.get("/api/leaderboard/info", params={"entity": "team", "me": "abc"})
+    assert response.status_code == 400
+
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(LeaderboardBackend):
+        def exists(self, name):
+            return False
+
+    with pytest.raises(TypeError):
+        Incomplete()
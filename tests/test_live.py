@@ -0,0 +1,44 @@
+import asyncio
+import orjson
+import pytest
+from api.events.live import NOTIFY_MAX_BYTES, LiveFeed, MemoryLiveFeed, PostgresLiveFeed
+
+
+class RecordingSession:
+    def __init__(self):
+        self.payloads = []
+
+    def exec(self, statement):
+        self.payloads.extend(statement.compile().params.values())
+
+
+def test_rollover_and_resync_reach_every_stream():
+    async def run():
+        feed = MemoryLiveFeed(queue_size=10)
+        by_team, by_ir = feed.subscribe([1], []), feed.subscribe([], ["IR1"])
+        feed.dispatch({"type": "progress", "ir_id": "IR2", "team_ids": [1, 2], "info": 1, "plan": 0})
+        feed.dispatch({"type": "rollover"})
+        feed.resync_all("reconnected")
+        return [by_team.queue.get_nowait() for _ in range(by_team.queue.qsize())], [by_ir.queue.get_nowait() for _ in range(by_ir.queue.qsize())]
+
+    by_team, by_ir = asyncio.run(run())
+    assert [message["type"] for message in by_team] == ["progress", "rollover", "resync"]
+    assert by_team[0]["team_ids"] == [1]
+    assert [message["type"] for message in by_ir] == ["rollover", "resync"]
+
+
+def test_oversized_notifications_become_a_resync():
+    feed = PostgresLiveFeed("postgresql://localhost/live", "live")
+    session = RecordingSession()
+    feed.publish(session, {"type": "progress", "ir_id": "IR1", "team_ids": [1, 2], "info": 1, "plan": 0})
+    feed.publish(session, {"type": "progress", "ir_id": "IR1", "team_ids": list(range(100000, 102000)), "info": 1, "plan": 0})
+
+    first, second = (orjson.loads(payload) for payload in session.payloads if payload != "live")
+    assert first["team_ids"] == [1, 2]
+    assert second == {"type": "resync", "reason": "oversized"}
+    assert all(len(payload.encode()) <= NOTIFY_MAX_BYTES for payload in session.payloads)
+
+
+def test_feeds_must_implement_publish():
+    with pytest.raises(TypeError):
+        LiveFeed()
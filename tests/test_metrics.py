@@ -0,0 +1,22 @@
+from conftest import add_ir
+
+
+def scrape(client) -> str:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    return response.text
+
+
+def test_requests_are_labelled_with_the_mounted_template(client):
+    add_ir(client, "IR1")
+    assert client.get("/api/ir/IR1").status_code == 200
+    assert client.get("/healthz").status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+
+    metrics = scrape(client)
+    assert 'http_requests_total{method="GET",route="/api/ir/{fetch_ir_id}",status="200"}' in metrics
+    assert 'http_requests_total{method="GET",route="/healthz",status="200"}' in metrics
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in metrics
+    # Templates only: the IR id itself never becomes a label
+    assert 'route="/api/ir/IR1"' not in metrics and 'route="/ir/{fetch_ir_id}"' not in metrics
+    assert 'db_statements_per_request_count{method="GET",route="/api/ir/{fetch_ir_id}"}' in metrics
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config as AlembicConfig
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+from api.db.session import ALEMBIC_INI, run_migrations
+
+INITIAL_REVISION = "3f1c2a9d7b10"
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(AlembicConfig(str(ALEMBIC_INI))).get_current_head()
+
+
+def current_revision(engine) -> str:
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def index_names(engine, table: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_fresh_database_is_migrated_to_the_models(engine):
+    assert current_revision(engine) == head_revision()
+    with engine.connect() as connection:
+        diffs = compare_metadata(MigrationContext.configure(connection), SQLModel.metadata)
+    # The revisions create exactly the tables, columns and indexes the models declare
+    assert diffs == []
+
+
+def test_create_all_database_is_adopted_and_deduplicated(engine):
+    # A database as create_all left it before migrations: the initial tables, no alembic_version
+    SQLModel.metadata.drop_all(engine)
+    config = AlembicConfig(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        config.attributes["connection"] = connection
+        command.upgrade(config, INITIAL_REVISION)
+        connection.execute(text("DROP TABLE alembic_version"))
+
+    week = datetime(2025, 3, 7, 16, 1, tzinfo=timezone.utc)
+    with engine.begin() as connection:
+        for ir_id in ("IR1", "IR2"):
+            connection.execute(text(
+                "INSERT INTO irmodel (ir_id, ir_name, ir_email, ir_access_level, ir_password, status)"
+                " VALUES (:ir_id, :ir_id, 'ir@example.com', 5, 'x', true)"
+            ), {"ir_id": ir_id})
+        connection.execute(text("INSERT INTO teammodel (id, name) VALUES (1, 'A')"))
+        # IR1 was added to team 1 twice
+        for link_id, ir_id in ((1, "IR1"), (2, "IR2"), (3, "IR1")):
+            connection.execute(text(
+                "INSERT INTO teammemberlink (id, team_id, ir_id, role) VALUES (:id, 1, :ir_id, 'IR')"
+            ), {"id": link_id, "ir_id": ir_id})
+        # and the rollover stored the same week twice
+        for snapshot_id, done in ((1, 5), (2, 6)):
+            connection.execute(text(
+                "INSERT INTO teamweekmodel (id, team_id, week_start, weekly_info_done, weekly_plan_done, created_at)"
+                " VALUES (:id, 1, :week, :done, 0, :week)"
+            ), {"id": snapshot_id, "week": week, "done": done})
+    assert current_revision(engine) is None
+
+    run_migrations()
+
+    assert current_revision(engine) == head_revision()
+    with engine.connect() as connection:
+        # The oldest row of each duplicate is kept, then the unique indexes could be built
+        assert connection.execute(text("SELECT id FROM teammemberlink ORDER BY id")).scalars().all() == [1, 2]
+        assert connection.execute(text("SELECT weekly_info_done FROM teamweekmodel")).scalars().all() == [5]
+    assert {"ux_teammemberlink_team_id_ir_id", "ix_teammemberlink_ir_id_team_id"} <= index_names(engine, "teammemberlink")
+    assert "ux_teamweekmodel_team_id_week_start" in index_names(engine, "teamweekmodel")
+    assert "ix_infodetailmodel_ir_id_info_date" in index_names(engine, "infodetailmodel")
+
+    # Running again (every worker does on startup) is a no-op
+    run_migrations()
+    assert current_revision(engine) == head_revision()
@@ -0,0 +1,20 @@
+from conftest import add_ir, walk
+
+
+def test_ir_lists_walk_without_gaps_or_duplicates(client):
+    ir_ids = [f"IR{n:02d}" for n in range(7)]
+    for ir_id in ir_ids:
+        add_ir(client, ir_id)
+
+    pages = walk(client, "/api/get_all_ir", 3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [record["ir_id"] for page in pages for record in page] == ir_ids
+
+    pages = walk(client, "/api/irs", 3, lambda body: body["data"])
+    assert [record["ir_id"] for page in pages for record in page] == ir_ids
+    assert all("ir_password" not in record for page in pages for record in page)
+
+
+def test_bad_cursors_get_400(client):
+    for path in ("/api/get_all_ir", "/api/irs"):
+        assert client.get(path, params={"cursor": "not-a-cursor"}).status_code == 400, path
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from api.db import session as db_session
+from conftest import add_ir
+
+POSTGRES_URL = "postgresql+psycopg://du@db:5432/du"
+
+
+def test_postgres_engines_get_the_configured_pool(monkeypatch):
+    monkeypatch.setattr(db_session, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(db_session, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(db_session, "DB_POOL_TIMEOUT", 4)
+    monkeypatch.setattr(db_session, "DB_STATEMENT_TIMEOUT_MS", 2500)
+
+    options = db_session.engine_options(POSTGRES_URL)
+    assert options["pool_recycle"] == db_session.DB_POOL_RECYCLE
+    assert options["connect_args"] == {"application_name": db_session.DB_APPLICATION_NAME, "options": "-c statement_timeout=2500"}
+
+    # Creating an engine does not connect
+    pool = db_session.build_engine(POSTGRES_URL).pool
+    assert isinstance(pool, QueuePool)
+    assert (pool.size(), pool.timeout()) == (7, 4)
+    assert db_session.build_engine(POSTGRES_URL, is_async=True).sync_engine.pool.size() == 7
+
+    # Behind PgBouncer in transaction mode: no prepared statements, no session settings
+    monkeypatch.setattr(db_session, "DB_PGBOUNCER_TRANSACTION_MODE", True)
+    assert db_session.engine_options(POSTGRES_URL)["connect_args"] == {"application_name": db_session.DB_APPLICATION_NAME, "prepare_threshold": None}
+
+
+def test_sqlite_engines_keep_the_default_pool():
+    assert db_session.engine_options("sqlite:///du.db") == {"connect_args": {"check_same_thread": False}}
+
+
+@pytest.mark.parametrize("pgbouncer", [False, True])
+def test_statement_timeout_reaches_the_server(engine, monkeypatch, pgbouncer):
+    if engine.dialect.name != "postgresql":
+        pytest.skip("statement_timeout is a Postgres setting")
+    monkeypatch.setattr(db_session, "DB_STATEMENT_TIMEOUT_MS", 1234)
+    monkeypatch.setattr(db_session, "DB_PGBOUNCER_TRANSACTION_MODE", pgbouncer)
+    timed = db_session.build_engine(engine.url.render_as_string(hide_password=False))
+    try:
+        with timed.begin() as connection:
+            assert connection.execute(text("SHOW statement_timeout")).scalar() == "1234ms"
+    finally:
+        timed.dispose()
+
+
+def test_pool_stats_report_checkouts_without_leaks(client):
+    add_ir(client, "IR1")
+    before = client.get("/healthz/pool").json()
+    for _ in range(3):
+        assert client.get("/api/ir/IR1").status_code == 200
+
+    after = client.get("/healthz/pool").json()
+    assert set(after) == {"sync", "async"}
+    assert after["async"]["checkout"] >= before["async"]["checkout"] + 3
+    # Every connection went back to its pool
+    assert after["async"]["checkout"] - after["async"]["checkin"] == before["async"]["checkout"] - before["async"]["checkin"]
+    for stats in after.values():
+        assert stats.get("checked_out", 0) == 0
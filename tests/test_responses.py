@@ -0,0 +1,54 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+import pytz
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlmodel import Session, select
+from api.events.models import InfoDetailModel, InfoResponse, TeamModel, TeamRole
+from api.events.responses import FastJSONResponse
+
+
+def assert_same_body(content):
+    """FastJSONResponse writes what FastAPI's JSONResponse(jsonable_encoder(...)) wrote before it."""
+    fast = FastJSONResponse(content=content).body
+    assert json.loads(fast) == json.loads(JSONResponse(content=jsonable_encoder(content)).body)
+    return json.loads(fast)
+
+
+def test_scalars_match_jsonable_encoder():
+    ist = pytz.timezone("Asia/Kolkata")
+    body = assert_same_body({
+        "naive": datetime(2025, 3, 7, 21, 31, 0, 120000),
+        "aware": ist.localize(datetime(2025, 3, 7, 21, 31)),
+        "day": date(2025, 3, 7),
+        "response": InfoResponse("A"),
+        "role": TeamRole("IR"),
+        "amount": Decimal("2.5"),
+    })
+    assert body["aware"] == "2025-03-07T21:31:00+05:30"
+    assert body["response"] == "A"
+
+
+def test_table_models_and_rows_match_jsonable_encoder(engine):
+    ist = pytz.timezone("Asia/Kolkata")
+    with Session(engine) as session:
+        team = TeamModel(name="A", weekly_info_target=10)
+        session.add(team)
+        session.commit()
+        session.refresh(team)
+        # Field(exclude=True) bookkeeping stays out, as with model_dump()
+        assert "revision" not in assert_same_body(team)
+        assert "updated_at" not in assert_same_body([team])
+
+        # Expired instance: the columns are loaded on access, not dropped
+        session.expire(team)
+        assert assert_same_body(team)["name"] == "A"
+
+        info = InfoDetailModel(ir_id="IR1", info_date=ist.localize(datetime(2025, 3, 7, 10)), response=InfoResponse("B"), comments="", info_name="x")
+        assert assert_same_body(info)["response"] == "B"
+
+        # jsonable_encoder cannot walk a Row; handlers used to pass its mapping
+        row = session.exec(select(TeamModel.id, TeamModel.name)).one()
+        body = json.loads(FastJSONResponse(content=[row]).body)
+        assert body == jsonable_encoder([dict(row._mapping)]) == [{"id": team.id, "name": "A"}]
@@ -0,0 +1,40 @@
+from datetime import timedelta
+from sqlmodel import Session, select
+from api.events.models import TeamModel, TeamWeekModel, get_current_week_start
+from api.events.rollover import rollover_now, run_week_rollover
+from conftest import add_ir, add_member, add_team, info
+
+
+def _team_info_total(client, team_id: int) -> dict:
+    return client.get(f"/api/team_info_total/{team_id}").json()
+
+
+def test_startup_catch_up_keeps_counters_of_teams_created_this_week(client, engine):
+    team_id = add_team(client, "New")
+    add_ir(client, "IR1")
+    add_member(client, "IR1", team_id)
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")] * 3).status_code == 201
+
+    # What every worker runs on startup
+    assert team_id not in rollover_now()
+
+    totals = _team_info_total(client, team_id)
+    assert totals["running_weekly_info_done"] == totals["recomputed_members_info_total"] == 3
+
+
+def test_rollover_archives_and_resets_once(client, engine):
+    team_id = add_team(client, "Team")
+    add_ir(client, "IR1")
+    add_member(client, "IR1", team_id)
+    assert client.post("/api/add_info_detail/IR1", json=[info("IR1")] * 2).status_code == 201
+
+    next_week = get_current_week_start() + timedelta(days=7)
+    with Session(engine) as session:
+        assert run_week_rollover(session, next_week) == [team_id]
+        assert run_week_rollover(session, next_week) == []  # idempotent
+        team = session.get(TeamModel, team_id)
+        snapshot = session.exec(
+            select(TeamWeekModel).where(TeamWeekModel.team_id == team_id).order_by(TeamWeekModel.week_start.desc())
+        ).first()
+        assert team.weekly_info_done == 0
+        assert snapshot.weekly_info_done == 2
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+from sqlmodel import Session, select
+from api.events.models import IrDailyActivityModel
+from conftest import add_ir, info
+
+
+def rollup_rows(engine):
+    with Session(engine) as session:
+        rows = session.exec(select(IrDailyActivityModel).order_by(IrDailyActivityModel.day_ist)).all()
+        return [(row.day_ist, row.done, row.response_a, row.response_b) for row in rows]
+
+
+def test_days_emptied_by_updates_and_deletes_lose_their_row(client, engine):
+    add_ir(client, "IR1")
+    response = client.post("/api/add_info_detail/IR1", json=[info("IR1", "A"), info("IR1", "B")])
+    assert response.status_code == 201, response.text
+    first, second = response.json()["info_ids"]
+    [(today, done, a, b)] = rollup_rows(engine)
+    assert (done, a, b) == (2, 1, 1)
+
+    # Moving both rows to another day empties today
+    earlier = datetime.now(timezone.utc) - timedelta(days=3)
+    for info_id in (first, second):
+        response = client.put(f"/api/update_info_detail/{info_id}", json={**info("IR1", "B"), "info_date": earlier.isoformat()})
+        assert response.status_code == 200, response.text
+    [(day, done, a, b)] = rollup_rows(engine)
+    assert day < today and (done, a, b) == (2, 0, 2)
+
+    assert client.delete(f"/api/delete_info_detail/{first}").status_code == 200
+    assert [row[1:] for row in rollup_rows(engine)] == [(1, 0, 1)]
+    assert client.delete(f"/api/delete_info_detail/{second}").status_code == 200
+    assert rollup_rows(engine) == []
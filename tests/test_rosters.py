@@ -0,0 +1,51 @@
+from sqlalchemy import event
+from api.db.session import async_engine
+from conftest import add_ir, add_member, add_team, set_ir
+
+
+def test_team_members_come_from_one_joined_query(client, engine):
+    add_ir(client, "LS1", access_level=3)
+    add_ir(client, "IR1")
+    team_id = add_team(client, "A")
+    add_member(client, "LS1", team_id, role="LS")
+    add_member(client, "IR1", team_id)
+    set_ir(engine, "LS1", info_count=4, plan_count=2, weekly_uv_target=5)
+    set_ir(engine, "IR1", info_count=1, weekly_info_target=10, weekly_uv_target=9)
+
+    members = client.get(f"/api/team_members/{team_id}").json()
+    assert [(member["ir_id"], member["role"], member["role_num"]) for member in members] == [("LS1", "LS", 3), ("IR1", "IR", 5)]
+    ls, ir = members
+    assert (ls["info_count"], ls["plan_count"], ls["weekly_uv_target"], ls["uv_count"]) == (4, 2, 5, 5)
+    # UV targets are only shown for LDC/LS
+    assert (ir["info_count"], ir["weekly_info_target"], ir["weekly_uv_target"], ir["uv_count"]) == (1, 10, None, None)
+
+    assert client.get(f"/api/team_members/{team_id + 1}").json() == []
+
+
+def test_dashboard_loads_every_led_roster_at_once(client, engine):
+    add_ir(client, "LDC1", access_level=2)
+    for ir_id in ("IR1", "IR2", "IR3"):
+        add_ir(client, ir_id)
+    teams = [add_team(client, name) for name in ("A", "B", "C")]
+    for team_id, ir_id in zip(teams, ("IR1", "IR2", "IR3")):
+        add_member(client, "LDC1", team_id, role="LDC")
+        add_member(client, ir_id, team_id)
+    set_ir(engine, "LDC1", info_count=1, plan_count=1, weekly_uv_target=3)
+    for count, ir_id in enumerate(("IR1", "IR2", "IR3"), start=1):
+        set_ir(engine, ir_id, info_count=count * 10, plan_count=count)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        dashboard = client.get("/api/targets_dashboard/LDC1").json()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert dashboard["personal"]["uv_count"] == 3
+    progress = [(team["team_name"], team["info_progress"], team["plan_progress"], team["uv_progress"]) for team in dashboard["teams"]]
+    assert sorted(progress) == [("A", 11, 2, 3), ("B", 21, 3, 3), ("C", 31, 4, 3)]
+    # The roster query does not repeat per team or per member
+    assert sum("teammemberlink" in statement.lower() and "join irmodel" in statement.lower() for statement in statements) == 1
+
+    assert client.get("/api/targets_dashboard/IR1").json()["teams"] == "NA"
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from api.events.models import IST, get_current_week_start
+from conftest import add_ir, add_member, add_team, info, plan
+
+
+def test_weeks_split_at_the_friday_boundary(client):
+    add_ir(client, "IR1")
+    add_ir(client, "IR2")
+    team_id = add_team(client, "A")
+    add_member(client, "IR1", team_id)
+    boundary = get_current_week_start()
+    second = timedelta(seconds=1)
+
+    infos = [boundary, boundary - second, boundary - timedelta(weeks=1), boundary - timedelta(weeks=1) - second]
+    response = client.post("/api/add_info_detail/IR1", json=[{**info("IR1"), "info_date": when.isoformat()} for when in infos])
+    assert response.status_code == 201, response.text
+    response = client.post("/api/add_plan_detail/IR1", json=[{**plan("IR1"), "plan_date": (boundary - second).isoformat()}])
+    assert response.status_code == 201, response.text
+    # Not a member: not counted
+    client.post("/api/add_info_detail/IR2", json=[{**info("IR2"), "info_date": boundary.isoformat()}])
+
+    # The Saturday after the boundary two weeks back: that week is the first of the range
+    from_date = (boundary - timedelta(weeks=2) + timedelta(days=1)).astimezone(IST).date().isoformat()
+    response = client.get("/api/team_history", params={"team_ids": [team_id, 999], "from_date": from_date})
+    assert response.status_code == 200, response.text
+    [team] = response.json()
+    weeks = {week["week_start"]: (week["info_done"], week["plan_done"]) for week in team["weeks"]}
+    assert weeks == {
+        (boundary - timedelta(weeks=2)).isoformat(): (1, 0),
+        (boundary - timedelta(weeks=1)).isoformat(): (2, 1),
+        boundary.isoformat(): (1, 0),
+    }
+    assert team["weeks"][-1]["recorded_info_done"] is None
+
+
+def test_history_ranges_are_checked(client):
+    assert client.get("/api/team_history", params={"team_ids": 1, "from_date": "2026-02-01", "to_date": "2026-01-01"}).status_code == 400
+    assert client.get("/api/team_history", params={"team_ids": 1, "from_date": "2000-01-01", "to_date": "2026-01-01"}).status_code == 400
+    assert client.get("/api/team_history", params={"team_ids": 1, "from_date": "yesterday"}).status_code == 400
@@ -0,0 +1,34 @@
+from conftest import add_ir, add_member, add_team, set_ir
+
+
+def totals(team: dict):
+    return team["name"], team["weekly_info_achieved"], team["weekly_plan_achieved"], team["weekly_uv_achieved"]
+
+
+def test_team_totals_sum_members_in_one_grouped_query(client, engine):
+    add_ir(client, "LDC1", access_level=2)
+    add_ir(client, "IR1")
+    add_ir(client, "IR2")
+    add_ir(client, "IR3")  # in no team
+    team_a, team_b, team_c = add_team(client, "A"), add_team(client, "B"), add_team(client, "C")
+    add_member(client, "LDC1", team_a, role="LDC")
+    add_member(client, "IR1", team_a)
+    add_member(client, "IR2", team_a)
+    add_member(client, "IR1", team_b)
+    set_ir(engine, "LDC1", info_count=1, plan_count=0, weekly_uv_target=7)
+    set_ir(engine, "IR1", info_count=2, plan_count=1, weekly_uv_target=9)  # UV only counts for LDC/LS
+    set_ir(engine, "IR2", info_count=3, plan_count=None)
+    set_ir(engine, "IR3", info_count=100, plan_count=100)
+
+    teams = client.get("/api/teams").json()
+    # C has no members: kept by the outer joins, with zero totals
+    assert [totals(team) for team in teams] == [("A", 6, 1, 7), ("B", 2, 1, 0), ("C", 0, 0, 0)]
+    assert [team["id"] for team in teams] == [team_a, team_b, team_c]
+
+    teams = client.get("/api/teams", params={"team_ids": [team_c, team_b]}).json()
+    assert [team["name"] for team in teams] == ["B", "C"]
+
+    # Teams led by LDC1, still summed over all their members
+    teams = client.get("/api/teams", params={"ldc_id": "LDC1"}).json()
+    assert [totals(team) for team in teams] == [("A", 6, 1, 7)]
+    assert client.get("/api/teams", params={"ldc_id": "IR1"}).json() == []
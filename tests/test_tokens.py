@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _import_tokens(tmp_path, **settings) -> subprocess.CompletedProcess:
+    # Secrets are read at import time, so each case gets its own interpreter
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/tokens.db", "AUTH_TOKEN_SECRET": ""}
+    env.pop("AUTH_ALLOW_EPHEMERAL_SECRET", None)
+    env.update(settings)
+    return subprocess.run(
+        [sys.executable, "-c", "import api.auth.tokens"], cwd=SRC, env=env, capture_output=True, text=True,
+    )
+
+
+def test_missing_token_secret_fails_at_startup(tmp_path):
+    result = _import_tokens(tmp_path)
+    assert result.returncode != 0
+    assert "AUTH_TOKEN_SECRET needs to be set" in result.stderr
+
+
+def test_ephemeral_secret_needs_the_development_flag(tmp_path):
+    assert _import_tokens(tmp_path, AUTH_ALLOW_EPHEMERAL_SECRET="true").returncode == 0
+    assert _import_tokens(tmp_path, AUTH_TOKEN_SECRET="configured").returncode == 0